@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.api.v1.user.auth.routes.user import get_current_admin
+from app.db.unit_of_work import TX_MAX_WAIT_MS, TX_TIMEOUT_MS, transaction_stats
+from app.redis.local_cache import cache_stats, local_cache
+from app.utils.success_handler import success_response
+import logging, os
+
+
+router = APIRouter()
+
+
+@router.get("/admin/cache/stats")
+async def get_cache_stats(admin=Depends(get_current_admin)):
+    """Hit ratios per cache tier, for the worker process that serves the request."""
+    try:
+        return success_response(
+            message="Cache statistics retrieved successfully",
+            data={
+                "pid": os.getpid(),
+                "tiers": cache_stats.snapshot(),
+                "local": {
+                    "entries": len(local_cache),
+                    "bytes": local_cache.size,
+                    "max_bytes": local_cache.max_bytes,
+                    "ttl_seconds": local_cache.ttl
+                }
+            }
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTP error while retrieving cache statistics: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error retrieving cache statistics: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/admin/db/stats")
+async def get_db_stats(admin=Depends(get_current_admin)):
+    """Connection hold times per unit of work, for the worker process that serves the request."""
+    try:
+        return success_response(
+            message="Database statistics retrieved successfully",
+            data={
+                "pid": os.getpid(),
+                "tx_timeout_ms": TX_TIMEOUT_MS,
+                "tx_max_wait_ms": TX_MAX_WAIT_MS,
+                "transactions": transaction_stats.snapshot()
+            }
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTP error while retrieving database statistics: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error retrieving database statistics: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from enum import Enum
+from datetime import date
+from prisma import Prisma
+from app.db.routing import get_read_prisma
+from app.api.v1.user.auth.routes.user import get_current_user
+from app.api.v1.export.streams import csv_export, ndjson_export, zip_export
+import logging
+
+
+router = APIRouter()
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+    ZIP = "zip"
+
+
+class ExportResource(str, Enum):
+    WARDROBE_ITEMS = "wardrobe-items"
+    VIRTUAL_TRYON = "virtual-tryon"
+
+
+@router.get("/export")
+async def export_user_data(
+    format: ExportFormat = ExportFormat.NDJSON,
+    resource: ExportResource = Query(
+        ExportResource.WARDROBE_ITEMS, description="Table to export in CSV mode; NDJSON and ZIP include both"
+    ),
+    prisma: Prisma = Depends(get_read_prisma),
+    user=Depends(get_current_user)
+):
+    try:
+        filename = f"virtual-wardrobe-export-{date.today().isoformat()}"
+        if format == ExportFormat.CSV:
+            model = "wardrobeitem" if resource == ExportResource.WARDROBE_ITEMS else "virtualtryon"
+            body, media_type = csv_export(prisma, model, user.id), "text/csv"
+            filename = f"{filename}-{resource.value}"
+        elif format == ExportFormat.ZIP:
+            body, media_type = zip_export(prisma, user.id), "application/zip"
+        else:
+            body, media_type = ndjson_export(prisma, user.id), "application/x-ndjson"
+
+        return StreamingResponse(
+            body,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}.{format.value}"'}
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTP error while exporting user data: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error exporting user data: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,142 @@
+"""
+Streaming exports of a user's wardrobe items and try-on history.
+
+Rows are read in keyset batches ordered by id, so memory stays flat no matter
+how many rows a user has, and every batch is encoded and handed to the
+response before the next one is fetched. The ZIP mode writes the archive in
+streaming mode (data descriptors instead of seeking back), downloading the
+referenced images a batch at a time; its manifest.csv can be fed straight back
+into the wardrobe import.
+"""
+import csv, io, logging, os, zipfile
+from typing import AsyncIterator, Dict, List, Tuple
+from urllib.parse import urlparse
+import orjson
+from prisma import Prisma
+from app.cloud.gcp.storage import download_file_from_gcs
+from app.utils.concurrency import gather_with_concurrency
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+EXPORT_BATCH_SIZE = 500
+ZIP_BATCH_SIZE = 20
+IMAGE_DOWNLOAD_CONCURRENCY = 8
+
+EXPORT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "wardrobeitem": ("id", "category", "type", "brand", "size", "color", "image_url", "created_at", "updated_at"),
+    "virtualtryon": (
+        "id", "cloth_type", "human_image_url", "garment_image_url", "result_image_url", "created_at", "updated_at"
+    ),
+}
+IMAGE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "wardrobeitem": ("image_url",),
+    "virtualtryon": ("human_image_url", "garment_image_url", "result_image_url"),
+}
+RECORD_TYPES = {"wardrobeitem": "wardrobe_item", "virtualtryon": "virtual_tryon"}
+
+
+async def iter_rows(prisma: Prisma, model: str, user_id: str, batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[List[dict]]:
+    """Yield a user's rows of `model` as JSON-ready dicts, one keyset batch at a time."""
+    fields = set(EXPORT_FIELDS[model])
+    cursor = None
+    while True:
+        where = {"user_id": user_id}
+        if cursor:
+            where["id"] = {"gt": cursor}
+        rows = await getattr(prisma, model).find_many(where=where, order={"id": "asc"}, take=batch_size)
+        if not rows:
+            return
+        cursor = rows[-1].id
+        yield [row.model_dump(mode="json", include=fields) for row in rows]
+
+
+async def ndjson_export(prisma: Prisma, user_id: str) -> AsyncIterator[bytes]:
+    """One JSON object per line, tagged with its record type."""
+    for model, record_type in RECORD_TYPES.items():
+        async for rows in iter_rows(prisma, model, user_id):
+            yield b"".join(orjson.dumps({"record_type": record_type, **row}) + b"\n" for row in rows)
+
+
+def _csv_chunk(rows: List[dict], fields: Tuple[str, ...], header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+async def csv_export(prisma: Prisma, model: str, user_id: str) -> AsyncIterator[bytes]:
+    yield _csv_chunk([], EXPORT_FIELDS[model], header=True).encode()
+    async for rows in iter_rows(prisma, model, user_id):
+        yield _csv_chunk(rows, EXPORT_FIELDS[model]).encode()
+
+
+class _ChunkWriter(io.RawIOBase):
+    """Unseekable sink for ZipFile that collects written bytes until drained."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._offset = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _image_name(model: str, row: dict, field: str) -> str:
+    extension = os.path.splitext(urlparse(row[field]).path)[1].lower() or ".jpg"
+    if model == "wardrobeitem":
+        return f"wardrobe-items/{row['id']}{extension}"
+    return f"virtual-tryon/{row['id']}_{field.removesuffix('_image_url')}{extension}"
+
+
+async def zip_export(prisma: Prisma, user_id: str) -> AsyncIterator[bytes]:
+    """
+    ZIP with manifest.csv (wardrobe items, with a filename column pointing at
+    their image), virtual_tryon.csv and the images themselves.
+    """
+    sink = _ChunkWriter()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for model in RECORD_TYPES:
+            csv_name = "manifest.csv" if model == "wardrobeitem" else "virtual_tryon.csv"
+            csv_fields = EXPORT_FIELDS[model] + (("filename",) if model == "wardrobeitem" else ())
+            with archive.open(csv_name, mode="w", force_zip64=True) as entry, \
+                    io.TextIOWrapper(entry, encoding="utf-8", newline="") as text:
+                text.write(_csv_chunk([], csv_fields, header=True))
+                async for rows in iter_rows(prisma, model, user_id):
+                    if model == "wardrobeitem":
+                        for row in rows:
+                            row["filename"] = _image_name(model, row, "image_url") if row["image_url"] else ""
+                    text.write(_csv_chunk(rows, csv_fields))
+                    text.flush()
+                    yield sink.drain()
+
+        for model in RECORD_TYPES:
+            async for rows in iter_rows(prisma, model, user_id, batch_size=ZIP_BATCH_SIZE):
+                images = [(row, field) for row in rows for field in IMAGE_FIELDS[model] if row.get(field)]
+                contents = await gather_with_concurrency(
+                    IMAGE_DOWNLOAD_CONCURRENCY, (download_file_from_gcs(row[field]) for row, field in images)
+                )
+                for (row, field), content in zip(images, contents):
+                    if isinstance(content, Exception):
+                        logger.warning("Skipping image %s in export: %s", row[field], content)
+                        continue
+                    # Images are already compressed, so they are stored as is.
+                    archive.writestr(_image_name(model, row, field), content, compress_type=zipfile.ZIP_STORED)
+                yield sink.drain()
+
+    yield sink.drain()
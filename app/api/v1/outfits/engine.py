@@ -0,0 +1,286 @@
+import numpy as np
+from typing import Dict, List, Optional
+from prisma.enums import ItemCategory, ItemType, Color
+from app.utils.generation_cache import GenerationCache
+
+TOPS = {
+    ItemCategory.SHIRT, ItemCategory.T_SHIRT, ItemCategory.BLOUSE, ItemCategory.SWEATER,
+    ItemCategory.HOODIE, ItemCategory.POLO, ItemCategory.TANK_TOP, ItemCategory.ATHLETIC_TOP,
+}
+BOTTOMS = {
+    ItemCategory.PANT, ItemCategory.JEANS, ItemCategory.SHORTS, ItemCategory.SKIRT,
+    ItemCategory.LEGGINGS, ItemCategory.SWEATPANTS, ItemCategory.TROUSERS, ItemCategory.ATHLETIC_BOTTOM,
+}
+OUTERWEAR = {
+    ItemCategory.JACKET, ItemCategory.COAT, ItemCategory.BLAZER, ItemCategory.CARDIGAN, ItemCategory.VEST,
+}
+SLOTS = {"top": TOPS, "bottom": BOTTOMS, "outerwear": OUTERWEAR}
+RECOMMENDABLE_CATEGORIES = sorted(TOPS | BOTTOMS | OUTERWEAR)
+
+COLORS = list(Color)
+TYPES = list(ItemType)
+UNKNOWN_COLOR = len(COLORS)
+UNKNOWN_TYPE = len(TYPES)
+
+COLOR_WEIGHT = 0.45
+FORMALITY_WEIGHT = 0.35
+TYPE_WEIGHT = 0.2
+
+# Candidate top/bottom pairs kept before outerwear is scored against them.
+PAIR_CANDIDATES = 300
+MAX_ITEM_REPEATS = 3
+SCORES_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Rough in-memory size of one cached item dict, counted with the arrays.
+ITEM_ENTRY_BYTES = 1024
+
+CATEGORY_FORMALITY = {
+    ItemCategory.SHIRT: 0.7, ItemCategory.T_SHIRT: 0.3, ItemCategory.BLOUSE: 0.7,
+    ItemCategory.SWEATER: 0.5, ItemCategory.HOODIE: 0.2, ItemCategory.POLO: 0.5,
+    ItemCategory.TANK_TOP: 0.15, ItemCategory.ATHLETIC_TOP: 0.05,
+    ItemCategory.PANT: 0.6, ItemCategory.JEANS: 0.35, ItemCategory.SHORTS: 0.15,
+    ItemCategory.SKIRT: 0.6, ItemCategory.LEGGINGS: 0.2, ItemCategory.SWEATPANTS: 0.1,
+    ItemCategory.TROUSERS: 0.8, ItemCategory.ATHLETIC_BOTTOM: 0.05,
+    ItemCategory.JACKET: 0.5, ItemCategory.COAT: 0.7, ItemCategory.BLAZER: 0.9,
+    ItemCategory.CARDIGAN: 0.5, ItemCategory.VEST: 0.7,
+}
+TYPE_FORMALITY = {
+    ItemType.CASUAL: 0.35, ItemType.FORMAL: 0.9, ItemType.SPORTS: 0.05,
+    ItemType.ETHNIC: 0.65, ItemType.PARTY: 0.7, ItemType.BEACH: 0.1,
+}
+
+NEUTRAL_COLORS = {
+    Color.BLACK, Color.WHITE, Color.GRAY, Color.NAVY, Color.BEIGE, Color.TAN,
+    Color.KHAKI, Color.CREAM, Color.CHARCOAL, Color.DENIM,
+}
+COLOR_PAIRS = {
+    # Classic pairings
+    (Color.NAVY, Color.KHAKI): 1.0, (Color.NAVY, Color.WHITE): 1.0, (Color.BLACK, Color.WHITE): 1.0,
+    (Color.DENIM, Color.WHITE): 1.0, (Color.BROWN, Color.CREAM): 0.9, (Color.OLIVE, Color.TAN): 0.9,
+    (Color.BURGUNDY, Color.GRAY): 0.9, (Color.MAROON, Color.BEIGE): 0.85, (Color.BLUE, Color.BEIGE): 0.85,
+    (Color.PINK, Color.NAVY): 0.85, (Color.GREEN, Color.KHAKI): 0.8, (Color.YELLOW, Color.DENIM): 0.8,
+    # Clashes
+    (Color.RED, Color.PINK): 0.15, (Color.RED, Color.MAROON): 0.25,
+    (Color.RED, Color.PURPLE): 0.2, (Color.RED, Color.GREEN): 0.2, (Color.PURPLE, Color.YELLOW): 0.25,
+    (Color.BROWN, Color.BLACK): 0.35, (Color.NAVY, Color.BLACK): 0.4, (Color.PINK, Color.MAROON): 0.3,
+    (Color.MULTICOLOR, Color.MULTICOLOR): 0.1,
+}
+TYPE_PAIRS = {
+    (ItemType.CASUAL, ItemType.BEACH): 0.7, (ItemType.CASUAL, ItemType.SPORTS): 0.6,
+    (ItemType.CASUAL, ItemType.PARTY): 0.6, (ItemType.FORMAL, ItemType.PARTY): 0.7,
+    (ItemType.FORMAL, ItemType.ETHNIC): 0.5, (ItemType.PARTY, ItemType.ETHNIC): 0.6,
+    (ItemType.SPORTS, ItemType.BEACH): 0.6,
+}
+
+
+def _color_harmony_matrix() -> np.ndarray:
+    size = len(COLORS) + 1
+    matrix = np.full((size, size), 0.5, dtype=np.float32)
+    index = {color: i for i, color in enumerate(COLORS)}
+    for color in COLORS:
+        i = index[color]
+        if color in NEUTRAL_COLORS:
+            matrix[i, :UNKNOWN_COLOR] = 0.85
+            matrix[:UNKNOWN_COLOR, i] = 0.85
+    for color in COLORS:
+        i = index[color]
+        matrix[i, i] = 0.75 if color in NEUTRAL_COLORS else 0.45
+    for (a, b), score in COLOR_PAIRS.items():
+        matrix[index[a], index[b]] = matrix[index[b], index[a]] = score
+    matrix[UNKNOWN_COLOR, :] = matrix[:, UNKNOWN_COLOR] = 0.5
+    return matrix
+
+
+def _type_match_matrix() -> np.ndarray:
+    size = len(TYPES) + 1
+    matrix = np.full((size, size), 0.3, dtype=np.float32)
+    np.fill_diagonal(matrix, 1.0)
+    index = {item_type: i for i, item_type in enumerate(TYPES)}
+    for (a, b), score in TYPE_PAIRS.items():
+        matrix[index[a], index[b]] = matrix[index[b], index[a]] = score
+    matrix[UNKNOWN_TYPE, :] = matrix[:, UNKNOWN_TYPE] = 0.6
+    return matrix
+
+
+COLOR_HARMONY = _color_harmony_matrix()
+TYPE_MATCH = _type_match_matrix()
+_COLOR_INDEX = {color: i for i, color in enumerate(COLORS)}
+_TYPE_INDEX = {item_type: i for i, item_type in enumerate(TYPES)}
+
+
+class SlotFeatures:
+    """
+    Array-backed features of the items filling one outfit slot.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []
+        self.colors = np.empty(0, dtype=np.intp)
+        self.types = np.empty(0, dtype=np.intp)
+        self.formality = np.empty(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def featurize(items: list) -> tuple:
+        colors = np.array([_COLOR_INDEX.get(item.color, UNKNOWN_COLOR) for item in items], dtype=np.intp)
+        types = np.array([_TYPE_INDEX.get(item.type, UNKNOWN_TYPE) for item in items], dtype=np.intp)
+        formality = np.array([
+            (CATEGORY_FORMALITY[item.category] + TYPE_FORMALITY[item.type]) / 2
+            if item.type is not None else CATEGORY_FORMALITY[item.category]
+            for item in items
+        ], dtype=np.float32)
+        return colors, types, formality
+
+    def keep(self, mask: np.ndarray) -> None:
+        self.ids = [item_id for item_id, kept in zip(self.ids, mask) if kept]
+        self.colors, self.types, self.formality = self.colors[mask], self.types[mask], self.formality[mask]
+
+    def append(self, items: list) -> None:
+        colors, types, formality = self.featurize(items)
+        self.ids.extend(item.id for item in items)
+        self.colors = np.concatenate([self.colors, colors])
+        self.types = np.concatenate([self.types, types])
+        self.formality = np.concatenate([self.formality, formality])
+
+
+def pair_scores(a_colors, a_types, a_formality, b_colors, b_types, b_formality) -> np.ndarray:
+    """
+    Score every (a, b) combination with broadcasted lookups into the
+    compatibility matrices; returns an array of shape (len(a), len(b)).
+    """
+    color = COLOR_HARMONY[a_colors[:, None], b_colors[None, :]]
+    item_type = TYPE_MATCH[a_types[:, None], b_types[None, :]]
+    formality = 1.0 - np.abs(a_formality[:, None] - b_formality[None, :])
+    return COLOR_WEIGHT * color + FORMALITY_WEIGHT * formality + TYPE_WEIGHT * item_type
+
+
+class WardrobeScores:
+    """
+    Per-user slot features and pairwise score matrices (top x bottom,
+    top x outerwear, bottom x outerwear), maintained incrementally.
+    """
+
+    PAIRS = (("top", "bottom"), ("top", "outerwear"), ("bottom", "outerwear"))
+
+    def __init__(self):
+        self.generation: Optional[str] = None
+        self.items: Dict[str, dict] = {}
+        self.versions: Dict[str, str] = {}
+        self.slots = {slot: SlotFeatures() for slot in SLOTS}
+        self.matrices = {pair: np.empty((0, 0), dtype=np.float32) for pair in self.PAIRS}
+
+    @property
+    def nbytes(self) -> int:
+        arrays = sum(matrix.nbytes for matrix in self.matrices.values()) + sum(
+            features.colors.nbytes + features.types.nbytes + features.formality.nbytes
+            for features in self.slots.values()
+        )
+        return arrays + len(self.items) * ITEM_ENTRY_BYTES
+
+    def _features(self, slot: str, rows=slice(None)) -> tuple:
+        features = self.slots[slot]
+        return features.colors[rows], features.types[rows], features.formality[rows]
+
+    def sync(self, items: list, generation: str) -> None:
+        """
+        Bring the matrices in line with the current wardrobe: rows and columns of
+        removed or changed items are dropped, and only the new items are scored.
+        """
+        current = {item.id: item for item in items if item.category in RECOMMENDABLE_CATEGORIES}
+        stale = {
+            item_id for item_id, version in self.versions.items()
+            if item_id not in current or current[item_id].updated_at.isoformat() != version
+        }
+
+        if stale:
+            masks = {
+                slot: np.array([item_id not in stale for item_id in features.ids], dtype=bool)
+                for slot, features in self.slots.items()
+            }
+            for (a, b), matrix in self.matrices.items():
+                self.matrices[(a, b)] = matrix[masks[a]][:, masks[b]]
+            for slot, features in self.slots.items():
+                features.keep(masks[slot])
+            for item_id in stale:
+                self.items.pop(item_id, None)
+                self.versions.pop(item_id, None)
+
+        added = {slot: [] for slot in SLOTS}
+        for item_id, item in current.items():
+            if item_id in self.versions:
+                continue
+            slot = next(name for name, categories in SLOTS.items() if item.category in categories)
+            added[slot].append(item)
+            self.items[item_id] = item.model_dump(mode="json")
+            self.versions[item_id] = item.updated_at.isoformat()
+
+        for (a, b) in self.PAIRS:
+            if not added[a] and not added[b]:
+                continue
+            new_a = SlotFeatures.featurize(added[a]) if added[a] else None
+            new_b = SlotFeatures.featurize(added[b]) if added[b] else None
+
+            matrix = self.matrices[(a, b)]
+            if new_b is not None:
+                matrix = np.hstack([matrix, pair_scores(*self._features(a), *new_b)])
+            if new_a is not None:
+                all_b = self._features(b)
+                if new_b is not None:
+                    all_b = tuple(np.concatenate([old, new]) for old, new in zip(all_b, new_b))
+                matrix = np.vstack([matrix, pair_scores(*new_a, *all_b)])
+            self.matrices[(a, b)] = matrix.astype(np.float32, copy=False)
+
+        for slot, slot_items in added.items():
+            if slot_items:
+                self.slots[slot].append(slot_items)
+        self.generation = generation
+
+    def recommend(self, limit: int, include_outerwear: bool = True) -> List[dict]:
+        """
+        Return the best scoring outfits, each item used at most MAX_ITEM_REPEATS times.
+        """
+        top_bottom = self.matrices[("top", "bottom")]
+        if top_bottom.size == 0:
+            return []
+
+        flat = top_bottom.ravel()
+        keep = min(PAIR_CANDIDATES, flat.size)
+        candidates = np.argpartition(-flat, keep - 1)[:keep]
+        tops, bottoms = np.unravel_index(candidates, top_bottom.shape)
+        scores = flat[candidates]
+
+        outer = np.full(len(candidates), -1, dtype=np.intp)
+        if include_outerwear and len(self.slots["outerwear"]):
+            with_outer = (
+                top_bottom[tops, bottoms][:, None]
+                + self.matrices[("top", "outerwear")][tops]
+                + self.matrices[("bottom", "outerwear")][bottoms]
+            ) / 3
+            best = with_outer.argmax(axis=1)
+            improved = with_outer[np.arange(len(candidates)), best] > scores
+            outer[improved] = best[improved]
+            scores = np.where(improved, with_outer[np.arange(len(candidates)), best], scores)
+
+        outfits, uses = [], {}
+        for index in np.argsort(-scores, kind="stable"):
+            ids = [self.slots["top"].ids[tops[index]], self.slots["bottom"].ids[bottoms[index]]]
+            if outer[index] >= 0:
+                ids.append(self.slots["outerwear"].ids[outer[index]])
+            if any(uses.get(item_id, 0) >= MAX_ITEM_REPEATS for item_id in ids):
+                continue
+            for item_id in ids:
+                uses[item_id] = uses.get(item_id, 0) + 1
+            outfits.append({
+                "score": round(float(scores[index]), 4),
+                "top": self.items[ids[0]],
+                "bottom": self.items[ids[1]],
+                "outerwear": self.items[ids[2]] if len(ids) > 2 else None,
+            })
+            if len(outfits) >= limit:
+                break
+        return outfits
+
+
+# Score matrices per user. Stale entries are kept and synced incrementally.
+user_scores = GenerationCache(max_bytes=SCORES_CACHE_MAX_BYTES)
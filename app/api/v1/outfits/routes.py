@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from prisma import Prisma
+from app.db.prisma_client import get_prisma
+from app.redis.counters import get_wardrobe_generation
+from app.api.v1.user.auth.routes.user import get_current_user
+from app.api.v1.outfits.engine import RECOMMENDABLE_CATEGORIES, WardrobeScores, user_scores
+from app.utils.success_handler import success_response
+import logging
+
+
+router = APIRouter()
+
+
+@router.get("/outfits/recommendations")
+async def get_outfit_recommendations(
+    limit: Optional[int] = Query(10, ge=1, le=50),
+    include_outerwear: Optional[bool] = True,
+    prisma: Prisma = Depends(get_prisma),
+    user=Depends(get_current_user)
+):
+    try:
+        generation = await get_wardrobe_generation(prisma, user.id)
+        scores = user_scores.get(user.id, generation)
+
+        if scores is None:
+            scores = user_scores.latest(user.id) or WardrobeScores()
+            items = await prisma.wardrobeitem.find_many(
+                where={
+                    "user_id": user.id,
+                    "category": {"in": RECOMMENDABLE_CATEGORIES}
+                }
+            )
+            scores.sync(items, generation)
+            user_scores.put(user.id, generation, scores, scores.nbytes)
+
+        outfits = scores.recommend(limit, include_outerwear=include_outerwear)
+
+        return success_response(
+            message="Outfit recommendations retrieved successfully",
+            data=outfits
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTPException retrieving outfit recommendations: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error retrieving outfit recommendations: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
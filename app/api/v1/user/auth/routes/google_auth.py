@@ -3,9 +3,11 @@ from fastapi.responses import RedirectResponse
 from urllib.parse import urlencode
 from app.utils.success_handler import success_response
 from app.db.prisma_client import get_prisma
-from app.redis.redis_client import redis_handler
+from app.db.sticky import stick_to_primary
+from app.redis.cache import delete_cache_keys
 from typing import Optional
-from app.api.v1.user.auth.routes.user import create_access_token
+from app.api.v1.user.auth.routes.user import auth_user_cache_key, create_access_token
+from app.api.v1.user.info.routes import user_info_cache_keys
 from env import env
 import httpx, logging
 
@@ -107,9 +109,8 @@ async def google_callback(code: Optional[str] = None, error: Optional[str] = Non
                 "is_google_verified": True
             })
 
-        cache_key = f"user_info_{user_exist.id}"
-        redis_client = await redis_handler.get_client()
-        await redis_client.delete(cache_key)
+        await delete_cache_keys(keys=[*user_info_cache_keys(user_exist.id), auth_user_cache_key(user_exist.id)])
+        await stick_to_primary(user_exist.id)
 
         access_token = create_access_token(data={"email": user_exist.email, "id": user_exist.id})
 
@@ -1,6 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from passlib.context import CryptContext
 from app.db.prisma_client import get_prisma
+from app.db.loader import DataLoader, get_loader
+from app.db.sticky import stick_to_primary
+from app.db.unit_of_work import UnitOfWork
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict
 from jose import jwt, JWTError, ExpiredSignatureError
@@ -9,7 +12,11 @@ from app.api.v1.user.auth.mails.templates import sign_up_template, forgot_passwo
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.utils.mail_handler import send_mail
 from app.utils.success_handler import success_response
+from app.redis.redis_client import redis_handler
+from app.redis.cache import delete_cache_keys
+from app.redis.local_cache import cache_stats, local_cache
 from prisma import Prisma
+from prisma.models import User
 from prisma.enums import Role
 from env import env
 import logging, random
@@ -19,6 +26,8 @@ import logging, random
 SECRET_KEY = env.JWT_SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440
+# Authenticated users are cached briefly so cached reads (and 304s) skip Postgres.
+AUTH_USER_CACHE_TTL = 300
 
 bearer_scheme = HTTPBearer()
 
@@ -42,8 +51,40 @@ def get_password_hash(password: str) -> str:
 router = APIRouter()
 
 
+def auth_user_cache_key(user_id: str) -> str:
+    return f"auth_user_{user_id}"
+
+
+async def load_active_user(prisma: Prisma, email: str, user_id: str) -> Optional[User]:
+    cache_key = auth_user_cache_key(user_id)
+    user = local_cache.get(cache_key)
+    cache_stats.record("local", user is not None)
+    if user is not None and user.email == email:
+        return user
+
+    redis_client = await redis_handler.get_client()
+    cached_user = await redis_client.get(cache_key)
+    cache_stats.record("redis", cached_user is not None)
+    if cached_user:
+        user = User.model_validate_json(cached_user)
+        local_cache.set(cache_key, user, len(cached_user))
+        if user.email == email:
+            return user
+
+    user = await prisma.user.find_first(where={"email": email, "id": user_id, "is_deleted": False})
+    if user:
+        cached_user = user.model_dump_json()
+        await redis_client.setex(cache_key, AUTH_USER_CACHE_TTL, cached_user)
+        local_cache.set(cache_key, user, len(cached_user))
+    return user
+
+
 # Auth Dependencies
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme), prisma: Prisma = Depends(get_prisma)):
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
+    prisma: Prisma = Depends(get_prisma),
+    loader: DataLoader = Depends(get_loader)
+):
     try:
         token = credentials.credentials
         try:
@@ -58,9 +99,10 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(b
         if not email or not user_id:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token claims")
 
-        user = await prisma.user.find_first(where={"email": email, "id": user_id, "is_deleted": False})
+        user = await load_active_user(prisma, email, user_id)
         if not user:
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        loader.prime("user", user)
         return user
 
     except HTTPException as he:
@@ -82,24 +124,27 @@ async def get_current_admin(current_user=Depends(get_current_user)):
 @router.post("/register", status_code=201)
 async def register(request: Register, prisma: Prisma = Depends(get_prisma)):
     try:
-        async with prisma.tx(timeout=65000, max_wait=80000) as tx:
-            existing = await tx.user.find_first(where={"email": request.email})
+        # Hashing and mailing stay outside the transaction so it holds no connection meanwhile.
+        hashed_password = get_password_hash(request.password)
+        otp = str(random.randint(100000, 999999))
+        async with UnitOfWork(prisma, "auth.register") as uow:
+            existing = await uow.tx.user.find_first(where={"email": request.email})
             if existing:
                 if not existing.is_deleted:
                     raise HTTPException(400, "User already registered")
                 raise HTTPException(409, "Account deleted. Restore?")
 
-            await tx.otpsession.delete_many(where={"email": request.email, "type": "signup"})
-            otp = str(random.randint(100000, 999999))
-            session = await tx.otpsession.create(data={
+            await uow.tx.otpsession.delete_many(where={"email": request.email, "type": "signup"})
+            session = await uow.tx.otpsession.create(data={
                 "name": request.name,
                 "email": request.email,
-                "hashed_password": get_password_hash(request.password),
+                "hashed_password": hashed_password,
                 "otp": otp,
                 "type": "signup"
             })
-            await send_mail([request.email], "Virtual Wardrobe: Verify Your Account", sign_up_template(otp))
-            return success_response("OTP sent", {"session_id": session.session_id})
+
+        await send_mail([request.email], "Virtual Wardrobe: Verify Your Account", sign_up_template(otp))
+        return success_response("OTP sent", {"session_id": session.session_id})
 
     except HTTPException as he:
         logging.error("HTTPException: %s", he)
@@ -113,23 +158,24 @@ async def register(request: Register, prisma: Prisma = Depends(get_prisma)):
 @router.put("/verify/otp")
 async def verify_otp(request: OTPVerify, prisma: Prisma = Depends(get_prisma)):
     try:
-        async with prisma.tx(timeout=65000, max_wait=80000) as tx:
-            session = await tx.otpsession.find_first(where={"session_id": request.session_id})
+        async with UnitOfWork(prisma, "auth.verify_otp") as uow:
+            session = await uow.tx.otpsession.find_first(where={"session_id": request.session_id})
             if not session or session.otp != request.otp:
                 raise HTTPException(400, "Invalid session or OTP")
 
-            existing = await tx.user.find_first(where={"email": session.email})
+            existing = await uow.tx.user.find_first(where={"email": session.email})
             if existing:
                 raise HTTPException(409 if existing.is_deleted else 400, "User exists or deleted")
 
-            await tx.user.create(data={
+            await uow.tx.user.create(data={
                 "name": session.name,
                 "email": session.email,
                 "hashed_password": session.hashed_password,
                 "is_email_verified": True
             })
-            await tx.otpsession.delete_many(where={"session_id": session.session_id})
-            return success_response("OTP verified")
+            await uow.tx.otpsession.delete_many(where={"session_id": session.session_id})
+
+        return success_response("OTP verified")
 
     except HTTPException as he:
         logging.error("HTTPException: %s", he)
@@ -143,15 +189,16 @@ async def verify_otp(request: OTPVerify, prisma: Prisma = Depends(get_prisma)):
 @router.post("/resend-otp")
 async def resend_otp(session_id: str, prisma: Prisma = Depends(get_prisma)):
     try:
-        async with prisma.tx(timeout=65000, max_wait=80000) as tx:
-            session = await tx.otpsession.find_first(where={"session_id": session_id})
+        otp = str(random.randint(100000, 999999))
+        async with UnitOfWork(prisma, "auth.resend_otp") as uow:
+            session = await uow.tx.otpsession.find_first(where={"session_id": session_id})
             if not session:
                 raise HTTPException(400, "Session not found")
 
-            otp = str(random.randint(100000, 999999))
-            await tx.otpsession.update(where={"session_id": session_id}, data={"otp": otp})
-            await send_mail([session.email], "Virtual Wardrobe: Verify Your Account", sign_up_template(otp))
-            return success_response("OTP resent", {"session_id": session_id})
+            await uow.tx.otpsession.update(where={"session_id": session_id}, data={"otp": otp})
+
+        await send_mail([session.email], "Virtual Wardrobe: Verify Your Account", sign_up_template(otp))
+        return success_response("OTP resent", {"session_id": session_id})
 
     except HTTPException as he:
         logging.error("HTTPException: %s", he)
@@ -216,16 +263,17 @@ async def refresh_token(credentials: HTTPAuthorizationCredentials = Depends(bear
 @router.post("/forgot-password/{email}")
 async def forgot_password(email: str, prisma: Prisma = Depends(get_prisma)):
     try:
-        async with prisma.tx(timeout=65000, max_wait=80000) as tx:
-            user = await tx.user.find_first(where={"email": email})
+        otp = str(random.randint(100000, 999999))
+        async with UnitOfWork(prisma, "auth.forgot_password") as uow:
+            user = await uow.tx.user.find_first(where={"email": email})
             if not user:
                 raise HTTPException(404, "User not found")
 
-            await tx.otpsession.delete_many(where={"email": email, "type": "password_reset"})
-            otp = str(random.randint(100000, 999999))
-            session = await tx.otpsession.create(data={"email": email, "otp": otp, "type": "password_reset", "hashed_password": user.hashed_password})
-            await send_mail([email], "Virtual Wardrobe: Password Reset", forgot_password_template(otp))
-            return success_response("OTP sent", {"session_id": session.session_id})
+            await uow.tx.otpsession.delete_many(where={"email": email, "type": "password_reset"})
+            session = await uow.tx.otpsession.create(data={"email": email, "otp": otp, "type": "password_reset", "hashed_password": user.hashed_password})
+
+        await send_mail([email], "Virtual Wardrobe: Password Reset", forgot_password_template(otp))
+        return success_response("OTP sent", {"session_id": session.session_id})
 
     except HTTPException as he:
         logging.error("HTTPException: %s", he)
@@ -239,14 +287,18 @@ async def forgot_password(email: str, prisma: Prisma = Depends(get_prisma)):
 @router.post("/reset-password")
 async def reset_password(request: ResetPassword, prisma: Prisma = Depends(get_prisma)):
     try:
-        async with prisma.tx(timeout=65000, max_wait=80000) as tx:
-            session = await tx.otpsession.find_first(where={"email": request.email})
+        hashed_password = get_password_hash(request.new_password)
+        async with UnitOfWork(prisma, "auth.reset_password") as uow:
+            session = await uow.tx.otpsession.find_first(where={"email": request.email})
             if not session or session.otp != request.otp:
                 raise HTTPException(400, "Invalid OTP")
 
-            await tx.user.update(where={"email": request.email}, data={"hashed_password": get_password_hash(request.new_password)})
-            await tx.otpsession.delete_many(where={"email": request.email, "type": "password_reset"})
-            return success_response("Password reset successful")
+            user = await uow.tx.user.update(where={"email": request.email}, data={"hashed_password": hashed_password})
+            await uow.tx.otpsession.delete_many(where={"email": request.email, "type": "password_reset"})
+            uow.after_commit(delete_cache_keys, keys=[auth_user_cache_key(user.id)])
+            uow.after_commit(stick_to_primary, user.id)
+
+        return success_response("Password reset successful")
 
     except HTTPException as he:
         logging.error("HTTPException: %s", he)
@@ -269,6 +321,7 @@ async def restore_account(request: Login, prisma: Prisma = Depends(get_prisma)):
             raise HTTPException(400, "Incorrect password")
 
         await prisma.user.update(where={"id": user.id}, data={"is_deleted": False})
+        await stick_to_primary(user.id)
         token = create_access_token({"id": user.id, "email": user.email})
         return success_response("Account restored", {"access_token": token})
 
@@ -291,6 +344,7 @@ async def restore_account_google(request: EmailOnlyRequest, prisma: Prisma = Dep
             raise HTTPException(400, "Account already active")
 
         await prisma.user.update(where={"id": user.id}, data={"is_deleted": False, "is_google_verified": True})
+        await stick_to_primary(user.id)
         token = create_access_token({"id": user.id, "email": user.email})
         return success_response("Account restored", {"access_token": token})
 
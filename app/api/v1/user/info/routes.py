@@ -1,54 +1,83 @@
-from fastapi import APIRouter, HTTPException, Depends, status, File, UploadFile
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, status, File, UploadFile
 from typing import Optional
 from app.db.prisma_client import get_prisma
-from app.redis.redis_client import redis_handler
+from app.db.loader import DataLoader, get_loader
+from app.db.routing import get_read_prisma
+from app.db.unit_of_work import UnitOfWork
+from app.redis.cache import delete_cache_keys, load_cached
 from app.cloud.gcp.storage import upload_file_to_gcs, delete_file_from_gcs
 from app.utils.success_handler import success_response
-from app.api.v1.user.auth.routes.user import get_current_user
+from app.utils.fields import parse_fields
+from app.api.v1.user.auth.routes.user import auth_user_cache_key, get_current_user
 from prisma import Prisma
 from prisma.enums import Role
 from env import env
-import logging, json
+import logging
 
 
 router = APIRouter()
 
+# Columns a `fields=` sparse fieldset may ask for, plus the recent try-ons.
+# hashed_password and the other relations are never selectable.
+USER_INFO_FIELDS = (
+    "id", "name", "email", "phone_number", "profile_pic", "role", "profile_completion",
+    "is_tutorial_req", "is_email_verified", "is_phone_verified", "is_google_verified",
+    "is_deleted", "created_at", "updated_at", "VirtualTryOn",
+)
+USER_INFO_MESSAGE = "User information retrieved successfully"
+USER_INFO_CACHED_MESSAGE = "User information retrieved from cache"
+
+
+def user_info_cache_key(user_id: str, with_tryons: bool = True) -> str:
+    """
+    Reads whose fieldset leaves out VirtualTryOn are cached apart, without
+    the try-ons, so they neither query them nor go stale when they change.
+    """
+    return f"user_info_{user_id}" if with_tryons else f"user_info_{user_id}_profile"
+
+
+def user_info_cache_keys(user_id: str) -> list:
+    return [user_info_cache_key(user_id), user_info_cache_key(user_id, with_tryons=False)]
+
 
 @router.get("/user", status_code=status.HTTP_200_OK)
 async def get_user_info(
-    prisma: Prisma = Depends(get_prisma),
+    request: Request,
+    fields: Optional[str] = Query(None),
+    prisma: Prisma = Depends(get_read_prisma),
+    loader: DataLoader = Depends(get_loader),
     current_user=Depends(get_current_user)
 ):
     try:
-        cache_key = f"user_info_{current_user.id}"
-        redis_client = await redis_handler.get_client()
-        cached_user = await redis_client.get(cache_key)
-
-        if cached_user:
-            return success_response(
-                message="User information retrieved from cache",
-                data=json.loads(cached_user)
+        user_fields = parse_fields(fields, USER_INFO_FIELDS)
+        with_tryons = user_fields is None or "VirtualTryOn" in user_fields
+        cache_key = user_info_cache_key(current_user.id, with_tryons)
+
+        async def load_user():
+            # Authentication already loaded the active user for this request.
+            user = await loader.load("user", current_user.id)
+            if not user:
+                raise HTTPException(status_code=404, detail="User not found")
+            if not with_tryons:
+                return user.model_dump(mode='json')
+
+            recent_tryons = await prisma.virtualtryon.find_many(
+                where={"user_id": current_user.id},
+                order={"created_at": "desc"},
+                take=3
             )
-
-        user = await prisma.user.find_first(
-            where={"id": current_user.id, "is_deleted": False},
-            include={
-                "VirtualTryOn": {
-                    "order_by": {"created_at": "desc"},
-                    "take": 3
-                }
+            return {
+                **user.model_dump(mode='json'),
+                "VirtualTryOn": [tryon.model_dump(mode='json') for tryon in recent_tryons]
             }
-        )
-
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
 
-        user_dict = user.model_dump(mode='json')
-        await redis_client.setex(cache_key, 3600, json.dumps(user_dict))
-
-        return success_response(
-            message="User information retrieved successfully",
-            data=user
+        return await load_cached(
+            request,
+            cache_key,
+            load_user,
+            message=USER_INFO_MESSAGE,
+            cached_message=USER_INFO_CACHED_MESSAGE,
+            fields=user_fields
         )
 
     except HTTPException as he:
@@ -98,10 +127,6 @@ async def update_user(
             data["phone_number"] = None
 
         if delete_profile_pic:
-            await delete_file_from_gcs(
-                file_url=current_user.profile_pic,
-                bucket_name=env.GOOGLE_STORAGE_MEDIA_BUCKET
-            )
             data["profile_pic"] = None
 
         if phone_number is not None:
@@ -119,14 +144,19 @@ async def update_user(
             )
             data["profile_pic"] = file_url
 
-        async with prisma.tx(timeout=65000, max_wait=80000) as tx:
-            updated_user = await tx.user.update(
+        async with UnitOfWork(prisma, "user_info.update", user_id=current_user.id) as uow:
+            updated_user = await uow.tx.user.update(
                 where={"id": current_user.id, "is_deleted": False},
                 data=data
             )
 
-            redis_client = await redis_handler.get_client()
-            await redis_client.delete(f"user_info_{current_user.id}")
+            if delete_profile_pic and current_user.profile_pic:
+                uow.after_commit(
+                    delete_file_from_gcs,
+                    file_url=current_user.profile_pic,
+                    bucket_name=env.GOOGLE_STORAGE_MEDIA_BUCKET
+                )
+            uow.after_commit(delete_cache_keys, keys=[*user_info_cache_keys(current_user.id), auth_user_cache_key(current_user.id)])
 
         return success_response(
             message="User updated successfully",
@@ -148,14 +178,13 @@ async def delete_user(
     current_user=Depends(get_current_user)
 ):
     try:
-        async with prisma.tx(timeout=65000, max_wait=80000) as tx:
-            await tx.user.update(
+        async with UnitOfWork(prisma, "user_info.delete", user_id=current_user.id) as uow:
+            await uow.tx.user.update(
                 where={"id": current_user.id},
                 data={"is_deleted": True}
             )
 
-            redis_client = await redis_handler.get_client()
-            await redis_client.delete(f"user_info_{current_user.id}")
+            uow.after_commit(delete_cache_keys, keys=[*user_info_cache_keys(current_user.id), auth_user_cache_key(current_user.id)])
 
         return success_response(message="User deleted successfully")
 
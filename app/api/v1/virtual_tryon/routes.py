@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Query
 from typing import Optional
 from prisma import Prisma
 from app.db.prisma_client import get_prisma
-from app.redis.redis_client import redis_handler
+from app.db.routing import get_read_prisma
+from app.db.sync import MAX_SYNC_LIMIT, fetch_changes, tombstone_rows
+from app.db.unit_of_work import UnitOfWork
+from app.redis.cache import delete_cache_keys, load_cached
+from app.redis.counters import get_virtual_tryon_count, update_virtual_tryon_counts
 from app.api.v1.user.auth.routes.user import get_current_user
 from app.cloud.gcp.storage import upload_file_to_gcs
 from app.utils.success_handler import success_response
 from app.cloud.gcp.vertexai import run_virtual_tryon
 from env import env
-import logging, math, json, base64
+import logging, math, base64
 
 
 router = APIRouter()
@@ -60,14 +64,10 @@ async def virtual_tryon(
 
         data["result_image_url"] = result_image_url
 
-        async with prisma.tx(timeout=65000, max_wait=80000) as tx:
-            result = await tx.virtualtryon.create(data=data)      
-            redis_client = await redis_handler.get_client()
-            virtual_tryon_keys = await redis_client.keys(f'virtual_tryon_{user.id}_*')
-            user_info_keys = await redis_client.keys(f'user_info_{user.id}')
-            keys = virtual_tryon_keys + user_info_keys
-            if keys:
-                await redis_client.delete(*keys)
+        async with UnitOfWork(prisma, "virtual_tryon.create", user_id=user.id) as uow:
+            result = await uow.tx.virtualtryon.create(data=data)
+            uow.after_commit(delete_cache_keys, f'virtual_tryon_{user.id}', keys=[f'user_info_{user.id}'])
+            uow.after_commit(update_virtual_tryon_counts, user.id, 1)
 
         return success_response(
             message="Virtual try-on finished successfully",
@@ -85,98 +85,115 @@ async def virtual_tryon(
 
 @router.get("/virtual-tryon")
 async def get_virtual_tryon(
-    prisma: Prisma = Depends(get_prisma),
+    request: Request,
+    prisma: Prisma = Depends(get_read_prisma),
     page: Optional[int] = Query(1, ge=1),
     page_size: Optional[int] = Query(10, ge=1, le=100),
     user=Depends(get_current_user)
 ):
     try:
         cache_key = f"virtual_tryon_{user.id}_{page}_{page_size}"
-        redis_client = await redis_handler.get_client()
-        cached_data = await redis_client.get(cache_key)
 
-        if cached_data:
-            return success_response(
-                message="Virtual try-on results retrieved from cache",
-                data=json.loads(cached_data)
+        async def load_results():
+            skip = (page - 1) * page_size
+            filters = {"user_id": user.id}
+
+            results = await prisma.virtualtryon.find_many(
+                where=filters,
+                skip=skip,
+                take=page_size,
+                order={"created_at": "desc"}
             )
 
-        skip = (page - 1) * page_size
-        filters = {"user_id": user.id}
+            total_count = await get_virtual_tryon_count(prisma, user.id)
+            total_pages = math.ceil(total_count / page_size)
+
+            serialized_data = [result.model_dump(mode='json') for result in results]
+
+            return {
+                "items": serialized_data,
+                "metadata": {
+                    "page": page,
+                    "page_size": page_size,
+                    "total_items": total_count,
+                    "total_pages": total_pages,
+                    "has_next": page < total_pages,
+                    "has_previous": page > 1
+                }
+            }
 
-        results = await prisma.virtualtryon.find_many(
-            where=filters,
-            skip=skip,
-            take=page_size,
-            order={"created_at": "desc"}
+        return await load_cached(
+            request,
+            cache_key,
+            load_results,
+            message="Virtual try-on results retrieved successfully",
+            cached_message="Virtual try-on results retrieved from cache",
+            group=f"virtual_tryon_{user.id}"
         )
 
-        total_count = await prisma.virtualtryon.count(where=filters)
-        total_pages = math.ceil(total_count / page_size)
+    except HTTPException as httpx:
+        logging.error("HTTPException retrieving virtual try-on list: %s", httpx)
+        raise httpx
 
-        serialized_data = [result.model_dump(mode='json') for result in results]
+    except Exception as e:
+        logging.error("Error retrieving virtual try-on results: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
 
-        response_data = {
-            "items": serialized_data,
-            "metadata": {
-                "page": page,
-                "page_size": page_size,
-                "total_items": total_count,
-                "total_pages": total_pages,
-                "has_next": page < total_pages,
-                "has_previous": page > 1
-            }
-        }
 
-        await redis_client.setex(cache_key, 3600, json.dumps(response_data))
+@router.get("/virtual-tryon/changes")
+async def get_virtual_tryon_changes(
+    since: Optional[str] = Query(None),
+    limit: Optional[int] = Query(200, ge=1, le=MAX_SYNC_LIMIT),
+    prisma: Prisma = Depends(get_prisma),
+    user=Depends(get_current_user)
+):
+    try:
+        changes = await fetch_changes(prisma, "virtualtryon", user.id, since, limit)
 
         return success_response(
-            message="Virtual try-on results retrieved successfully",
-            data=response_data
+            message="Virtual try-on changes retrieved successfully",
+            data=changes
         )
 
     except HTTPException as httpx:
-        logging.error("HTTPException retrieving virtual try-on list: %s", httpx)
+        logging.error("HTTPException retrieving virtual try-on changes: %s", httpx)
         raise httpx
 
     except Exception as e:
-        logging.error("Error retrieving virtual try-on results: %s", e, exc_info=True)
+        logging.error("Error retrieving virtual try-on changes: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/virtual-tryon/{tryon_id}")
 async def get_virtual_tryon_by_id(
     tryon_id: str,
-    prisma: Prisma = Depends(get_prisma),
+    request: Request,
+    prisma: Prisma = Depends(get_read_prisma),
     user=Depends(get_current_user)
 ):
     try:
         cache_key = f"virtual_tryon_{user.id}_{tryon_id}"
-        redis_client = await redis_handler.get_client()
-        cached_data = await redis_client.get(cache_key)
 
-        if cached_data:
-            return success_response(
-                message="Virtual try-on result retrieved from cache",
-                data=json.loads(cached_data)
+        async def load_result():
+            result = await prisma.virtualtryon.find_first(
+                where={
+                    "id": tryon_id,
+                    "user_id": user.id
+                }
             )
 
-        result = await prisma.virtualtryon.find_first(
-            where={
-                "id": tryon_id,
-                "user_id": user.id
-            }
-        )
-
-        if not result:
-            raise HTTPException(status_code=404, detail="Virtual try-on result not found")
+            if not result:
+                raise HTTPException(status_code=404, detail="Virtual try-on result not found")
 
-        result_dict = result.model_dump(mode='json')
-        await redis_client.setex(cache_key, 3600, json.dumps(result_dict))
+            return result.model_dump(mode='json')
 
-        return success_response(
+        return await load_cached(
+            request,
+            cache_key,
+            load_result,
             message="Virtual try-on result retrieved successfully",
-            data=result
+            cached_message="Virtual try-on result retrieved from cache",
+            group=f"virtual_tryon_{user.id}"
         )
 
     except HTTPException as httpx:
@@ -205,19 +222,16 @@ async def delete_virtual_tryon(
         if not existing_tryon:
             raise HTTPException(status_code=404, detail="Virtual try-on result not found")
         
-        result = await prisma.virtualtryon.delete(
-            where={
-                "id": tryon_id,
-                "user_id": user.id
-            }
-        )
-
-        redis_client = await redis_handler.get_client()
-        virtual_tryon_keys = await redis_client.keys(f'virtual_tryon_{user.id}_*')
-        user_info_keys = await redis_client.keys(f'user_info_{user.id}')
-        keys = virtual_tryon_keys + user_info_keys
-        if keys:
-            await redis_client.delete(*keys)
+        async with UnitOfWork(prisma, "virtual_tryon.delete", user_id=user.id) as uow:
+            result = await uow.tx.virtualtryon.delete(
+                where={
+                    "id": tryon_id,
+                    "user_id": user.id
+                }
+            )
+            await uow.tx.tombstone.create_many(data=tombstone_rows("virtualtryon", user.id, [tryon_id]))
+            uow.after_commit(delete_cache_keys, f'virtual_tryon_{user.id}', keys=[f'user_info_{user.id}'])
+            uow.after_commit(update_virtual_tryon_counts, user.id, -1)
 
         return success_response(
             message="Virtual try-on result deleted successfully",
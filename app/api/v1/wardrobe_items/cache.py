@@ -0,0 +1,137 @@
+"""
+Cache keys and write-through maintenance for wardrobe item reads.
+
+List pages record the filters (and sparse fieldset) they were built with in
+their meta hash, so a single-item write can tell which pages it affects:
+pages that contain the item and still match it are patched in place, pages
+whose membership or counts change are dropped, and unrelated pages are left
+alone.
+"""
+import json, orjson
+from typing import Dict, List, Optional
+from app.redis.cache import (
+    cache_group_key, delete_cache_keys, get_cached_bodies, meta_key, patch_cached, store_many, write_through
+)
+from app.redis.redis_client import redis_handler
+from app.utils.fields import fields_key, project
+
+LIST_FILTER_FIELDS = ("category", "type", "brand", "size", "color")
+ITEM_CACHED_MESSAGE = "Wardrobe item retrieved from cache"
+
+
+def wardrobe_list_cache_key(
+    user_id: str, page: int, page_size: int, search, category, item_type, brand, size, color, fields=None
+) -> str:
+    return (
+        f'wardrobe_items_{user_id}_{page}_{page_size}_{search}_{category}_{item_type}_{brand}_{size}_{color}'
+        f'_{fields_key(fields)}'
+    )
+
+
+def wardrobe_list_group(user_id: str) -> str:
+    """Cache group every list page of the user is registered in."""
+    return f"wardrobe_items_{user_id}"
+
+
+def wardrobe_item_cache_key(user_id: str, item_id: str) -> str:
+    return f"wardrobe_item_{user_id}_{item_id}"
+
+
+def _value(value) -> str:
+    return getattr(value, "value", value)
+
+
+def list_page_meta(filters: dict, search: Optional[str], fields=None) -> Dict[str, str]:
+    """Meta fields stored next to a cached list page."""
+    return {
+        "filters": json.dumps({
+            field: _value(filters[field]) for field in LIST_FILTER_FIELDS if filters.get(field) is not None
+        }),
+        "search": "1" if search else "0",
+        "fields": fields_key(fields)
+    }
+
+
+def _matches(item, filters: dict) -> bool:
+    return all(_value(getattr(item, field)) == value for field, value in filters.items())
+
+
+def _replace_item(item_json: dict):
+    def patch(data: dict) -> dict:
+        if all(cached_item["id"] != item_json["id"] for cached_item in data["items"]):
+            return data
+        items = [item_json if cached_item["id"] == item_json["id"] else cached_item for cached_item in data["items"]]
+        return {**data, "items": items}
+    return patch
+
+
+async def refresh_wardrobe_list_pages(user_id: str, before=None, after=None) -> None:
+    """
+    Bring a user's cached list pages up to date after one item changed from
+    `before` to `after` (None for a created or deleted item).
+    """
+    redis_client = await redis_handler.get_client()
+    group_key = cache_group_key(wardrobe_list_group(user_id))
+    keys = list(await redis_client.smembers(group_key))
+    if not keys:
+        return
+
+    pipe = redis_client.pipeline(transaction=False)
+    for key in keys:
+        pipe.hgetall(meta_key(key))
+    metas = await pipe.execute()
+
+    after_json = after.model_dump(mode="json") if after is not None else None
+    stale = []
+    expired = []
+    for key, meta in zip(keys, metas):
+        if not meta:
+            expired.append(key)
+            continue
+        if "filters" not in meta or meta.get("search") == "1":
+            stale.append(key)
+            continue
+
+        filters = json.loads(meta["filters"])
+        was_listed = before is not None and _matches(before, filters)
+        is_listed = after is not None and _matches(after, filters)
+        if not was_listed and not is_listed:
+            continue
+        page_fields = meta.get("fields", "all")
+        item_json = after_json if page_fields == "all" else project(after_json, tuple(page_fields.split(",")))
+        if was_listed and is_listed and await patch_cached(key, _replace_item(item_json)):
+            continue
+        stale.append(key)
+
+    if stale:
+        await delete_cache_keys(keys=stale)
+    if stale or expired:
+        await redis_client.srem(group_key, *stale, *expired)
+
+
+async def refresh_cached_item(user_id: str, before=None, after=None) -> None:
+    """
+    Write-through for a single-item create, update or delete: the detail key
+    gets the new item (or is dropped), and list pages are patched or dropped.
+    """
+    item_id = (after or before).id
+    if after is not None:
+        await write_through(wardrobe_item_cache_key(user_id, item_id), after.model_dump(mode="json"), ITEM_CACHED_MESSAGE)
+    else:
+        await delete_cache_keys(keys=[wardrobe_item_cache_key(user_id, item_id)])
+    await refresh_wardrobe_list_pages(user_id, before, after)
+
+
+async def get_cached_items(user_id: str, item_ids: List[str]) -> Dict[str, dict]:
+    """Cached items among `item_ids`, by id, read with one MGET."""
+    bodies = await get_cached_bodies([wardrobe_item_cache_key(user_id, item_id) for item_id in item_ids])
+    return {item_id: orjson.loads(body)["data"] for item_id, body in zip(item_ids, bodies) if body is not None}
+
+
+async def cache_items(user_id: str, items: Dict[str, dict]) -> None:
+    """Backfill the detail entries of items loaded from the database."""
+    if items:
+        await store_many(
+            {wardrobe_item_cache_key(user_id, item_id): item for item_id, item in items.items()},
+            ITEM_CACHED_MESSAGE
+        )
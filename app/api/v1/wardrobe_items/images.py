@@ -0,0 +1,116 @@
+import asyncio, anyio.to_thread
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from prisma import Prisma
+from app.cloud.gcp.storage import upload_file_to_gcs
+from app.db.unit_of_work import TX_TIMEOUT_MS
+from app.redis.counters import get_wardrobe_generation
+from app.vision.features import extract_image_features
+from app.vision.phash import HASH_ENTRY_BYTES, HashIndex, find_duplicates, hash_indexes
+from env import env
+
+# updated_at is stamped when the statement runs, so a row can commit up to a
+# transaction timeout after its timestamp.
+HASH_SYNC_MARGIN = timedelta(milliseconds=TX_TIMEOUT_MS, seconds=5)
+
+
+async def describe_item_image(content: bytes) -> Optional[dict]:
+    """
+    Compute the visual features (WardrobeItemFeature columns) of an item
+    image in a worker thread.
+    """
+    return await anyio.to_thread.run_sync(extract_image_features, content)
+
+
+async def store_item_image(
+    content: bytes,
+    content_type: Optional[str] = None,
+    filename: Optional[str] = None
+) -> Tuple[str, Optional[dict]]:
+    """
+    Upload a wardrobe item image and compute its visual features concurrently.
+    """
+    file_url, features = await asyncio.gather(
+        upload_item_image(content, content_type=content_type, filename=filename),
+        describe_item_image(content)
+    )
+    return file_url, features
+
+
+async def upload_item_image(
+    content: bytes,
+    content_type: Optional[str] = None,
+    filename: Optional[str] = None
+) -> str:
+    return await upload_file_to_gcs(
+        file=content,
+        bucket_name=env.GOOGLE_STORAGE_MEDIA_BUCKET,
+        folder_name="wardrobe-items",
+        content_type=content_type,
+        filename=filename
+    )
+
+
+async def _read_hashes(prisma: Prisma, user_id: str, since: Optional[datetime] = None) -> List[dict]:
+    """Item ids and image hashes only; the descriptors are never read here."""
+    if since is None:
+        return await prisma.query_raw(
+            'SELECT item_id, image_hash FROM "WardrobeItemFeature" '
+            "WHERE user_id = $1 AND image_hash IS NOT NULL",
+            user_id
+        )
+    return await prisma.query_raw(
+        'SELECT item_id, image_hash FROM "WardrobeItemFeature" '
+        "WHERE user_id = $1 AND image_hash IS NOT NULL AND updated_at >= $2::timestamp",
+        user_id, since.replace(tzinfo=None).isoformat()
+    )
+
+
+async def load_hash_index(prisma: Prisma, user_id: str) -> HashIndex:
+    """
+    Return the user's image hash index, current as of the wardrobe generation.
+    A cold start reads every hash. After a write, from any worker, only the
+    feature rows updated since the last read are added, reaching back
+    HASH_SYNC_MARGIN so rows stamped before a slow commit are not missed.
+    Rows removed since are dropped when a search finds them (see
+    `find_duplicate_items`).
+    """
+    generation = await get_wardrobe_generation(prisma, user_id)
+    index = hash_indexes.get(user_id)
+    if index is not None and index.generation == generation:
+        return index
+
+    synced_at = datetime.now(timezone.utc)
+    if index is None:
+        index = HashIndex((row["item_id"], row["image_hash"]) for row in await _read_hashes(prisma, user_id))
+        hash_indexes.set(user_id, index, max(len(index), 1) * HASH_ENTRY_BYTES)
+    else:
+        for row in await _read_hashes(prisma, user_id, since=index.synced_at - HASH_SYNC_MARGIN):
+            index.add(row["item_id"], row["image_hash"])
+    index.generation, index.synced_at = generation, synced_at
+    return index
+
+
+async def find_duplicate_items(prisma: Prisma, user_id: str, image_hash: str) -> List[Dict]:
+    """
+    Return the user's items whose image hash is within the near-duplicate
+    distance, looked up in the user's BK-tree. Matches are checked against
+    the table, so deleted items and replaced images are never reported.
+    """
+    index = await load_hash_index(prisma, user_id)
+    matches = find_duplicates(index, image_hash)
+    if not matches:
+        return matches
+
+    rows = await prisma.query_raw(
+        'SELECT item_id, image_hash FROM "WardrobeItemFeature" WHERE user_id = $1 AND item_id = ANY($2)',
+        user_id, [match["item_id"] for match in matches]
+    )
+    current = {row["item_id"]: row["image_hash"] for row in rows}
+    for match in matches:
+        item_id = match["item_id"]
+        if current.get(item_id) is None:
+            index.remove(item_id)
+        elif int(current[item_id], 16) != index.hashes.get(item_id):
+            index.add(item_id, current[item_id])
+    return find_duplicates(index, image_hash)
@@ -0,0 +1,293 @@
+import anyio.to_thread, csv, io, logging, mimetypes, os, tempfile, time, uuid, zipfile
+from typing import Dict, Iterator, List, Optional, Tuple
+from fastapi import HTTPException, UploadFile
+from prisma import Prisma
+from prisma.enums import ItemCategory, ItemType, Size, Color
+from app.db.unit_of_work import UnitOfWork
+from app.redis.redis_client import redis_handler
+from app.redis.cache import delete_cache_keys
+from app.redis.counters import update_wardrobe_item_counts
+from app.api.v1.wardrobe_items.cache import wardrobe_list_group
+from app.api.v1.wardrobe_items.images import store_item_image
+from app.utils.concurrency import gather_with_concurrency
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 25
+IMPORT_UPLOAD_CONCURRENCY = 8
+IMPORT_JOB_TTL = 86400
+MAX_IMPORT_ENTRIES = 5000
+MAX_ARCHIVE_SIZE = 1024 * 1024 * 1024
+MAX_MANIFEST_SIZE = 10 * 1024 * 1024
+MAX_IMAGE_SIZE = 15 * 1024 * 1024
+MAX_REPORTED_ERRORS = 100
+SPOOL_CHUNK_SIZE = 1024 * 1024
+IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
+MANIFEST_NAME = "manifest.csv"
+
+MANIFEST_FIELDS = {
+    "category": ItemCategory,
+    "type": ItemType,
+    "size": Size,
+    "color": Color,
+}
+
+
+def import_job_key(user_id: str, job_id: str) -> str:
+    return f"wardrobe_import_{user_id}_{job_id}"
+
+
+async def spool_upload(upload: UploadFile, suffix: str, max_size: int) -> str:
+    """
+    Copy an upload to a temporary file in fixed-size chunks, so the archive is
+    never held in memory, and return the file path. Uploads larger than
+    `max_size` are rejected with a 413 once that much has been read; the
+    file is removed on any failure.
+    """
+    handle, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(handle, "wb") as target:
+            size = 0
+            while chunk := await upload.read(SPOOL_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise HTTPException(
+                        status_code=413, detail=f"Upload exceeds the {max_size // (1024 * 1024)} MB limit"
+                    )
+                await anyio.to_thread.run_sync(target.write, chunk)
+    except BaseException:
+        discard_spooled(path)
+        raise
+    return path
+
+
+def discard_spooled(*paths: Optional[str]) -> None:
+    for path in paths:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+async def create_import_job(user_id: str) -> str:
+    job_id = str(uuid.uuid4())
+    key = import_job_key(user_id, job_id)
+    redis_client = await redis_handler.get_client()
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(key, mapping={
+            "job_id": job_id,
+            "status": "queued",
+            "total": 0,
+            "processed": 0,
+            "created": 0,
+            "failed": 0,
+        })
+        pipe.expire(key, IMPORT_JOB_TTL)
+        await pipe.execute()
+    return job_id
+
+
+async def get_import_job(user_id: str, job_id: str) -> Optional[dict]:
+    key = import_job_key(user_id, job_id)
+    redis_client = await redis_handler.get_client()
+    job = await redis_client.hgetall(key)
+    if not job:
+        return None
+
+    for field in ("total", "processed", "created", "failed"):
+        job[field] = int(job.get(field, 0))
+    if "items_per_second" in job:
+        job["items_per_second"] = float(job["items_per_second"])
+    job["errors"] = await redis_client.lrange(f"{key}_errors", 0, -1)
+    return job
+
+
+def _parse_enum(enum, value: Optional[str]):
+    if not value or not value.strip():
+        return None
+    name = value.strip().upper().replace(" ", "_").replace("-", "_")
+    try:
+        return enum(name)
+    except ValueError:
+        raise ValueError(f"invalid {enum.__name__} '{value}'")
+
+
+def _read_manifest(lines: Iterator[str]) -> Dict[str, dict]:
+    """
+    Index manifest rows (filename, category, type, brand, size, color) by
+    the image file name.
+    """
+    manifest = {}
+    for row in csv.DictReader(lines):
+        row = {(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+        if row.get("filename"):
+            manifest[os.path.basename(row["filename"])] = row
+    return manifest
+
+
+def _load_manifest(archive: zipfile.ZipFile, manifest_path: Optional[str]) -> Dict[str, dict]:
+    if manifest_path:
+        with open(manifest_path, newline="", encoding="utf-8-sig") as manifest_file:
+            return _read_manifest(manifest_file)
+    names = {os.path.basename(name).lower(): name for name in archive.namelist()}
+    if MANIFEST_NAME in names:
+        with archive.open(names[MANIFEST_NAME]) as raw:
+            return _read_manifest(io.TextIOWrapper(raw, encoding="utf-8-sig", newline=""))
+    return {}
+
+
+def _image_entries(archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    entries = []
+    for info in archive.infolist():
+        name = os.path.basename(info.filename)
+        if info.is_dir() or name.startswith(".") or "__MACOSX" in info.filename:
+            continue
+        if "." in name and name.rsplit(".", 1)[1].lower() in IMAGE_EXTENSIONS:
+            entries.append(info)
+    return entries
+
+
+def _item_data(user_id: str, row: dict, default_category: Optional[ItemCategory]) -> dict:
+    data = {"id": str(uuid.uuid4()), "user_id": user_id}
+    for field, enum in MANIFEST_FIELDS.items():
+        value = _parse_enum(enum, row.get(field))
+        if value is not None:
+            data[field] = value
+    if row.get("brand"):
+        data["brand"] = row["brand"]
+    data.setdefault("category", default_category)
+    if data["category"] is None:
+        raise ValueError("missing category")
+    return data
+
+
+async def _record_progress(key: str, created: int, failed: int, errors: List[str], started: float) -> None:
+    redis_client = await redis_handler.get_client()
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hincrby(key, "processed", created + failed)
+        pipe.hincrby(key, "created", created)
+        pipe.hincrby(key, "failed", failed)
+        if errors:
+            pipe.rpush(f"{key}_errors", *errors)
+            pipe.ltrim(f"{key}_errors", 0, MAX_REPORTED_ERRORS - 1)
+            pipe.expire(f"{key}_errors", IMPORT_JOB_TTL)
+        processed, _, _ = (await pipe.execute())[:3]
+
+    elapsed = max(time.monotonic() - started, 1e-6)
+    await redis_client.hset(key, "items_per_second", round(processed / elapsed, 2))
+
+
+async def _import_batch(
+    prisma: Prisma,
+    archive: zipfile.ZipFile,
+    user_id: str,
+    batch: List[Tuple[zipfile.ZipInfo, dict]]
+) -> Tuple[list, List[str]]:
+    errors = []
+
+    async def upload(info: zipfile.ZipInfo) -> Tuple[str, Optional[dict]]:
+        if info.file_size > MAX_IMAGE_SIZE:
+            raise ValueError("image exceeds the size limit")
+        content = await anyio.to_thread.run_sync(archive.read, info)
+        name = os.path.basename(info.filename)
+        return await store_item_image(
+            content,
+            content_type=mimetypes.guess_type(name)[0],
+            filename=name
+        )
+
+    stored_images = await gather_with_concurrency(
+        IMPORT_UPLOAD_CONCURRENCY, (upload(info) for info, _ in batch)
+    )
+
+    rows, feature_rows = [], []
+    for (info, data), stored in zip(batch, stored_images):
+        if isinstance(stored, Exception):
+            errors.append(f"{info.filename}: {getattr(stored, 'detail', stored)}")
+            continue
+        image_url, features = stored
+        rows.append({**data, "image_url": image_url})
+        if features:
+            feature_rows.append({"item_id": data["id"], "user_id": user_id, **features})
+
+    if not rows:
+        return [], errors
+
+    async with UnitOfWork(prisma, "wardrobe_items.import", user_id=user_id) as uow:
+        await uow.tx.wardrobeitem.create_many(data=rows)
+        if feature_rows:
+            await uow.tx.wardrobeitemfeature.create_many(data=feature_rows)
+        created = await uow.tx.wardrobeitem.find_many(
+            where={"id": {"in": [row["id"] for row in rows]}, "user_id": user_id}
+        )
+    return created, errors
+
+
+async def run_import(
+    prisma: Prisma,
+    user_id: str,
+    job_id: str,
+    archive_path: str,
+    manifest_path: Optional[str] = None,
+    default_category: Optional[ItemCategory] = None
+) -> None:
+    """
+    Import every image of a ZIP archive as a wardrobe item.
+
+    Entries are read one batch at a time from the spooled archive, uploaded
+    concurrently and inserted with one create_many per batch, so memory stays
+    bounded by the batch size rather than the archive size.
+    """
+    key = import_job_key(user_id, job_id)
+    redis_client = await redis_handler.get_client()
+    started = time.monotonic()
+    imported = 0
+
+    try:
+        with zipfile.ZipFile(archive_path) as archive:
+            manifest = _load_manifest(archive, manifest_path)
+            entries = _image_entries(archive)
+            async with redis_client.pipeline(transaction=True) as pipe:
+                if len(entries) > MAX_IMPORT_ENTRIES:
+                    pipe.rpush(
+                        f"{key}_errors",
+                        f"archive has {len(entries)} images; only the first {MAX_IMPORT_ENTRIES} were imported"
+                    )
+                    pipe.expire(f"{key}_errors", IMPORT_JOB_TTL)
+                    entries = entries[:MAX_IMPORT_ENTRIES]
+                pipe.hset(key, mapping={"status": "running", "total": len(entries)})
+                await pipe.execute()
+
+            for offset in range(0, len(entries), IMPORT_BATCH_SIZE):
+                batch, errors = [], []
+                for info in entries[offset:offset + IMPORT_BATCH_SIZE]:
+                    row = manifest.get(os.path.basename(info.filename), {})
+                    try:
+                        batch.append((info, _item_data(user_id, row, default_category)))
+                    except ValueError as ve:
+                        errors.append(f"{info.filename}: {ve}")
+
+                created, upload_errors = await _import_batch(prisma, archive, user_id, batch)
+                errors.extend(upload_errors)
+                if created:
+                    imported += len(created)
+                    await update_wardrobe_item_counts(user_id, added=created)
+                await _record_progress(key, len(created), len(errors), errors, started)
+
+        await redis_client.hset(key, "status", "completed")
+        logger.info(
+            "Wardrobe import %s finished: %d items in %.1fs",
+            job_id, imported, time.monotonic() - started
+        )
+
+    except zipfile.BadZipFile:
+        logger.error("Wardrobe import %s received an invalid archive", job_id)
+        await redis_client.hset(key, mapping={"status": "failed", "error": "Invalid ZIP archive"})
+
+    except Exception as e:
+        logger.error("Error running wardrobe import %s: %s", job_id, e, exc_info=True)
+        await redis_client.hset(key, mapping={"status": "failed", "error": str(e)})
+
+    finally:
+        if imported:
+            await delete_cache_keys(wardrobe_list_group(user_id))
+        discard_spooled(archive_path, manifest_path)
@@ -0,0 +1,95 @@
+"""
+Wardrobe list pages rendered to JSON by Postgres.
+
+The ORM path builds a model per row, dumps each one to a dict and encodes the
+dicts again. Here a single query serializes the page with row_to_json, and
+the text it returns is used as the response data as is. Rows are rendered
+exactly like `model_dump(mode="json")` (same keys and order, UTC timestamps
+with a Z suffix, relation fields as null), so cached pages are byte-for-byte
+the same whichever path built them. With a sparse fieldset only the
+requested columns are read into the JSON.
+"""
+import orjson
+from typing import Optional, Tuple
+from prisma import Prisma
+from app.redis.cache import RawJSON
+
+FILTER_COLUMNS = {
+    "category": '"ItemCategory"',
+    "type": '"ItemType"',
+    "size": '"Size"',
+    "color": '"Color"',
+}
+
+
+def _iso(column: str) -> str:
+    """Format a timestamp(3) column the way pydantic serializes a UTC datetime."""
+    return (
+        f"to_char(page.{column}, 'YYYY-MM-DD\"T\"HH24:MI:SS') || "
+        f"CASE WHEN date_part('microseconds', page.{column})::int % 1000000 = 0 THEN '' "
+        f"ELSE to_char(page.{column}, '.US') END || 'Z'"
+    )
+
+
+# Every WardrobeItem field in model order, with the SQL rendering it.
+ITEM_COLUMNS = {
+    "id": "page.id",
+    "user_id": "page.user_id",
+    "category": "page.category",
+    "type": "page.type",
+    "brand": "page.brand",
+    "size": "page.size",
+    "color": "page.color",
+    "image_url": "page.image_url",
+    "created_at": _iso("created_at"),
+    "updated_at": _iso("updated_at"),
+    "user": "NULL",
+    "features": "NULL",
+}
+RELATION_FIELDS = ("user", "features")
+
+
+def _build_where(filters: dict) -> tuple:
+    params: list = [filters["user_id"]]
+    conditions = ["user_id = $1"]
+    for column, enum_type in FILTER_COLUMNS.items():
+        if column in filters:
+            value = filters[column]
+            params.append(getattr(value, "value", value))
+            conditions.append(f"{column} = ${len(params)}::{enum_type}")
+    if "brand" in filters:
+        params.append(filters["brand"])
+        conditions.append(f"brand = ${len(params)}")
+    return " AND ".join(conditions), params
+
+
+async def fetch_wardrobe_page_json(
+    prisma: Prisma,
+    filters: dict,
+    skip: int,
+    take: int,
+    metadata: dict,
+    fields: Optional[Tuple[str, ...]] = None
+) -> RawJSON:
+    """
+    Return `{"items": [...], "metadata": ...}` for one list page, newest first,
+    as JSON rendered in a single round trip.
+    """
+    where, params = _build_where(filters)
+    limit = len(params) + 1
+    selected = [field for field in ITEM_COLUMNS if fields is None or field in fields]
+    table_columns = {"created_at"} | {field for field in selected if field not in RELATION_FIELDS}
+    columns = ", ".join(f'{ITEM_COLUMNS[field]} AS "{field}"' for field in selected)
+
+    row = await prisma.query_first(
+        "WITH page AS ("
+        f'SELECT {", ".join(sorted(table_columns))} FROM "WardrobeItem" WHERE {where} '
+        f"ORDER BY created_at DESC LIMIT ${limit} OFFSET ${limit + 1}"
+        ") "
+        "SELECT '[' || COALESCE(string_agg(row_to_json(item)::text, ',' ORDER BY page.created_at DESC), '') || ']' AS items "
+        "FROM page CROSS JOIN LATERAL ("
+        f"SELECT {columns}"
+        ") AS item",
+        *params, take, skip
+    )
+    return RawJSON(b'{"items":' + row["items"].encode() + b',"metadata":' + orjson.dumps(metadata) + b"}")
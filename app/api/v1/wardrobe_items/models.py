@@ -0,0 +1,58 @@
+from enum import Enum
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+from prisma.enums import ItemCategory, ItemType, Size, Color
+
+MAX_BULK_ITEMS = 50
+MAX_BATCH_GET_ITEMS = 100
+# Columns a `fields=` sparse fieldset may ask for. Relations are never exposed.
+WARDROBE_ITEM_FIELDS = (
+    "id", "user_id", "category", "type", "brand", "size", "color", "image_url", "created_at", "updated_at",
+)
+
+
+class DuplicatePolicy(str, Enum):
+    FLAG = "flag"      # create the item and report the near-duplicates
+    REJECT = "reject"  # refuse the upload with 409
+    MERGE = "merge"    # fill empty fields of the existing item instead of creating one
+
+
+class BulkItemCreate(BaseModel):
+    category: ItemCategory
+    type: Optional[ItemType] = None
+    brand: Optional[str] = None
+    size: Optional[Size] = None
+    color: Optional[Color] = None
+    image: Optional[str] = None  # filename of one of the uploaded images
+
+
+class BulkItemUpdate(BaseModel):
+    id: str
+    category: Optional[ItemCategory] = None
+    type: Optional[ItemType] = None
+    brand: Optional[str] = None
+    size: Optional[Size] = None
+    color: Optional[Color] = None
+
+
+class BulkItemUpdateRequest(BaseModel):
+    items: List[BulkItemUpdate] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+    @field_validator("items")
+    @classmethod
+    def unique_ids(cls, items: List[BulkItemUpdate]) -> List[BulkItemUpdate]:
+        # Counter deltas are computed per row, so an id may only be updated once.
+        seen, duplicates = set(), set()
+        for item in items:
+            (duplicates if item.id in seen else seen).add(item.id)
+        if duplicates:
+            raise ValueError(f"Duplicate item ids: {', '.join(sorted(duplicates))}")
+        return items
+
+
+class BulkItemDeleteRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BULK_ITEMS)
+
+
+class BatchGetRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH_GET_ITEMS)
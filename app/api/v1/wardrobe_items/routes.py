@@ -1,27 +1,61 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
-from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, UploadFile, File, Form
+from pydantic import ValidationError
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
 from prisma import Prisma
 from prisma.enums import ItemCategory, ItemType, Size, Color
 from app.db.prisma_client import PrismaClient
-from app.redis.redis_client import redis_handler
+from app.db.loader import DataLoader, get_loader
+from app.db.routing import get_read_prisma
+from app.db.sync import MAX_SYNC_LIMIT, SYNC_SETTLE_SECONDS, fetch_changes, tombstone_rows
+from app.db.unit_of_work import UnitOfWork
+from app.redis.cache import delete_cache_keys, load_cached
+from app.redis.counters import (
+    get_wardrobe_item_count, get_wardrobe_facets, get_wardrobe_generation, update_wardrobe_item_counts
+)
 from app.api.v1.user.auth.routes.user import get_current_user
-from app.cloud.gcp.storage import upload_file_to_gcs, delete_file_from_gcs
+from app.api.v1.wardrobe_items.models import (
+    BatchGetRequest, BulkItemCreate, BulkItemUpdateRequest, BulkItemDeleteRequest, DuplicatePolicy, MAX_BULK_ITEMS,
+    WARDROBE_ITEM_FIELDS
+)
+from app.api.v1.wardrobe_items.images import (
+    describe_item_image, find_duplicate_items, store_item_image, upload_item_image
+)
+from app.api.v1.wardrobe_items.cache import (
+    ITEM_CACHED_MESSAGE, cache_items, get_cached_items, list_page_meta, refresh_cached_item,
+    wardrobe_item_cache_key, wardrobe_list_cache_key, wardrobe_list_group
+)
+from app.api.v1.wardrobe_items.importer import (
+    MAX_ARCHIVE_SIZE, MAX_MANIFEST_SIZE, create_import_job, discard_spooled, get_import_job, run_import, spool_upload
+)
+from app.jobs.color_tagging import tag_new_items
+from app.api.v1.wardrobe_items.search import search_wardrobe_items, suggest_wardrobe_terms
+from app.api.v1.wardrobe_items.json_queries import fetch_wardrobe_page_json
+from app.cloud.gcp.storage import delete_file_from_gcs
+from app.vision.similarity import SimilarityIndex, similarity_indexes
 from app.utils.success_handler import success_response
+from app.utils.fields import parse_fields, project
+from app.utils.concurrency import gather_with_concurrency
 from env import env
-import logging, math, json
+import logging, math, json, uuid
 
 
 router = APIRouter()
 
+BULK_UPLOAD_CONCURRENCY = 8
+
 
 @router.post("/wardrobe-items")
 async def create_wardrobe_items(
     item_category: ItemCategory,
+    response: Response,
+    background_tasks: BackgroundTasks,
     item_type: Optional[ItemType] = None,
     item_brand: Optional[str] = None,
     item_size: Optional[Size] = None,
     item_color: Optional[Color] = None,
     image: Optional[UploadFile] = File(None),
+    on_duplicate: DuplicatePolicy = DuplicatePolicy.FLAG,
     prisma: Prisma = Depends(PrismaClient.get_instance),
     user=Depends(get_current_user)
 ):
@@ -30,6 +64,7 @@ async def create_wardrobe_items(
             "user_id": user.id,
             "category": item_category
         }
+        duplicates = []
         if item_type:
             data["type"] = item_type
         if item_brand:
@@ -41,24 +76,42 @@ async def create_wardrobe_items(
         if image:
             file_name = image.filename
             file_content = await image.read()
-            file_url = await upload_file_to_gcs(
-                file=file_content,
-                bucket_name=env.GOOGLE_STORAGE_MEDIA_BUCKET,
-                folder_name="wardrobe-items",
+            features = await describe_item_image(file_content)
+            if features:
+                duplicates = await find_duplicate_items(prisma, user.id, features["image_hash"])
+
+            if duplicates and on_duplicate == DuplicatePolicy.REJECT:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Image duplicates wardrobe item {duplicates[0]['item_id']}"
+                )
+            if duplicates and on_duplicate == DuplicatePolicy.MERGE:
+                return await merge_into_duplicate(prisma, user, duplicates[0]["item_id"], data)
+
+            file_url = await upload_item_image(
+                file_content,
                 content_type=image.content_type,
                 filename=file_name
             )
             data["image_url"] = file_url
+            if features:
+                data["features"] = {"create": {"user_id": user.id, **features}}
+
+        async with UnitOfWork(prisma, "wardrobe_items.create", user_id=user.id) as uow:
+            item = await uow.tx.wardrobeitem.create(data=data)
+            uow.after_commit(update_wardrobe_item_counts, user.id, added=[item])
+            uow.after_commit(refresh_cached_item, user.id, after=item)
 
-        async with prisma.tx(timeout=65000, max_wait=80000) as tx:
-            item = await tx.wardrobeitem.create(data=data)
-            redis_client = await redis_handler.get_client()
-            keys = await redis_client.keys(f'wardrobe_items_{user.id}_*')
-            if keys:
-                await redis_client.delete(*keys)
+        if image and not item_color:
+            background_tasks.add_task(tag_new_items, prisma, [(item, file_content)])
+
+        message = "Wardrobe item created successfully"
+        if duplicates:
+            response.headers["X-Duplicate-Items"] = ",".join(d["item_id"] for d in duplicates)
+            message = f"Wardrobe item created successfully, possible duplicate of {len(duplicates)} item(s)"
 
         return success_response(
-            message="Wardrobe item created successfully",
+            message=message,
             data=item
         )
 
@@ -71,9 +124,387 @@ async def create_wardrobe_items(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def merge_into_duplicate(prisma: Prisma, user, item_id: str, data: dict):
+    """
+    Fill the empty attributes of an existing item from a duplicate upload
+    instead of creating a second item.
+    """
+    existing_item = await prisma.wardrobeitem.find_first(
+        where={
+            "id": item_id,
+            "user_id": user.id
+        }
+    )
+    if not existing_item:
+        raise HTTPException(status_code=404, detail="Wardrobe item not found")
+
+    updates = {
+        field: data[field] for field in ("type", "brand", "size", "color")
+        if field in data and getattr(existing_item, field) is None
+    }
+    if not updates:
+        return success_response(
+            message="Duplicate image, existing wardrobe item returned",
+            data=existing_item
+        )
+
+    async with UnitOfWork(prisma, "wardrobe_items.merge", user_id=user.id) as uow:
+        item = await uow.tx.wardrobeitem.update(
+            where={
+                "id": item_id,
+                "user_id": user.id
+            },
+            data=updates
+        )
+        uow.after_commit(update_wardrobe_item_counts, user.id, added=[item], removed=[existing_item])
+        uow.after_commit(refresh_cached_item, user.id, before=existing_item, after=item)
+
+    return success_response(
+        message="Duplicate image, merged into existing wardrobe item",
+        data=item
+    )
+
+
+@router.post("/wardrobe-items/bulk")
+async def bulk_create_wardrobe_items(
+    background_tasks: BackgroundTasks,
+    items: str = Form(..., description="JSON array of items; `image` refers to an uploaded filename"),
+    images: Optional[List[UploadFile]] = File(None),
+    prisma: Prisma = Depends(PrismaClient.get_instance),
+    user=Depends(get_current_user)
+):
+    try:
+        try:
+            raw_items = json.loads(items)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="items must be a JSON array")
+        if not isinstance(raw_items, list) or not raw_items:
+            raise HTTPException(status_code=400, detail="items must be a non-empty JSON array")
+        if len(raw_items) > MAX_BULK_ITEMS:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_ITEMS} items per request")
+
+        uploads = {}
+        for image in images or []:
+            uploads.setdefault(image.filename, image)
+
+        results = [None] * len(raw_items)
+        pending = []
+        for index, raw_item in enumerate(raw_items):
+            try:
+                item = BulkItemCreate.model_validate(raw_item)
+            except ValidationError as ve:
+                results[index] = {"index": index, "success": False, "error": str(ve.errors()[0].get("msg"))}
+                continue
+            if item.image and item.image not in uploads:
+                results[index] = {"index": index, "success": False, "error": f"Image {item.image} was not uploaded"}
+                continue
+            pending.append((index, item))
+
+        contents = {}
+
+        async def upload(item: BulkItemCreate) -> Tuple[Optional[str], Optional[dict]]:
+            if not item.image:
+                return None, None
+            image = uploads[item.image]
+            await image.seek(0)
+            contents[item.image] = await image.read()
+            return await store_item_image(
+                contents[item.image],
+                content_type=image.content_type,
+                filename=image.filename
+            )
+
+        stored_images = await gather_with_concurrency(
+            BULK_UPLOAD_CONCURRENCY, (upload(item) for _, item in pending)
+        )
+
+        rows = {}
+        feature_rows = []
+        for (index, item), stored in zip(pending, stored_images):
+            if isinstance(stored, Exception):
+                detail = getattr(stored, "detail", str(stored))
+                results[index] = {"index": index, "success": False, "error": detail}
+                continue
+            image_url, features = stored
+            data = {"id": str(uuid.uuid4()), "user_id": user.id}
+            data.update(item.model_dump(exclude={"image"}, exclude_none=True))
+            if image_url:
+                data["image_url"] = image_url
+            if features:
+                feature_rows.append({"item_id": data["id"], "user_id": user.id, **features})
+            rows[index] = data
+
+        if rows:
+            async with UnitOfWork(prisma, "wardrobe_items.bulk_create", user_id=user.id) as uow:
+                await uow.tx.wardrobeitem.create_many(data=list(rows.values()))
+                if feature_rows:
+                    await uow.tx.wardrobeitemfeature.create_many(data=feature_rows)
+                created = await uow.tx.wardrobeitem.find_many(
+                    where={"id": {"in": [data["id"] for data in rows.values()]}, "user_id": user.id}
+                )
+                uow.after_commit(delete_cache_keys, wardrobe_list_group(user.id))
+                uow.after_commit(update_wardrobe_item_counts, user.id, added=created)
+
+            created_by_id = {item.id: item for item in created}
+            for index, data in rows.items():
+                results[index] = {"index": index, "success": True, "data": created_by_id.get(data["id"])}
+
+            untagged = [
+                (created_by_id[rows[index]["id"]], contents[item.image])
+                for index, item in pending
+                if index in rows and item.image and rows[index]["id"] in created_by_id
+            ]
+            if untagged:
+                background_tasks.add_task(tag_new_items, prisma, untagged)
+
+        return success_response(
+            message=f"{len(rows)} of {len(raw_items)} wardrobe items created",
+            data=results
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTP error while bulk creating wardrobe items: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error bulk creating wardrobe items: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.patch("/wardrobe-items/bulk")
+async def bulk_update_wardrobe_items(
+    request: BulkItemUpdateRequest,
+    prisma: Prisma = Depends(PrismaClient.get_instance),
+    user=Depends(get_current_user)
+):
+    try:
+        ids = [item.id for item in request.items]
+        existing_items = await prisma.wardrobeitem.find_many(
+            where={"id": {"in": ids}, "user_id": user.id}
+        )
+        existing_by_id = {item.id: item for item in existing_items}
+
+        results = []
+        updates = []
+        for index, item in enumerate(request.items):
+            data = item.model_dump(exclude={"id"}, exclude_none=True)
+            if item.id not in existing_by_id:
+                results.append({"index": index, "id": item.id, "success": False, "error": "Wardrobe item not found"})
+            elif not data:
+                results.append({"index": index, "id": item.id, "success": False, "error": "No fields to update"})
+            else:
+                results.append(None)
+                updates.append((index, item.id, data))
+
+        updated_items = {}
+        if updates:
+            async with UnitOfWork(prisma, "wardrobe_items.bulk_update", user_id=user.id) as uow:
+                for index, item_id, data in updates:
+                    updated = await uow.tx.wardrobeitem.update(
+                        where={"id": item_id, "user_id": user.id},
+                        data=data
+                    )
+                    updated_items[item_id] = updated
+                    results[index] = {"index": index, "id": item_id, "success": True, "data": updated}
+
+                # Deltas go from each distinct item's original row to its final row.
+                uow.after_commit(
+                    delete_cache_keys,
+                    wardrobe_list_group(user.id),
+                    keys=[wardrobe_item_cache_key(user.id, item_id) for item_id in updated_items]
+                )
+                uow.after_commit(
+                    update_wardrobe_item_counts,
+                    user.id,
+                    added=list(updated_items.values()),
+                    removed=[existing_by_id[item_id] for item_id in updated_items]
+                )
+
+        return success_response(
+            message=f"{len(updated_items)} of {len(request.items)} wardrobe items updated",
+            data=results
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTP error while bulk updating wardrobe items: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error bulk updating wardrobe items: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/wardrobe-items/bulk")
+async def bulk_delete_wardrobe_items(
+    request: BulkItemDeleteRequest,
+    prisma: Prisma = Depends(PrismaClient.get_instance),
+    user=Depends(get_current_user)
+):
+    try:
+        existing_items = await prisma.wardrobeitem.find_many(
+            where={"id": {"in": request.ids}, "user_id": user.id}
+        )
+        existing_by_id = {item.id: item for item in existing_items}
+
+        if existing_items:
+            async with UnitOfWork(prisma, "wardrobe_items.bulk_delete", user_id=user.id) as uow:
+                await uow.tx.wardrobeitem.delete_many(
+                    where={"id": {"in": list(existing_by_id)}, "user_id": user.id}
+                )
+                await uow.tx.tombstone.create_many(data=tombstone_rows("wardrobeitem", user.id, existing_by_id))
+                uow.after_commit(
+                    delete_cache_keys,
+                    wardrobe_list_group(user.id),
+                    keys=[wardrobe_item_cache_key(user.id, item_id) for item_id in existing_by_id]
+                )
+                uow.after_commit(update_wardrobe_item_counts, user.id, removed=existing_items)
+
+            image_deletions = await gather_with_concurrency(
+                BULK_UPLOAD_CONCURRENCY,
+                (
+                    delete_file_from_gcs(file_url=item.image_url, bucket_name=env.GOOGLE_STORAGE_MEDIA_BUCKET)
+                    for item in existing_items if item.image_url
+                )
+            )
+            for outcome in image_deletions:
+                if isinstance(outcome, Exception):
+                    logging.warning("Could not delete wardrobe item image: %s", outcome)
+
+        results = [
+            {"index": index, "id": item_id, "success": True}
+            if item_id in existing_by_id else
+            {"index": index, "id": item_id, "success": False, "error": "Wardrobe item not found"}
+            for index, item_id in enumerate(request.ids)
+        ]
+
+        return success_response(
+            message=f"{len(existing_items)} of {len(request.ids)} wardrobe items deleted",
+            data=results
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTP error while bulk deleting wardrobe items: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error bulk deleting wardrobe items: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/wardrobe-items/batch-get")
+async def batch_get_wardrobe_items(
+    request: BatchGetRequest,
+    loader: DataLoader = Depends(get_loader),
+    user=Depends(get_current_user)
+):
+    try:
+        item_ids = list(dict.fromkeys(request.ids))
+        items = await get_cached_items(user.id, item_ids)
+
+        missing = [item_id for item_id in item_ids if item_id not in items]
+        if missing:
+            # The loader looks items up by id only; other users' items count as not found.
+            loaded = await loader.load_many("wardrobeitem", missing)
+            loaded_items = {
+                item.id: item.model_dump(mode='json')
+                for item in loaded if item is not None and item.user_id == user.id
+            }
+            await cache_items(user.id, loaded_items)
+            items.update(loaded_items)
+
+        results = [
+            {"index": index, "id": item_id, "success": True, "data": items[item_id]}
+            if item_id in items else
+            {"index": index, "id": item_id, "success": False, "error": "Wardrobe item not found"}
+            for index, item_id in enumerate(request.ids)
+        ]
+
+        return success_response(
+            message=f"{sum(item_id in items for item_id in request.ids)} of {len(request.ids)} wardrobe items retrieved",
+            data=results
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTP error while batch retrieving wardrobe items: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error batch retrieving wardrobe items: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/wardrobe-items/import", status_code=202)
+async def import_wardrobe_items(
+    background_tasks: BackgroundTasks,
+    archive: UploadFile = File(..., description="ZIP archive of item images"),
+    manifest: Optional[UploadFile] = File(None, description="CSV with filename, category, type, brand, size, color"),
+    default_category: Optional[ItemCategory] = None,
+    prisma: Prisma = Depends(PrismaClient.get_instance),
+    user=Depends(get_current_user)
+):
+    archive_path = manifest_path = None
+    try:
+        try:
+            archive_path = await spool_upload(archive, suffix=".zip", max_size=MAX_ARCHIVE_SIZE)
+            manifest_path = await spool_upload(manifest, suffix=".csv", max_size=MAX_MANIFEST_SIZE) if manifest else None
+            job_id = await create_import_job(user.id)
+        except BaseException:
+            # Once scheduled, run_import owns the files and removes them.
+            discard_spooled(archive_path, manifest_path)
+            raise
+
+        background_tasks.add_task(
+            run_import,
+            prisma,
+            user.id,
+            job_id,
+            archive_path,
+            manifest_path=manifest_path,
+            default_category=default_category
+        )
+
+        return success_response(
+            message="Wardrobe import started",
+            data={"job_id": job_id}
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTP error while starting wardrobe import: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error starting wardrobe import: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/wardrobe-items/import/{job_id}")
+async def get_wardrobe_import_status(
+    job_id: str,
+    user=Depends(get_current_user)
+):
+    try:
+        job = await get_import_job(user.id, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Import job not found")
+
+        return success_response(
+            message="Wardrobe import status retrieved successfully",
+            data=job
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTP error while retrieving wardrobe import status: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error retrieving wardrobe import status: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get('/wardrobe-items')
 async def get_wardrobe_items(
-    prisma: Prisma = Depends(PrismaClient.get_instance),
+    request: Request,
+    prisma: Prisma = Depends(get_read_prisma),
     page: Optional[int] = Query(1, ge=1),
     page_size: Optional[int] = Query(10, ge=1, le=100),
     search: Optional[str] = Query(None),
@@ -82,19 +513,15 @@ async def get_wardrobe_items(
     brand: Optional[str] = None,
     size: Optional[Size] = None,
     color: Optional[Color] = None,
+    fields: Optional[str] = Query(None),
     user=Depends(get_current_user),
 ):
     try:
         skip = (page - 1) * page_size
-        cache_key = f'wardrobe_items_{user.id}_{page}_{page_size}_{search}_{category}_{item_type}_{brand}_{size}_{color}'
-        redis_client = await redis_handler.get_client()
-        cached_data = await redis_client.get(cache_key)
-
-        if cached_data:
-            return success_response(
-                message='Wardrobe items retrieved from cache',
-                data=json.loads(cached_data)
-            )
+        item_fields = parse_fields(fields, WARDROBE_ITEM_FIELDS)
+        cache_key = wardrobe_list_cache_key(
+            user.id, page, page_size, search, category, item_type, brand, size, color, item_fields
+        )
 
         filters = {
             'user_id': user.id
@@ -109,24 +536,10 @@ async def get_wardrobe_items(
             filters['size'] = size
         if color:
             filters['color'] = color
-        if search:
-            filters['brand'] = {'contains': search, 'mode': 'insensitive'}
-
-        items = await prisma.wardrobeitem.find_many(
-            where=filters,
-            skip=skip,
-            take=page_size,
-            order={'created_at': 'desc'}
-        )
-
-        total_count = await prisma.wardrobeitem.count(where=filters)
-        total_pages = max(1, math.ceil(total_count / page_size))
 
-        serializable_items = [item.model_dump(mode='json') for item in items]
-
-        response_data = {
-            'items': serializable_items,
-            'metadata': {
+        def page_metadata(total_count: int) -> dict:
+            total_pages = max(1, math.ceil(total_count / page_size))
+            return {
                 'page': page,
                 'page_size': page_size,
                 'total_items': total_count,
@@ -134,13 +547,41 @@ async def get_wardrobe_items(
                 'has_next': page < total_pages,
                 'has_previous': page > 1
             }
-        }
 
-        await redis_client.setex(cache_key, 3600, json.dumps(response_data))
+        async def load_items():
+            if search:
+                items, total_count = await search_wardrobe_items(
+                    prisma, user.id, search, filters, skip=skip, take=page_size
+                )
+            elif env.JSON_FAST_PATH:
+                total_count = await get_wardrobe_item_count(prisma, user.id, filters)
+                return await fetch_wardrobe_page_json(
+                    prisma, filters, skip, page_size, page_metadata(total_count), item_fields
+                )
+            else:
+                items = await prisma.wardrobeitem.find_many(
+                    where=filters,
+                    skip=skip,
+                    take=page_size,
+                    order={'created_at': 'desc'}
+                )
+                total_count = await get_wardrobe_item_count(prisma, user.id, filters)
+
+            serializable_items = [project(item.model_dump(mode='json'), item_fields) for item in items]
+
+            return {
+                'items': serializable_items,
+                'metadata': page_metadata(total_count)
+            }
 
-        return success_response(
+        return await load_cached(
+            request,
+            cache_key,
+            load_items,
             message='Wardrobe items retrieved successfully',
-            data=response_data
+            cached_message='Wardrobe items retrieved from cache',
+            meta=list_page_meta(filters, search, item_fields),
+            group=wardrobe_list_group(user.id)
         )
 
     except HTTPException as httpx:
@@ -152,39 +593,109 @@ async def get_wardrobe_items(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/wardrobe-items/search/suggestions")
+async def get_wardrobe_search_suggestions(
+    q: str = Query(..., min_length=1),
+    limit: Optional[int] = Query(10, ge=1, le=50),
+    prisma: Prisma = Depends(get_read_prisma),
+    user=Depends(get_current_user)
+):
+    try:
+        suggestions = await suggest_wardrobe_terms(prisma, user.id, q, limit)
+
+        return success_response(
+            message="Search suggestions retrieved successfully",
+            data=suggestions
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTP error while retrieving search suggestions: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error retrieving search suggestions: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/wardrobe-items/facets")
+async def get_wardrobe_item_facets(
+    prisma: Prisma = Depends(get_read_prisma),
+    user=Depends(get_current_user)
+):
+    try:
+        facets = await get_wardrobe_facets(prisma, user.id)
+
+        return success_response(
+            message="Wardrobe item facets retrieved successfully",
+            data=facets
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTP error while retrieving wardrobe item facets: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error retrieving wardrobe item facets: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/wardrobe-items/changes")
+async def get_wardrobe_item_changes(
+    since: Optional[str] = Query(None),
+    limit: Optional[int] = Query(200, ge=1, le=MAX_SYNC_LIMIT),
+    prisma: Prisma = Depends(PrismaClient.get_instance),
+    user=Depends(get_current_user)
+):
+    try:
+        changes = await fetch_changes(prisma, "wardrobeitem", user.id, since, limit)
+
+        return success_response(
+            message="Wardrobe item changes retrieved successfully",
+            data=changes
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTP error while retrieving wardrobe item changes: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error retrieving wardrobe item changes: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/wardrobe-items/{item_id}")
 async def get_wardrobe_item_by_id(
     item_id: str,
-    prisma: Prisma = Depends(PrismaClient.get_instance),
+    request: Request,
+    fields: Optional[str] = Query(None),
+    prisma: Prisma = Depends(get_read_prisma),
     user=Depends(get_current_user)
 ):
     try:
-        cache_key = f"wardrobe_item_{user.id}_{item_id}"
-        redis_client = await redis_handler.get_client()
-        cached_item = await redis_client.get(cache_key)
-
-        if cached_item:
-            return success_response(
-                message="Wardrobe item retrieved from cache",
-                data=json.loads(cached_item)
-            )
+        item_fields = parse_fields(fields, WARDROBE_ITEM_FIELDS)
+        cache_key = wardrobe_item_cache_key(user.id, item_id)
 
-        item = await prisma.wardrobeitem.find_first(
-            where={
-                "id": item_id,
-                "user_id": user.id
-            }
-        )
+        async def load_item():
+            item = await prisma.wardrobeitem.find_first(
+                where={
+                    "id": item_id,
+                    "user_id": user.id
+                }
+            )
 
-        if not item:
-            raise HTTPException(status_code=404, detail="Wardrobe item not found")
+            if not item:
+                raise HTTPException(status_code=404, detail="Wardrobe item not found")
 
-        item_dict = item.model_dump(mode='json')
-        await redis_client.setex(cache_key, 3600, json.dumps(item_dict))
+            return item.model_dump(mode='json')
 
-        return success_response(
+        # A sparse fieldset is projected from the full entry, which write-through keeps current.
+        return await load_cached(
+            request,
+            cache_key,
+            load_item,
             message="Wardrobe item retrieved successfully",
-            data=item
+            cached_message=ITEM_CACHED_MESSAGE,
+            fields=item_fields
         )
 
     except HTTPException as httpx:
@@ -196,6 +707,79 @@ async def get_wardrobe_item_by_id(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _load_similarity_index(prisma: Prisma, user_id: str) -> SimilarityIndex:
+    """
+    Return the user's similarity index for the current wardrobe generation.
+    A cold start loads every descriptor; after a write only the items updated
+    or tombstoned since the last sync are applied to the previous index, with
+    the sync settle window so rows stamped before a slow commit are not missed.
+    """
+    generation = await get_wardrobe_generation(prisma, user_id)
+    index = similarity_indexes.get(user_id, generation)
+    if index is not None:
+        return index
+
+    synced_at = datetime.now(timezone.utc)
+    index = similarity_indexes.latest(user_id)
+    if index is None:
+        index = SimilarityIndex(await prisma.wardrobeitem.find_many(
+            where={"user_id": user_id, "features": {"is_not": None}},
+            include={"features": True}
+        ))
+    else:
+        since = index.synced_at - timedelta(seconds=SYNC_SETTLE_SECONDS)
+        index.upsert(await prisma.wardrobeitem.find_many(
+            where={"user_id": user_id, "updated_at": {"gte": since}},
+            include={"features": True}
+        ))
+        index.remove(tombstone.record_id for tombstone in await prisma.tombstone.find_many(
+            where={"user_id": user_id, "model": "wardrobeitem", "deleted_at": {"gte": since}}
+        ))
+    index.synced_at = synced_at
+    similarity_indexes.put(user_id, generation, index, index.nbytes)
+    return index
+
+
+@router.get("/wardrobe-items/{item_id}/similar")
+async def get_similar_wardrobe_items(
+    item_id: str,
+    limit: Optional[int] = Query(10, ge=1, le=50),
+    prisma: Prisma = Depends(get_read_prisma),
+    user=Depends(get_current_user)
+):
+    try:
+        index = await _load_similarity_index(prisma, user.id)
+
+        if item_id not in index:
+            item = await prisma.wardrobeitem.find_first(
+                where={
+                    "id": item_id,
+                    "user_id": user.id
+                }
+            )
+            if not item:
+                raise HTTPException(status_code=404, detail="Wardrobe item not found")
+            raise HTTPException(status_code=422, detail="Wardrobe item has no image to compare")
+
+        matches = index.search([item_id], limit)[item_id]
+
+        return success_response(
+            message="Similar wardrobe items retrieved successfully",
+            data=[
+                {"score": round(score, 4), "item": index.items[match_id]}
+                for match_id, score in matches
+            ]
+        )
+
+    except HTTPException as httpx:
+        logging.error("HTTP error while retrieving similar wardrobe items: %s", httpx)
+        raise httpx
+
+    except Exception as e:
+        logging.error("Error retrieving similar wardrobe items: %s", e, exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.patch("/wardrobe-items/{item_id}")
 async def update_wardrobe_item(
     item_id: str,
@@ -232,23 +816,17 @@ async def update_wardrobe_item(
             data["color"] = item_color
 
         if image:
-            await delete_file_from_gcs(
-                file_url=existing_item.image_url,
-                bucket_name=env.GOOGLE_STORAGE_MEDIA_BUCKET
-            )
             file_name = image.filename
             file_content = await image.read()
-            file_url = await upload_file_to_gcs(
-                file=file_content,
-                bucket_name=env.GOOGLE_STORAGE_MEDIA_BUCKET,
-                folder_name="wardrobe-items",
+            file_url, features = await store_item_image(
+                file_content,
                 content_type=image.content_type,
                 filename=file_name
             )
             data["image_url"] = file_url
 
-        async with prisma.tx(timeout=65000, max_wait=80000) as tx:
-            item = await tx.wardrobeitem.update(
+        async with UnitOfWork(prisma, "wardrobe_items.update", user_id=user.id) as uow:
+            item = await uow.tx.wardrobeitem.update(
                 where={
                     "id": item_id,
                     "user_id": user.id
@@ -256,10 +834,26 @@ async def update_wardrobe_item(
                 data=data
             )
 
-            redis_client = await redis_handler.get_client()
-            keys = await redis_client.keys(f'wardrobe_items_{user.id}_*')
-            if keys:
-                await redis_client.delete(*keys)
+            if image and features:
+                await uow.tx.wardrobeitemfeature.upsert(
+                    where={"item_id": item_id},
+                    data={
+                        "create": {"item_id": item_id, "user_id": user.id, **features},
+                        "update": features
+                    }
+                )
+            elif image:
+                await uow.tx.wardrobeitemfeature.delete_many(where={"item_id": item_id})
+
+            if image and existing_item.image_url:
+                # The old image is only removed once nothing can roll back to it.
+                uow.after_commit(
+                    delete_file_from_gcs,
+                    file_url=existing_item.image_url,
+                    bucket_name=env.GOOGLE_STORAGE_MEDIA_BUCKET
+                )
+            uow.after_commit(update_wardrobe_item_counts, user.id, added=[item], removed=[existing_item])
+            uow.after_commit(refresh_cached_item, user.id, before=existing_item, after=item)
 
         return success_response(
             message="Wardrobe item updated successfully",
@@ -292,24 +886,22 @@ async def delete_wardrobe_item(
         if not existing_item:
             raise HTTPException(status_code=404, detail="Wardrobe item not found")
 
-        if existing_item.image_url:
-            await delete_file_from_gcs(
-                file_url=existing_item.image_url,
-                bucket_name=env.GOOGLE_STORAGE_MEDIA_BUCKET
-            )
-
-        async with prisma.tx(timeout=65000, max_wait=80000) as tx:
-            deleted_item = await tx.wardrobeitem.delete(
+        async with UnitOfWork(prisma, "wardrobe_items.delete", user_id=user.id) as uow:
+            deleted_item = await uow.tx.wardrobeitem.delete(
                 where={
                     "id": item_id,
                     "user_id": user.id
                 }
             )
-
-            redis_client = await redis_handler.get_client()
-            keys = await redis_client.keys(f'wardrobe_items_{user.id}_*')
-            if keys:
-                await redis_client.delete(*keys)
+            await uow.tx.tombstone.create_many(data=tombstone_rows("wardrobeitem", user.id, [item_id]))
+            if existing_item.image_url:
+                uow.after_commit(
+                    delete_file_from_gcs,
+                    file_url=existing_item.image_url,
+                    bucket_name=env.GOOGLE_STORAGE_MEDIA_BUCKET
+                )
+            uow.after_commit(update_wardrobe_item_counts, user.id, removed=[deleted_item])
+            uow.after_commit(refresh_cached_item, user.id, before=deleted_item)
 
         return success_response(
             message="Wardrobe item deleted successfully",
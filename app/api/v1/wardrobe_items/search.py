@@ -0,0 +1,148 @@
+import re
+from typing import Dict, List, Tuple
+from prisma import Prisma
+from prisma.enums import ItemCategory, ItemType, Color
+from prisma.models import WardrobeItem
+
+# Minimum trigram similarity for a search term to match an enum label,
+# the same default threshold pg_trgm uses for the `%` operator.
+SIMILARITY_THRESHOLD = 0.3
+
+# Enum facets searched by name, with the rank boost a match contributes.
+SEARCH_FACETS = {
+    "category": (ItemCategory, 1.0),
+    "type": (ItemType, 0.5),
+    "color": (Color, 0.5),
+}
+
+
+def _trigrams(text: str) -> set:
+    """
+    Split text into pg_trgm style trigrams (words padded with two leading
+    and one trailing space).
+    """
+    grams = set()
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a: str, b: str) -> float:
+    grams_a, grams_b = _trigrams(a), _trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def _label(value) -> str:
+    return value.value.lower().replace("_", " ")
+
+
+def match_enum_values(query: str, enum, prefix: bool = False) -> List[str]:
+    """
+    Return enum names whose human readable label fuzzily matches the query,
+    best match first. With prefix=True, labels starting with the query match too.
+    """
+    normalized = " ".join(re.findall(r"[a-z0-9]+", query.lower()))
+    scored = []
+    for value in enum:
+        label = _label(value)
+        score = similarity(normalized, label)
+        if prefix and normalized and label.replace(" ", "").startswith(normalized.replace(" ", "")):
+            score = max(score, 1.0)
+        if score >= SIMILARITY_THRESHOLD:
+            scored.append((score, value.value))
+    scored.sort(key=lambda entry: entry[0], reverse=True)
+    return [name for _, name in scored]
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _build_search_clause(user_id: str, query: str, filters: dict) -> Tuple[str, str, list]:
+    """
+    Build the WHERE clause and rank expression of a wardrobe search.
+    Structured filters are ANDed with the search instead of being replaced by it.
+    """
+    params: list = [user_id]
+
+    def param(value) -> str:
+        params.append(value)
+        return f"${len(params)}"
+
+    conditions = ["user_id = $1"]
+    for column in ("category", "type", "size", "color"):
+        if column in filters:
+            value = filters[column]
+            conditions.append(f"{column}::text = {param(getattr(value, 'value', value))}")
+    if "brand" in filters:
+        conditions.append(f"brand = {param(filters['brand'])}")
+
+    term = param(query)
+    contains = param(f"%{_escape_like(query)}%")
+    matches = [f"brand % {term}", f"brand ILIKE {contains}"]
+    rank = [
+        f"COALESCE(similarity(brand, {term}), 0)",
+        f"CASE WHEN brand ILIKE {contains} THEN 0.5 ELSE 0 END",
+    ]
+    for column, (enum, boost) in SEARCH_FACETS.items():
+        names = match_enum_values(query, enum)
+        if names:
+            placeholder = param(names)
+            matches.append(f"{column}::text = ANY({placeholder}::text[])")
+            rank.append(f"CASE WHEN {column}::text = ANY({placeholder}::text[]) THEN {boost} ELSE 0 END")
+
+    conditions.append(f"({' OR '.join(matches)})")
+    return " AND ".join(conditions), " + ".join(rank), params
+
+
+async def search_wardrobe_items(
+    prisma: Prisma,
+    user_id: str,
+    query: str,
+    filters: dict,
+    skip: int,
+    take: int
+) -> Tuple[List[WardrobeItem], int]:
+    """
+    Ranked fuzzy search over brand (pg_trgm) and category, type and color names.
+    Returns the requested page of items and the total number of matches.
+    """
+    where, rank, params = _build_search_clause(user_id, query, filters)
+    limit = len(params) + 1
+
+    items = await prisma.query_raw(
+        f'SELECT * FROM "WardrobeItem" WHERE {where} '
+        f'ORDER BY {rank} DESC, created_at DESC LIMIT ${limit} OFFSET ${limit + 1}',
+        *params, take, skip,
+        model=WardrobeItem
+    )
+    count = await prisma.query_first(
+        f'SELECT COUNT(*)::int AS count FROM "WardrobeItem" WHERE {where}',
+        *params
+    )
+    return items, count["count"] if count else 0
+
+
+async def suggest_wardrobe_terms(prisma: Prisma, user_id: str, prefix: str, limit: int) -> List[Dict]:
+    """
+    Prefix autocomplete over the user's brands (served by the trigram index)
+    and the category, type and color names.
+    """
+    suggestions = []
+    brands = await prisma.query_raw(
+        'SELECT brand, COUNT(*)::int AS count FROM "WardrobeItem" '
+        'WHERE user_id = $1 AND brand ILIKE $2 '
+        'GROUP BY brand ORDER BY count DESC, brand LIMIT $3',
+        user_id, f"{_escape_like(prefix)}%", limit
+    )
+    for row in brands:
+        suggestions.append({"field": "brand", "value": row["brand"], "count": row["count"]})
+
+    for column, (enum, _) in SEARCH_FACETS.items():
+        for name in match_enum_values(prefix, enum, prefix=True):
+            suggestions.append({"field": column, "value": name})
+
+    return suggestions[:limit]
@@ -150,6 +150,20 @@ async def delete_file_from_gcs(file_url: str, bucket_name: str) -> dict:
             detail=f"Error deleting file from GCS: {str(e)}",
         )
 
+async def download_file_from_gcs(file_url: str) -> bytes:
+    try:
+        bucket_name, object_key = parse_gcs_url(file_url)
+        bucket = storage_client.bucket(bucket_name)
+        blob = bucket.blob(object_key)
+        return await anyio.to_thread.run_sync(blob.download_as_bytes)
+
+    except Exception as e:
+        logger.error("Error downloading file from GCS: %s", str(e))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error downloading file from GCS: {str(e)}",
+        )
+
 def parse_gcs_url(gcs_url: str) -> Tuple[str, str]:
     try:
         gcs_url = unquote(gcs_url.split("?")[0])
@@ -0,0 +1,106 @@
+"""
+Request-scoped identity map with batched loading by id.
+
+Every request gets one DataLoader. A record loaded (or primed, like the
+authenticated user) once is returned as the same instance for the rest of
+the request, and loads of the same model issued together, e.g. under
+asyncio.gather, are answered by a single `find_many(id IN (...))`.
+
+Loads awaited one by one in a loop still cost one query each. When a request
+issues more than N_PLUS_ONE_THRESHOLD separate queries for one model, an
+NPlusOneWarning is raised through `warnings` (so pytest reports it, and
+`-W error::app.db.loader.NPlusOneWarning` fails the test) and logged.
+"""
+import asyncio, logging, warnings
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+from fastapi import Depends
+from prisma import Prisma
+from app.db.prisma_client import get_prisma
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+N_PLUS_ONE_THRESHOLD = 3
+
+
+class NPlusOneWarning(UserWarning):
+    pass
+
+
+class DataLoader:
+    """
+    Usage:
+        items = await loader.load_many("wardrobeitem", item_ids)
+
+    Models are Prisma delegate names ("user", "wardrobeitem", "virtualtryon").
+    Records are looked up by id only, so callers still check ownership.
+    """
+
+    def __init__(self, prisma: Prisma):
+        self.prisma = prisma
+        self.queries: Counter = Counter()
+        self._loaded: Dict[Tuple[str, str], Any] = {}
+        self._pending: Dict[str, Dict[str, asyncio.Future]] = {}
+        self._dispatches: Set[asyncio.Task] = set()
+
+    def prime(self, model: str, record: Any) -> None:
+        """Register a record loaded elsewhere, such as the authenticated user."""
+        self._loaded[(model, record.id)] = record
+
+    async def load(self, model: str, record_id: str) -> Optional[Any]:
+        key = (model, record_id)
+        if key in self._loaded:
+            return self._loaded[key]
+
+        pending = self._pending.setdefault(model, {})
+        if record_id not in pending:
+            if not pending:
+                # Let every load issued in this tick join the batch before it is sent.
+                task = asyncio.create_task(self._dispatch(model))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+            pending[record_id] = asyncio.get_running_loop().create_future()
+        return await asyncio.shield(pending[record_id])
+
+    async def load_many(self, model: str, record_ids: Iterable[str]) -> List[Optional[Any]]:
+        """Load records in one batch; missing ids come back as None, in request order."""
+        return list(await asyncio.gather(*(self.load(model, record_id) for record_id in record_ids)))
+
+    async def _dispatch(self, model: str) -> None:
+        await asyncio.sleep(0)
+        batch = self._pending.pop(model, {})
+        if not batch:
+            return
+
+        self.queries[model] += 1
+        try:
+            records = await getattr(self.prisma, model).find_many(where={"id": {"in": list(batch)}})
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        by_id = {record.id: record for record in records}
+        for record_id, future in batch.items():
+            record = by_id.get(record_id)
+            self._loaded[(model, record_id)] = record
+            if not future.done():
+                future.set_result(record)
+
+    def check_n_plus_one(self) -> None:
+        for model, count in self.queries.items():
+            if count > N_PLUS_ONE_THRESHOLD:
+                message = (
+                    f"{count} separate {model} queries in one request; "
+                    "gather the loads so the loader can batch them"
+                )
+                logger.warning(message)
+                warnings.warn(message, NPlusOneWarning, stacklevel=2)
+
+
+async def get_loader(prisma: Prisma = Depends(get_prisma)) -> AsyncIterator[DataLoader]:
+    loader = DataLoader(prisma)
+    yield loader
+    loader.check_n_plus_one()
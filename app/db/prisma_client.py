@@ -1,5 +1,6 @@
 from typing import Optional
 from prisma import Prisma
+from env import env
 
 class PrismaClient:
     _instance: Optional[Prisma] = None
@@ -17,6 +18,32 @@ class PrismaClient:
             await PrismaClient._instance.disconnect()
             PrismaClient._instance = None
 
+class ReplicaClient:
+    """
+    Client bound to the read replica. Without VW_DATABASE_REPLICA_URL every
+    read goes to the primary client instead.
+    """
+    _instance: Optional[Prisma] = None
+
+    @staticmethod
+    def is_configured() -> bool:
+        return bool(env.DATABASE_REPLICA_URL)
+
+    @staticmethod
+    async def get_instance() -> Prisma:
+        if not ReplicaClient.is_configured():
+            return await PrismaClient.get_instance()
+        if ReplicaClient._instance is None:
+            ReplicaClient._instance = Prisma(datasource={"url": env.DATABASE_REPLICA_URL})
+            await ReplicaClient._instance.connect()
+        return ReplicaClient._instance
+
+    @staticmethod
+    async def close_connection() -> None:
+        if ReplicaClient._instance is not None:
+            await ReplicaClient._instance.disconnect()
+            ReplicaClient._instance = None
+
 async def get_prisma():
     """Get Prisma client instance"""
     client = await PrismaClient.get_instance()
@@ -0,0 +1,35 @@
+"""
+Read routing between the primary and the read replica.
+
+GET handlers take their client from `get_read_prisma`, everything else keeps
+using the primary. Replication is asynchronous, so after a user writes, their
+reads stick to the primary for a short window (tracked in Redis so it holds
+across workers) and they always read their own writes.
+"""
+import logging
+from fastapi import Depends, Request
+from prisma import Prisma
+from app.api.v1.user.auth.routes.user import get_current_user
+from app.db.prisma_client import PrismaClient, ReplicaClient
+from app.db.sticky import sticky_primary_key
+from app.redis.redis_client import redis_handler
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+
+async def _is_sticky(user_id: str) -> bool:
+    try:
+        redis_client = await redis_handler.get_client()
+        return bool(await redis_client.exists(sticky_primary_key(user_id)))
+    except Exception as e:
+        # Without the window we cannot promise read-your-writes, so play safe.
+        logger.warning("Could not read the primary window of user %s: %s", user_id, e)
+        return True
+
+
+async def get_read_prisma(request: Request, user=Depends(get_current_user)) -> Prisma:
+    """Replica for the GETs of users who have not written recently, primary otherwise."""
+    if request.method not in ("GET", "HEAD") or not ReplicaClient.is_configured() or await _is_sticky(user.id):
+        return await PrismaClient.get_instance()
+    return await ReplicaClient.get_instance()
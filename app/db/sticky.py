@@ -0,0 +1,23 @@
+"""
+Read-your-writes window for users whose reads may go to the replica.
+
+Kept apart from app.db.routing, which depends on the auth routes, so that
+every write path (auth routes included) can open the window after writing.
+"""
+from app.db.prisma_client import ReplicaClient
+from app.redis.redis_client import redis_handler
+
+# Comfortably above the replica lag we alert on.
+STICKY_PRIMARY_SECONDS = 10
+
+
+def sticky_primary_key(user_id: str) -> str:
+    return f"sticky_primary_{user_id}"
+
+
+async def stick_to_primary(user_id: str) -> None:
+    """Route the user's reads to the primary until the replica has caught up."""
+    if not ReplicaClient.is_configured():
+        return
+    redis_client = await redis_handler.get_client()
+    await redis_client.set(sticky_primary_key(user_id), 1, ex=STICKY_PRIMARY_SECONDS)
@@ -0,0 +1,106 @@
+"""
+Delta sync over `updated_at` plus tombstones.
+
+A sync token is an opaque, URL-safe encoding of two keyset cursors: the last
+(updated_at, id) of changed rows and the last (deleted_at, id) of tombstones
+returned to the client. updated_at and deleted_at are stamped when the
+statement runs, not at commit, so a row can become visible up to a whole
+transaction later than its timestamp. Only rows older than a settle window
+longer than any unit of work may stay open are returned, so such a row
+cannot slip behind a cursor the client already holds.
+"""
+import base64, binascii, json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from fastapi import HTTPException
+from prisma import Prisma
+from app.db.unit_of_work import TX_TIMEOUT_MS
+
+# A unit of work commits or is rolled back within TX_TIMEOUT_MS of its first
+# statement; the margin covers commit latency and clock skew between workers.
+SYNC_SETTLE_SECONDS = TX_TIMEOUT_MS / 1000 + 5
+TOMBSTONE_RETENTION_DAYS = 30
+MAX_SYNC_LIMIT = 500
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_sync_token(cursor: Dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(cursor, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_sync_token(token: Optional[str]) -> Dict[str, Any]:
+    """Decode a token into its cursors; no token means a full initial sync."""
+    if not token:
+        return {"u": _EPOCH.isoformat(), "ui": "", "d": datetime.now(timezone.utc).isoformat(), "di": "", "s": None}
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        for field in ("u", "d"):
+            datetime.fromisoformat(cursor[field])
+        return cursor
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid sync token")
+
+
+def _after(field: str, value: datetime, last_id: str) -> dict:
+    return {"OR": [{field: {"gt": value}}, {field: value, "id": {"gt": last_id}}]}
+
+
+async def fetch_changes(prisma: Prisma, model: str, user_id: str, since: Optional[str], limit: int) -> dict:
+    """
+    Return the rows of `model` (a Prisma delegate name such as "wardrobeitem")
+    created or updated after the token, the ids deleted after it, and the
+    token to resume from.
+    """
+    cursor = decode_sync_token(since)
+    synced_at = cursor.get("s")
+    if synced_at and datetime.fromisoformat(synced_at) < datetime.now(timezone.utc) - timedelta(days=TOMBSTONE_RETENTION_DAYS):
+        raise HTTPException(status_code=410, detail="Sync token expired, a full resync is required")
+
+    settled = datetime.now(timezone.utc) - timedelta(seconds=SYNC_SETTLE_SECONDS)
+    updated_after = datetime.fromisoformat(cursor["u"])
+    deleted_after = datetime.fromisoformat(cursor["d"])
+
+    changed = await getattr(prisma, model).find_many(
+        where={
+            "user_id": user_id,
+            "updated_at": {"lt": settled},
+            **_after("updated_at", updated_after, cursor["ui"])
+        },
+        order=[{"updated_at": "asc"}, {"id": "asc"}],
+        take=limit + 1
+    )
+    tombstones = await prisma.tombstone.find_many(
+        where={
+            "user_id": user_id,
+            "model": model,
+            "deleted_at": {"lt": settled},
+            **_after("deleted_at", deleted_after, cursor["di"])
+        },
+        order=[{"deleted_at": "asc"}, {"id": "asc"}],
+        take=limit + 1
+    )
+
+    has_more = len(changed) > limit or len(tombstones) > limit
+    changed, tombstones = changed[:limit], tombstones[:limit]
+    if changed:
+        cursor["u"], cursor["ui"] = changed[-1].updated_at.isoformat(), changed[-1].id
+    if tombstones:
+        cursor["d"], cursor["di"] = tombstones[-1].deleted_at.isoformat(), tombstones[-1].id
+    cursor["s"] = datetime.now(timezone.utc).isoformat()
+
+    return {
+        "changed": [row.model_dump(mode="json") for row in changed],
+        "deleted": [tombstone.record_id for tombstone in tombstones],
+        "has_more": has_more,
+        "next_token": encode_sync_token(cursor)
+    }
+
+
+def tombstone_rows(model: str, user_id: str, record_ids) -> list:
+    return [{"user_id": user_id, "model": model, "record_id": record_id} for record_id in record_ids]
+
+
+async def prune_tombstones(prisma: Prisma) -> int:
+    """Drop tombstones older than any token that is still accepted."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=TOMBSTONE_RETENTION_DAYS)
+    return await prisma.tombstone.delete_many(where={"deleted_at": {"lt": cutoff}})
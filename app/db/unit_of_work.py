@@ -0,0 +1,116 @@
+"""
+Short transactions with after-commit hooks.
+
+A unit of work wraps only the database statements of a mutation. Cache
+invalidation, counter updates and other side effects are registered with
+`after_commit` and run once the transaction has committed, so no pooled
+connection is held across Redis or network I/O, and a rolled-back write
+never invalidates or rewrites the cache. A unit of work done for a user also
+pins that user's reads to the primary for a moment, so the replica's lag is
+never visible to them. How long each named unit holds its connection is
+recorded for the admin statistics.
+"""
+import logging, time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from prisma import Prisma
+from app.db.sticky import stick_to_primary
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+# Delta sync's settle window is derived from this, so no unit of work may run longer.
+TX_TIMEOUT_MS = 10000
+TX_MAX_WAIT_MS = 5000
+# Transactions holding their connection longer than this are logged.
+SLOW_TX_MS = 500
+HOLD_TIME_SAMPLES = 1000
+
+
+class TransactionStats:
+    """Recent connection hold times per unit of work name, in milliseconds."""
+
+    def __init__(self, samples: int = HOLD_TIME_SAMPLES):
+        self.samples = samples
+        self._hold_times: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, List[int]] = {}  # name -> [committed, rolled back]
+
+    def record(self, name: str, hold_ms: float, committed: bool) -> None:
+        self._hold_times.setdefault(name, deque(maxlen=self.samples)).append(hold_ms)
+        counts = self._counts.setdefault(name, [0, 0])
+        counts[0 if committed else 1] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        stats = {}
+        for name, hold_times in self._hold_times.items():
+            ordered = sorted(hold_times)
+            stats[name] = {
+                "committed": self._counts[name][0],
+                "rolled_back": self._counts[name][1],
+                "hold_ms_p50": round(ordered[len(ordered) // 2], 2),
+                "hold_ms_p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+                "hold_ms_max": round(ordered[-1], 2),
+            }
+        return stats
+
+
+transaction_stats = TransactionStats()
+
+
+class UnitOfWork:
+    """
+    Usage:
+        async with UnitOfWork(prisma, "wardrobe_items.update", user_id=user.id) as uow:
+            item = await uow.tx.wardrobeitem.update(...)
+            uow.after_commit(refresh_cached_item, user.id, before=existing, after=item)
+    """
+
+    def __init__(
+        self,
+        prisma: Prisma,
+        name: str,
+        user_id: Optional[str] = None,
+        timeout: int = TX_TIMEOUT_MS,
+        max_wait: int = TX_MAX_WAIT_MS
+    ):
+        self.name = name
+        self.user_id = user_id
+        self._manager = prisma.tx(timeout=timeout, max_wait=max_wait)
+        self._hooks: List[Tuple[Callable[..., Awaitable[Any]], tuple, dict]] = []
+        self._started = 0.0
+        self.tx: Prisma = None
+
+    def after_commit(self, hook: Callable[..., Awaitable[Any]], *args, **kwargs) -> None:
+        """Run `hook(*args, **kwargs)` after a successful commit, in registration order."""
+        self._hooks.append((hook, args, kwargs))
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self.tx = await self._manager.__aenter__()
+        self._started = time.perf_counter()
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> bool:
+        committed = False
+        try:
+            await self._manager.__aexit__(exc_type, exc, traceback)
+            committed = exc_type is None
+        finally:
+            hold_ms = (time.perf_counter() - self._started) * 1000
+            transaction_stats.record(self.name, hold_ms, committed)
+            if hold_ms > SLOW_TX_MS:
+                logger.warning("Transaction %s held its connection for %.0f ms", self.name, hold_ms)
+
+        if committed:
+            if self.user_id:
+                self._hooks.insert(0, (stick_to_primary, (self.user_id,), {}))
+            await self._run_hooks()
+        return False
+
+    async def _run_hooks(self) -> None:
+        # The data is committed at this point, so a failing side effect is
+        # logged rather than turned into an error response.
+        for hook, args, kwargs in self._hooks:
+            try:
+                await hook(*args, **kwargs)
+            except Exception as e:
+                logger.error("After-commit hook %s of %s failed: %s", hook.__name__, self.name, e, exc_info=True)
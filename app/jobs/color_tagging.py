@@ -0,0 +1,201 @@
+"""
+Automatic colour tagging of wardrobe items.
+
+Images are decoded and clustered (k-means in CIELAB) in a process pool so the
+CPU work never blocks the event loop. New uploads are tagged in the
+background right after creation; `backfill_item_colors` walks existing
+untagged items in keyset-paginated chunks and reports throughput.
+
+Manual backfill:
+    python -m app.jobs.color_tagging --chunk-size 50
+"""
+import argparse, asyncio, logging, os, time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from PIL import Image
+from prisma import Prisma
+from app.api.v1.wardrobe_items.cache import wardrobe_item_cache_key, wardrobe_list_group
+from app.cloud.gcp.storage import download_file_from_gcs
+from app.db.sticky import stick_to_primary
+from app.redis.cache import delete_cache_keys
+from app.redis.counters import update_wardrobe_item_counts
+from app.redis.redis_client import redis_handler
+from app.utils.concurrency import gather_with_concurrency
+from app.vision.colors import dominant_color
+from app.vision.features import load_thumbnail
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 50
+DOWNLOAD_CONCURRENCY = 8
+WORKERS = max(1, (os.cpu_count() or 2) - 1)
+# Items the backfill could not tag (download failed, undecodable image, no
+# dominant colour) are skipped by later runs for UNTAGGABLE_TTL seconds. The
+# sorted set scores each id with the time of its last attempt.
+UNTAGGABLE_KEY = "color_backfill_untaggable"
+UNTAGGABLE_TTL = 24 * 3600
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=WORKERS)
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def tag_images(contents: List[bytes]) -> List[Optional[str]]:
+    """Decode images and return their dominant Color names. Runs in a worker process."""
+    colors = []
+    for content in contents:
+        try:
+            color = dominant_color(load_thumbnail(content))
+        except (OSError, ValueError, Image.DecompressionBombError):
+            color = None
+        colors.append(color.value if color else None)
+    return colors
+
+
+async def detect_colors(contents: List[bytes]) -> List[Optional[str]]:
+    """
+    Tag images in the process pool, one sub-batch per worker to keep the
+    per-task pickling overhead low.
+    """
+    if not contents:
+        return []
+    loop = asyncio.get_running_loop()
+    size = -(-len(contents) // WORKERS)
+    batches = [contents[i:i + size] for i in range(0, len(contents), size)]
+    results = await asyncio.gather(*(loop.run_in_executor(get_pool(), tag_images, batch) for batch in batches))
+    return [color for batch in results for color in batch]
+
+
+async def apply_colors(prisma: Prisma, tagged: List[Tuple[object, str]]) -> int:
+    """
+    Store detected colours on items that are still untagged (one update_many
+    per colour), then fix counters and caches for the rows that actually
+    changed. Items given a colour in the meantime are left alone.
+    """
+    by_color: Dict[str, list] = {}
+    for item, color in tagged:
+        by_color.setdefault(color, []).append(item)
+
+    originals = {item.id: item for item, _ in tagged}
+    changed = []
+    for color, items in by_color.items():
+        ids = [item.id for item in items]
+        if await prisma.wardrobeitem.update_many(where={"id": {"in": ids}, "color": None}, data={"color": color}):
+            changed += await prisma.wardrobeitem.find_many(where={"id": {"in": ids}, "color": color})
+
+    by_user: Dict[str, list] = {}
+    for item in changed:
+        by_user.setdefault(item.user_id, []).append(item)
+    for user_id, user_items in by_user.items():
+        await update_wardrobe_item_counts(
+            user_id,
+            added=user_items,
+            removed=[originals[item.id] for item in user_items]
+        )
+        await delete_cache_keys(
+            wardrobe_list_group(user_id),
+            keys=[wardrobe_item_cache_key(user_id, item.id) for item in user_items]
+        )
+        await stick_to_primary(user_id)
+    return len(changed)
+
+
+async def tag_new_items(prisma: Prisma, uploads: List[Tuple[object, bytes]]) -> None:
+    """
+    Background task for fresh uploads: tag the created items whose colour
+    was left empty, reusing the image bytes already in memory.
+    """
+    try:
+        uploads = [(item, content) for item, content in uploads if item.color is None]
+        colors = await detect_colors([content for _, content in uploads])
+        tagged = [(item, color) for (item, _), color in zip(uploads, colors) if color]
+        if tagged:
+            await apply_colors(prisma, tagged)
+    except Exception as e:
+        logger.error("Error tagging colours of new wardrobe items: %s", e, exc_info=True)
+
+
+async def backfill_item_colors(prisma: Prisma, chunk_size: int = CHUNK_SIZE) -> dict:
+    """
+    Tag every existing item that has an image but no colour, in chunks.
+    Items that failed in an earlier run are left out of the query.
+    """
+    started = time.monotonic()
+    processed = tagged = 0
+    cursor = None
+    redis_client = await redis_handler.get_client()
+    await redis_client.zremrangebyscore(UNTAGGABLE_KEY, "-inf", time.time() - UNTAGGABLE_TTL)
+    untaggable = list(await redis_client.zrange(UNTAGGABLE_KEY, 0, -1))
+
+    while True:
+        where = {"color": None, "image_url": {"not": None}}
+        if cursor or untaggable:
+            where["id"] = {}
+        if cursor:
+            where["id"]["gt"] = cursor
+        if untaggable:
+            where["id"]["not_in"] = untaggable
+        items = await prisma.wardrobeitem.find_many(where=where, order={"id": "asc"}, take=chunk_size)
+        if not items:
+            break
+        cursor = items[-1].id
+
+        contents = await gather_with_concurrency(
+            DOWNLOAD_CONCURRENCY, (download_file_from_gcs(item.image_url) for item in items)
+        )
+        downloaded = [(item, content) for item, content in zip(items, contents) if isinstance(content, bytes)]
+        colors = await detect_colors([content for _, content in downloaded])
+        chunk_tagged = [(item, color) for (item, _), color in zip(downloaded, colors) if color]
+        if chunk_tagged:
+            tagged += await apply_colors(prisma, chunk_tagged)
+
+        tagged_ids = {item.id for item, _ in chunk_tagged}
+        failed = [item.id for item in items if item.id not in tagged_ids]
+        if failed:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                pipe.zadd(UNTAGGABLE_KEY, {item_id: time.time() for item_id in failed})
+                pipe.expire(UNTAGGABLE_KEY, UNTAGGABLE_TTL)
+                await pipe.execute()
+
+        processed += len(items)
+        elapsed = time.monotonic() - started
+        logger.info(
+            "Colour backfill: %d processed, %d tagged, %.1f items/s",
+            processed, tagged, processed / max(elapsed, 1e-6)
+        )
+
+    elapsed = time.monotonic() - started
+    logger.info("Colour backfill finished: %d of %d items tagged in %.1fs", tagged, processed, elapsed)
+    return {"processed": processed, "tagged": tagged, "seconds": round(elapsed, 2)}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    prisma = Prisma()
+    await prisma.connect()
+    try:
+        print(await backfill_item_colors(prisma, chunk_size=args.chunk_size))
+    finally:
+        await prisma.disconnect()
+        shutdown_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
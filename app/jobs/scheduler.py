@@ -0,0 +1,97 @@
+import logging
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from app.db.prisma_client import PrismaClient
+from app.redis.counters import reconcile_counters
+from app.db.sync import prune_tombstones
+from app.jobs.color_tagging import backfill_item_colors, shutdown_pool
+from app.redis.single_flight import acquire_lock
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+scheduler = AsyncIOScheduler()
+
+RECONCILE_INTERVAL = 15 * 60
+BACKFILL_INTERVAL = 60 * 60
+PRUNE_INTERVAL = 24 * 60 * 60
+
+
+async def claim_run(job_id: str, interval: int) -> bool:
+    """
+    Every worker runs this scheduler, so a job first claims the current
+    interval with a Redis lock. The lock is never released: its lease runs
+    out shortly before the next interval, and only one worker per interval
+    gets it.
+    """
+    return await acquire_lock(f"scheduler_{job_id}", lease_ms=int(interval * 900)) is not None
+
+
+async def reconcile_counters_job():
+    try:
+        if not await claim_run("reconcile_counters", RECONCILE_INTERVAL):
+            return
+        prisma = await PrismaClient.get_instance()
+        await reconcile_counters(prisma)
+    except Exception as e:
+        logger.error("Error reconciling counters: %s", e, exc_info=True)
+
+
+async def backfill_colors_job():
+    try:
+        if not await claim_run("backfill_item_colors", BACKFILL_INTERVAL):
+            return
+        prisma = await PrismaClient.get_instance()
+        await backfill_item_colors(prisma)
+    except Exception as e:
+        logger.error("Error backfilling item colours: %s", e, exc_info=True)
+
+
+async def prune_tombstones_job():
+    try:
+        if not await claim_run("prune_tombstones", PRUNE_INTERVAL):
+            return
+        prisma = await PrismaClient.get_instance()
+        pruned = await prune_tombstones(prisma)
+        logger.info("Pruned %d tombstones", pruned)
+    except Exception as e:
+        logger.error("Error pruning tombstones: %s", e, exc_info=True)
+
+
+def start_scheduler():
+    """Registers the periodic jobs and starts the scheduler."""
+    scheduler.add_job(
+        reconcile_counters_job,
+        "interval",
+        seconds=RECONCILE_INTERVAL,
+        id="reconcile_counters",
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True
+    )
+    scheduler.add_job(
+        backfill_colors_job,
+        "interval",
+        seconds=BACKFILL_INTERVAL,
+        id="backfill_item_colors",
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True
+    )
+    scheduler.add_job(
+        prune_tombstones_job,
+        "interval",
+        seconds=PRUNE_INTERVAL,
+        id="prune_tombstones",
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True
+    )
+    scheduler.start()
+    logger.info("Scheduler started")
+
+
+def shutdown_scheduler():
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+        logger.info("Scheduler stopped")
+    shutdown_pool()
@@ -0,0 +1,469 @@
+import asyncio, hashlib, logging, orjson, time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from fastapi import Request, Response
+from redis.exceptions import WatchError
+from app.redis.redis_client import redis_handler
+from app.redis.local_cache import cache_stats, is_locally_cached, local_cache, publish_invalidation
+from app.redis.single_flight import LOCK_LEASE_MS, acquire_lock, coalesce, release_lock
+from app.utils.content_negotiation import MSGPACK_MEDIA_TYPE, json_to_msgpack, msgpack_etag, wants_msgpack
+from app.utils.fields import fields_key, project
+from app.utils.success_handler import raw_json_response, render_success_response
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+# Entries are served as fresh for the soft TTL, then served stale while a
+# background refresh runs, until Redis drops them at the hard TTL.
+CACHE_SOFT_TTL = 3600
+CACHE_TTL = 7200
+LOCK_POLL_INTERVAL = 0.05
+
+_background_refreshes: Set[asyncio.Task] = set()
+
+
+def meta_key(cache_key: str) -> str:
+    """Companion hash holding the entry's metadata (ETag, soft expiry), readable without the body."""
+    return f"{cache_key}:meta"
+
+
+def cache_group_key(group: str) -> str:
+    """
+    Set of the cache keys stored under a group (e.g. one user's list pages),
+    so the group is invalidated in O(its keys) without scanning the keyspace.
+    """
+    return f"cache_group:{group}"
+
+
+# Deletes every key registered in the given groups, their metadata and the
+# registries themselves in one atomic step, so no key registered meanwhile
+# is left behind without its registry entry.
+_DELETE_GROUPS_SCRIPT = """
+local deleted = 0
+for i = 1, #KEYS do
+    for _, key in ipairs(redis.call('SMEMBERS', KEYS[i])) do
+        deleted = deleted + redis.call('DEL', key, key .. ':meta')
+    end
+    redis.call('DEL', KEYS[i])
+end
+return deleted
+"""
+
+
+def projected_etag_field(fields: Tuple[str, ...]) -> str:
+    """Meta field holding the ETag of a sparse fieldset of the entry, keyed by the normalized field list."""
+    return f"etag:{fields_key(fields)}"
+
+
+# Records a projection's ETag only while the entry it was computed from is
+# still the stored one: a rewrite replaces the meta hash, dropping them all.
+_STORE_PROJECTED_ETAG_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'etag') == ARGV[1] then
+    return redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+end
+return 0
+"""
+
+
+def msgpack_key(cache_key: str, etag: str) -> str:
+    """
+    The MessagePack rendering of an entry. It is keyed by the entry's ETag,
+    so it can never outlive the data it encodes and needs no invalidation.
+    """
+    return f"{cache_key}:msgpack:{etag}"
+
+
+def compute_etag(payload: bytes) -> str:
+    return f'"{hashlib.sha1(payload).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """If-None-Match uses the weak comparison, so a W/ prefix is ignored."""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class RawJSON(bytes):
+    """Data a loader has already serialized to JSON, stored without re-encoding."""
+
+
+class CachedEntry(NamedTuple):
+    body: bytes
+    etag: Optional[str]
+    soft_expires: float
+
+    @property
+    def stale(self) -> bool:
+        return self.soft_expires < time.time()
+
+
+def _soft_expires(value) -> float:
+    return float(value) if value else 0.0
+
+
+async def get_cached(cache_key: str) -> Optional[CachedEntry]:
+    """
+    Return the cached, fully rendered response body with its ETag and soft
+    expiry. Hot keys are served from the in-process tier; otherwise all of it
+    comes from Redis in one round trip, read as bytes so the body can be sent
+    without decoding.
+    """
+    local = is_locally_cached(cache_key)
+    if local:
+        entry = local_cache.get(cache_key)
+        cache_stats.record("local", entry is not None)
+        if entry is not None:
+            return entry
+
+    redis_client = await redis_handler.get_binary_client()
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.get(cache_key)
+    pipe.hmget(meta_key(cache_key), "etag", "soft_expires")
+    body, (etag, soft_expires) = await pipe.execute()
+    cache_stats.record("redis", body is not None)
+    if body is None:
+        return None
+
+    entry = CachedEntry(body, etag.decode() if etag else None, _soft_expires(soft_expires))
+    if local:
+        local_cache.set(cache_key, entry, len(body))
+    return entry
+
+
+async def get_cached_bodies(cache_keys: List[str]) -> List[Optional[bytes]]:
+    """
+    Return the cached bodies of several keys, in order and None for misses:
+    the in-process tier first, then a single MGET for the rest.
+    """
+    bodies: List[Optional[bytes]] = [None] * len(cache_keys)
+    remote = []
+    for index, cache_key in enumerate(cache_keys):
+        if is_locally_cached(cache_key):
+            entry = local_cache.get(cache_key)
+            cache_stats.record("local", entry is not None)
+            if entry is not None:
+                bodies[index] = entry.body
+                continue
+        remote.append(index)
+
+    if remote:
+        redis_client = await redis_handler.get_binary_client()
+        for index, body in zip(remote, await redis_client.mget([cache_keys[index] for index in remote])):
+            cache_stats.record("redis", body is not None)
+            bodies[index] = body
+    return bodies
+
+
+async def get_cached_meta(cache_key: str) -> Tuple[Optional[str], float]:
+    """Return an entry's ETag and soft expiry without reading its body."""
+    entry = local_cache.get(cache_key) if is_locally_cached(cache_key) else None
+    if entry is not None:
+        return entry.etag, entry.soft_expires
+
+    redis_client = await redis_handler.get_client()
+    etag, soft_expires = await redis_client.hmget(meta_key(cache_key), "etag", "soft_expires")
+    return etag, _soft_expires(soft_expires)
+
+
+async def store_response(
+    cache_key: str,
+    data: Any,
+    message: str,
+    cached_message: str,
+    ttl: int = CACHE_TTL,
+    meta: Optional[Dict[str, str]] = None,
+    soft_ttl: int = CACHE_SOFT_TTL,
+    group: Optional[str] = None
+) -> Tuple[bytes, str]:
+    """
+    Serialize `data` once with orjson (or take it as is when it is RawJSON)
+    and store the envelope that later hits will return verbatim, plus any
+    extra `meta` fields next to the ETag. With a `group`, the key is also
+    registered for `delete_cache_keys(group)`.
+    The entry is served as fresh for `soft_ttl` and kept for `ttl` seconds.
+    Returns the fresh envelope and the ETag, which covers the data only so
+    both envelopes share it.
+    """
+    data_json = bytes(data) if isinstance(data, RawJSON) else orjson.dumps(data)
+    etag = compute_etag(data_json)
+
+    redis_client = await redis_handler.get_binary_client()
+    pipe = redis_client.pipeline(transaction=True)
+    entry = _queue_store(pipe, cache_key, data_json, etag, cached_message, ttl, meta, soft_ttl)
+    if group:
+        pipe.sadd(cache_group_key(group), cache_key)
+        pipe.expire(cache_group_key(group), ttl)
+    await pipe.execute()
+
+    _store_locally(cache_key, entry)
+    return render_success_response(message, data_json), etag
+
+
+async def store_many(entries: Dict[str, Any], cached_message: str, ttl: int = CACHE_TTL, soft_ttl: int = CACHE_SOFT_TTL) -> None:
+    """Store several entries (cache key -> data) in one round trip."""
+    redis_client = await redis_handler.get_binary_client()
+    pipe = redis_client.pipeline(transaction=True)
+    stored = {}
+    for cache_key, data in entries.items():
+        data_json = orjson.dumps(data)
+        stored[cache_key] = _queue_store(pipe, cache_key, data_json, compute_etag(data_json), cached_message, ttl, None, soft_ttl)
+    await pipe.execute()
+
+    for cache_key, entry in stored.items():
+        _store_locally(cache_key, entry)
+
+
+def _queue_store(
+    pipe,
+    cache_key: str,
+    data_json: bytes,
+    etag: str,
+    cached_message: str,
+    ttl: int,
+    meta: Optional[Dict[str, str]],
+    soft_ttl: int
+) -> CachedEntry:
+    entry = CachedEntry(render_success_response(cached_message, data_json), etag, time.time() + soft_ttl)
+    pipe.setex(cache_key, ttl, entry.body)
+    pipe.delete(meta_key(cache_key))
+    pipe.hset(meta_key(cache_key), mapping={**(meta or {}), "etag": etag, "soft_expires": str(entry.soft_expires)})
+    pipe.expire(meta_key(cache_key), ttl)
+    return entry
+
+
+def _store_locally(cache_key: str, entry: CachedEntry) -> None:
+    if is_locally_cached(cache_key):
+        local_cache.set(cache_key, entry, len(entry.body))
+
+
+async def _wait_for_entry(cache_key: str, timeout_ms: int) -> Optional[CachedEntry]:
+    """Poll for an entry another worker is rebuilding, up to its lock lease."""
+    deadline = time.monotonic() + timeout_ms / 1000
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        entry = await get_cached(cache_key)
+        if entry:
+            return entry
+    return None
+
+
+async def _rebuild(cache_key: str, loader, store_args: tuple) -> Tuple[bytes, str]:
+    token = await acquire_lock(cache_key)
+    if token is None:
+        entry = await _wait_for_entry(cache_key, LOCK_LEASE_MS)
+        if entry:
+            return entry.body, entry.etag
+        logger.warning("Timed out waiting for %s to be rebuilt, loading it directly", cache_key)
+
+    try:
+        if token:
+            # Another worker may have finished between our miss and taking the lock.
+            entry = await get_cached(cache_key)
+            if entry:
+                return entry.body, entry.etag
+        data = await loader()
+        return await store_response(cache_key, data, *store_args)
+    finally:
+        if token:
+            await release_lock(cache_key, token)
+
+
+async def _refresh(cache_key: str, loader, store_args: tuple) -> None:
+    """Reload a stale entry unless another worker is already doing it."""
+    token = await acquire_lock(cache_key)
+    if token is None:
+        return
+    try:
+        data = await loader()
+        await store_response(cache_key, data, *store_args)
+        await publish_invalidation(keys=[cache_key])
+    except Exception as e:
+        logger.error("Error refreshing stale cache entry %s: %s", cache_key, e, exc_info=True)
+    finally:
+        await release_lock(cache_key, token)
+
+
+def _refresh_in_background(cache_key: str, loader, store_args: tuple) -> None:
+    task = asyncio.create_task(coalesce(f"{cache_key}:refresh", lambda: _refresh(cache_key, loader, store_args)))
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+
+
+async def _msgpack_body(cache_key: str, body: bytes, etag: Optional[str]) -> bytes:
+    """Return the MessagePack form of a cached body, encoding it once per ETag."""
+    if not etag:
+        return json_to_msgpack(body)
+
+    variant_key = msgpack_key(cache_key, etag)
+    local = is_locally_cached(cache_key)
+    if local:
+        encoded = local_cache.get(variant_key)
+        if encoded is not None:
+            return encoded
+
+    redis_client = await redis_handler.get_binary_client()
+    encoded = await redis_client.get(variant_key)
+    if encoded is None:
+        encoded = json_to_msgpack(body)
+        await redis_client.set(variant_key, encoded, ex=CACHE_SOFT_TTL)
+    if local:
+        local_cache.set(variant_key, encoded, len(encoded))
+    return encoded
+
+
+async def load_cached(
+    request: Request,
+    cache_key: str,
+    loader: Callable[[], Awaitable[Any]],
+    message: str,
+    cached_message: str,
+    ttl: int = CACHE_TTL,
+    meta: Optional[Dict[str, str]] = None,
+    soft_ttl: int = CACHE_SOFT_TTL,
+    fields: Optional[Tuple[str, ...]] = None,
+    group: Optional[str] = None
+) -> Response:
+    """
+    Serve a cached GET:
+    - If-None-Match is answered with a 304 from the metadata alone.
+    - With a sparse fieldset (`fields`), the full entry is read and projected.
+      The response gets its own ETag, hashed from the field list and the
+      projected data. It is recorded in the metadata per field list, so
+      If-None-Match is answered from the metadata alone here too.
+    - Hits return the stored envelope as is. Past the soft TTL the stale
+      entry is still served, and `loader` refreshes it in the background.
+    - Misses are rebuilt with single-flight semantics: concurrent misses in
+      this process share one rebuild, and across workers a Redis lock with a
+      short lease lets one worker run `loader` while the others wait for its
+      entry to appear.
+    - Clients accepting MessagePack get the same envelope in that encoding;
+      on hits it is encoded once per entry and cached next to it. Its ETag
+      is the JSON one with a -mp suffix, and 304s are matched per encoding.
+    """
+    store_args = (message, cached_message, ttl, meta, soft_ttl, group)
+    msgpack = wants_msgpack(request.headers.get("accept"))
+    variant_etag = msgpack_etag if msgpack else (lambda etag: etag)
+    if_none_match = request.headers.get("if-none-match")
+
+    if fields:
+        projection = projected_etag_field(fields)
+        if if_none_match:
+            redis_client = await redis_handler.get_client()
+            etag, soft_expires = await redis_client.hmget(meta_key(cache_key), projection, "soft_expires")
+            etag = variant_etag(etag)
+            if etag_matches(if_none_match, etag):
+                if _soft_expires(soft_expires) < time.time():
+                    _refresh_in_background(cache_key, loader, store_args)
+                return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept"})
+
+        entry = await get_cached(cache_key)
+        if entry:
+            if entry.stale:
+                _refresh_in_background(cache_key, loader, store_args)
+            body, entry_etag = entry.body, entry.etag
+        else:
+            body, entry_etag = await coalesce(cache_key, lambda: _rebuild(cache_key, loader, store_args))
+
+        data_json = orjson.dumps(project(orjson.loads(body)["data"], fields))
+        etag = compute_etag(fields_key(fields).encode() + b"\n" + data_json)
+        if entry_etag:
+            redis_client = await redis_handler.get_client()
+            await redis_client.eval(_STORE_PROJECTED_ETAG_SCRIPT, 1, meta_key(cache_key), entry_etag, projection, etag)
+        etag = variant_etag(etag)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept"})
+        body = render_success_response(message, data_json)
+        if msgpack:
+            return raw_json_response(json_to_msgpack(body), etag, MSGPACK_MEDIA_TYPE)
+        return raw_json_response(body, etag)
+
+    if if_none_match:
+        etag, soft_expires = await get_cached_meta(cache_key)
+        etag = variant_etag(etag)
+        if etag_matches(if_none_match, etag):
+            if soft_expires < time.time():
+                _refresh_in_background(cache_key, loader, store_args)
+            return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept"})
+
+    entry = await get_cached(cache_key)
+    if entry:
+        if entry.stale:
+            _refresh_in_background(cache_key, loader, store_args)
+        if msgpack:
+            return raw_json_response(
+                await _msgpack_body(cache_key, entry.body, entry.etag), msgpack_etag(entry.etag), MSGPACK_MEDIA_TYPE
+            )
+        return raw_json_response(entry.body, entry.etag)
+
+    body, etag = await coalesce(cache_key, lambda: _rebuild(cache_key, loader, store_args))
+    if msgpack:
+        return raw_json_response(json_to_msgpack(body), msgpack_etag(etag), MSGPACK_MEDIA_TYPE)
+    return raw_json_response(body, etag)
+
+
+async def write_through(cache_key: str, data: Any, cached_message: str, ttl: int = CACHE_TTL) -> None:
+    """
+    Replace an entry with freshly written data, so the next read is both
+    correct and a hit. Other workers drop their in-process copy of it.
+    """
+    await store_response(cache_key, data, cached_message, cached_message, ttl)
+    await publish_invalidation(keys=[cache_key])
+
+
+async def patch_cached(cache_key: str, patch: Callable[[Any], Optional[Any]]) -> bool:
+    """
+    Rewrite the data of a cached entry in place, keeping its message, meta
+    fields and remaining TTL. `patch` gets the cached data and returns the new
+    data, the same object to leave the entry untouched, or None when the
+    entry cannot be patched. Returns False when the entry is missing,
+    unpatchable or changed concurrently; the caller should then drop it.
+    """
+    redis_client = await redis_handler.get_binary_client()
+    async with redis_client.pipeline(transaction=True) as pipe:
+        try:
+            await pipe.watch(cache_key, meta_key(cache_key))
+            body = await pipe.get(cache_key)
+            ttl = await pipe.pttl(cache_key)
+            if body is None or ttl <= 0:
+                return False
+
+            envelope = orjson.loads(body)
+            data = patch(envelope["data"])
+            if data is None:
+                return False
+            if data is envelope["data"]:
+                return True
+            data_json = orjson.dumps(data)
+
+            projections = [field for field in await pipe.hkeys(meta_key(cache_key)) if field.startswith(b"etag:")]
+
+            pipe.multi()
+            pipe.set(cache_key, render_success_response(envelope["message"], data_json), px=ttl)
+            pipe.hset(meta_key(cache_key), "etag", compute_etag(data_json))
+            if projections:
+                pipe.hdel(meta_key(cache_key), *projections)
+            await pipe.execute()
+        except WatchError:
+            return False
+
+    await publish_invalidation(keys=[cache_key])
+    return True
+
+
+async def delete_cache_keys(*groups: str, keys: Iterable[str] = ()) -> int:
+    """
+    Delete the given keys (and their metadata) plus every key registered in
+    the groups, and evict the keys from every worker's in-process tier.
+    The work is proportional to the keys involved, never to the keyspace.
+    """
+    redis_client = await redis_handler.get_client()
+    keys = list(keys)
+    deleted = 0
+    if keys:
+        deleted += await redis_client.delete(*keys, *(meta_key(key) for key in keys))
+    if groups:
+        deleted += await redis_client.eval(_DELETE_GROUPS_SCRIPT, len(groups), *(cache_group_key(group) for group in groups))
+    await publish_invalidation(keys)
+    return deleted
@@ -0,0 +1,272 @@
+import logging, time
+import redis.asyncio as redis
+from typing import Dict, Iterable, Optional
+from prisma import Prisma
+from app.redis.redis_client import redis_handler
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+COUNTER_TTL = 86400
+WARDROBE_FACETS = ("category", "type", "size", "color", "brand")
+
+# Applies all deltas atomically, but only to an already seeded hash: incrementing
+# a missing hash would create partial counters that look authoritative.
+_APPLY_DELTAS_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 1, #ARGV, 2 do
+    redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+redis.call('HINCRBY', KEYS[1], 'generation', 1)
+return 1
+"""
+
+_WARDROBE_COUNTS_SQL = """
+SELECT
+    category::text AS category,
+    type::text AS type,
+    size::text AS size,
+    color::text AS color,
+    brand,
+    GROUPING(category) AS g_category,
+    GROUPING(type) AS g_type,
+    GROUPING(size) AS g_size,
+    GROUPING(color) AS g_color,
+    GROUPING(brand) AS g_brand,
+    COUNT(*)::int AS count
+FROM "WardrobeItem"
+WHERE user_id = $1
+GROUP BY GROUPING SETS ((), (category), (type), (size), (color), (brand))
+"""
+
+
+def wardrobe_counter_key(user_id: str) -> str:
+    return f"counts_wardrobe_items_{user_id}"
+
+
+def virtual_tryon_counter_key(user_id: str) -> str:
+    return f"counts_virtual_tryon_{user_id}"
+
+
+def _facet_value(value) -> str:
+    return getattr(value, "value", value)
+
+
+def wardrobe_item_fields(item) -> list:
+    """
+    Return the counter fields a wardrobe item contributes to.
+    """
+    fields = ["total"]
+    for facet in WARDROBE_FACETS:
+        value = getattr(item, facet, None)
+        if value is not None:
+            fields.append(f"{facet}:{_facet_value(value)}")
+    return fields
+
+
+def _counter_field(filters: dict) -> Optional[str]:
+    """
+    Map list filters to the single counter field that answers them, if any.
+    Combined facets and free-text filters have no counter and return None.
+    """
+    facets = {key: value for key, value in filters.items() if key != "user_id"}
+    if not facets:
+        return "total"
+    if len(facets) == 1:
+        facet, value = next(iter(facets.items()))
+        if facet in WARDROBE_FACETS and not isinstance(value, dict):
+            return f"{facet}:{_facet_value(value)}"
+    return None
+
+
+async def _store_counts(key: str, counts: Dict[str, int]) -> None:
+    """
+    Store freshly computed counts unless another request seeded them first.
+    """
+    redis_client = await redis_handler.get_client()
+    async with redis_client.pipeline(transaction=True) as pipe:
+        try:
+            await pipe.watch(key)
+            if await pipe.exists(key):
+                await pipe.unwatch()
+                return
+            pipe.multi()
+            pipe.hset(key, mapping={**counts, "generation": time.time_ns()})
+            pipe.expire(key, COUNTER_TTL)
+            await pipe.execute()
+        except redis.WatchError:
+            logger.info("Counters for %s were seeded concurrently", key)
+
+
+async def _apply_deltas(key: str, deltas: Dict[str, int]) -> None:
+    """
+    Apply counter deltas and bump the generation. The generation moves even
+    when every delta cancels out (e.g. an image-only update), since cached
+    per-user derived data keys on it.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    redis_client = await redis_handler.get_client()
+    args = []
+    for field, delta in deltas.items():
+        args.extend([field, delta])
+    await redis_client.eval(_APPLY_DELTAS_SCRIPT, 1, key, *args)
+
+
+async def compute_wardrobe_counts(prisma: Prisma, user_id: str) -> Dict[str, int]:
+    """
+    Compute every wardrobe counter for a user with a single grouped query.
+    """
+    rows = await prisma.query_raw(_WARDROBE_COUNTS_SQL, user_id)
+    counts = {"total": 0}
+    for row in rows:
+        grouped = [facet for facet in WARDROBE_FACETS if row[f"g_{facet}"] == 0]
+        if not grouped:
+            counts["total"] = row["count"]
+        elif row[grouped[0]] is not None:
+            counts[f"{grouped[0]}:{row[grouped[0]]}"] = row["count"]
+    return counts
+
+
+async def get_wardrobe_item_count(prisma: Prisma, user_id: str, filters: dict) -> int:
+    """
+    Return the number of wardrobe items matching the filters, served from the
+    Redis counters when a single facet (or no facet) is requested.
+    """
+    field = _counter_field(filters)
+    if field is None:
+        return await prisma.wardrobeitem.count(where=filters)
+
+    key = wardrobe_counter_key(user_id)
+    redis_client = await redis_handler.get_client()
+    value = await redis_client.hget(key, field)
+    if value is not None:
+        return int(value)
+    if await redis_client.exists(key):
+        return 0
+
+    counts = await compute_wardrobe_counts(prisma, user_id)
+    await _store_counts(key, counts)
+    return counts.get(field, 0)
+
+
+async def get_wardrobe_facets(prisma: Prisma, user_id: str) -> dict:
+    """
+    Return item counts per category, type, size, color and brand together with
+    the counter generation, read from the counter hash in one round trip.
+    """
+    key = wardrobe_counter_key(user_id)
+    redis_client = await redis_handler.get_client()
+    counts = await redis_client.hgetall(key)
+    if not counts:
+        counts = await compute_wardrobe_counts(prisma, user_id)
+        await _store_counts(key, counts)
+        counts = await redis_client.hgetall(key) or counts
+
+    facets = {facet: {} for facet in WARDROBE_FACETS}
+    for field, value in counts.items():
+        facet, _, name = field.partition(":")
+        if facet in facets and int(value) > 0:
+            facets[facet][name] = int(value)
+
+    return {
+        "total_items": int(counts.get("total", 0)),
+        "generation": str(counts.get("generation", "")),
+        "facets": facets
+    }
+
+
+async def get_wardrobe_generation(prisma: Prisma, user_id: str) -> str:
+    """
+    Return the wardrobe generation of a user, which changes on every write.
+    """
+    key = wardrobe_counter_key(user_id)
+    redis_client = await redis_handler.get_client()
+    generation = await redis_client.hget(key, "generation")
+    if generation is None:
+        await _store_counts(key, await compute_wardrobe_counts(prisma, user_id))
+        generation = await redis_client.hget(key, "generation")
+    return str(generation)
+
+
+async def get_virtual_tryon_count(prisma: Prisma, user_id: str) -> int:
+    """
+    Return the number of virtual try-on results of a user from the Redis counters.
+    """
+    key = virtual_tryon_counter_key(user_id)
+    redis_client = await redis_handler.get_client()
+    value = await redis_client.hget(key, "total")
+    if value is not None:
+        return int(value)
+
+    total = await prisma.virtualtryon.count(where={"user_id": user_id})
+    await _store_counts(key, {"total": total})
+    return total
+
+
+async def update_wardrobe_item_counts(user_id: str, added: Iterable = (), removed: Iterable = ()) -> None:
+    """
+    Apply the counter deltas for created, updated (old in removed, new in added)
+    and deleted wardrobe items in one atomic Redis call.
+    """
+    deltas: Dict[str, int] = {}
+    for item in added:
+        for field in wardrobe_item_fields(item):
+            deltas[field] = deltas.get(field, 0) + 1
+    for item in removed:
+        for field in wardrobe_item_fields(item):
+            deltas[field] = deltas.get(field, 0) - 1
+    await _apply_deltas(wardrobe_counter_key(user_id), deltas)
+
+
+async def update_virtual_tryon_counts(user_id: str, delta: int) -> None:
+    await _apply_deltas(virtual_tryon_counter_key(user_id), {"total": delta})
+
+
+async def reconcile_counters(prisma: Prisma) -> None:
+    """
+    Recompute every seeded counter hash from the database and replace the ones
+    that drifted (e.g. increments lost while a hash was being seeded).
+
+    The hash's generation is read before the database is counted and checked
+    again under WATCH before the replace. A delta applied in between means
+    the computed counts may already be stale, so that hash is left for the
+    next run rather than overwritten.
+    """
+    redis_client = await redis_handler.get_client()
+    reconciled = skipped = 0
+
+    async for key in redis_client.scan_iter(match="counts_*", count=500):
+        if not key.startswith(("counts_wardrobe_items_", "counts_virtual_tryon_")):
+            continue
+        generation = await redis_client.hget(key, "generation")
+        if key.startswith("counts_wardrobe_items_"):
+            counts = await compute_wardrobe_counts(prisma, key[len("counts_wardrobe_items_"):])
+        else:
+            user_id = key[len("counts_virtual_tryon_"):]
+            counts = {"total": await prisma.virtualtryon.count(where={"user_id": user_id})}
+
+        async with redis_client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                cached = await pipe.hgetall(key)
+                if cached.pop("generation", None) != generation:
+                    await pipe.unwatch()
+                    skipped += 1
+                    continue
+                current = {field: int(value) for field, value in cached.items() if int(value)}
+                if current == {field: value for field, value in counts.items() if value}:
+                    await pipe.unwatch()
+                    continue
+
+                pipe.multi()
+                pipe.delete(key)
+                pipe.hset(key, mapping={**counts, "generation": time.time_ns()})
+                pipe.expire(key, COUNTER_TTL)
+                await pipe.execute()
+                reconciled += 1
+            except redis.WatchError:
+                skipped += 1
+
+    logger.info("Counter reconciliation finished, %d hashes corrected, %d changed meanwhile and skipped", reconciled, skipped)
@@ -0,0 +1,85 @@
+"""
+In-process cache tier in front of Redis for hot per-user keys.
+
+Entries live for a short TTL in each worker. Invalidations are published on a
+Redis channel so every worker on every node evicts the same keys; a worker
+whose subscription drops clears its whole tier, since it may have missed
+messages in the meantime.
+"""
+import asyncio, json, logging
+from typing import Iterable, Optional
+from app.redis.redis_client import redis_handler
+from app.utils.ttl_cache import HitStats, TTLCache
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "cache_invalidation"
+LOCAL_CACHE_PREFIXES = ("user_info_", "wardrobe_item_", "auth_user_")
+LOCAL_CACHE_MAX_BYTES = 32 * 1024 * 1024
+LOCAL_CACHE_TTL = 60
+RESUBSCRIBE_DELAY = 1
+
+local_cache = TTLCache(max_bytes=LOCAL_CACHE_MAX_BYTES, ttl=LOCAL_CACHE_TTL)
+cache_stats = HitStats()
+
+_listener: Optional[asyncio.Task] = None
+
+
+def is_locally_cached(key: str) -> bool:
+    return key.startswith(LOCAL_CACHE_PREFIXES)
+
+
+async def publish_invalidation(keys: Iterable[str] = (), patterns: Iterable[str] = ()) -> None:
+    """Evict keys locally and tell every other worker to do the same."""
+    keys = [key for key in keys if is_locally_cached(key)]
+    patterns = [pattern for pattern in patterns if is_locally_cached(pattern)]
+    if not keys and not patterns:
+        return
+
+    local_cache.evict(keys, patterns)
+    redis_client = await redis_handler.get_client()
+    await redis_client.publish(INVALIDATION_CHANNEL, json.dumps({"keys": keys, "patterns": patterns}))
+
+
+async def _listen() -> None:
+    while True:
+        pubsub = None
+        try:
+            redis_client = await redis_handler.get_client()
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            local_cache.clear()
+
+            async for message in pubsub.listen():
+                payload = json.loads(message["data"])
+                local_cache.evict(payload.get("keys", ()), payload.get("patterns", ()))
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Cache invalidation listener failed, resubscribing: %s", e, exc_info=True)
+            local_cache.clear()
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+        finally:
+            if pubsub is not None:
+                await pubsub.close()
+
+
+def start_invalidation_listener() -> None:
+    global _listener
+    if _listener is None:
+        _listener = asyncio.create_task(_listen())
+        logger.info("Cache invalidation listener started")
+
+
+async def stop_invalidation_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.cancel()
+        try:
+            await _listener
+        except asyncio.CancelledError:
+            pass
+        _listener = None
+        logger.info("Cache invalidation listener stopped")
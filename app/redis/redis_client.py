@@ -11,6 +11,8 @@ logger = logging.getLogger(__name__)
 class RedisClientManager:
     def __init__(self):
         self.client: Optional[redis.Redis] = None
+        # Second client without response decoding, for payloads stored as raw bytes.
+        self.binary_client: Optional[redis.Redis] = None
 
     @retry(
         stop=stop_after_attempt(10),
@@ -27,7 +29,7 @@ class RedisClientManager:
             "Failed to connect to Redis after %d attempts", retry_state.attempt_number
         ) if retry_state.outcome.failed else None
     )
-    async def _connect_with_retry(self) -> redis.Redis:
+    async def _connect_with_retry(self, decode_responses: bool = True) -> redis.Redis:
         """
         Attempt to create and connect to a Redis instance with retry logic.
         """
@@ -38,7 +40,7 @@ class RedisClientManager:
                 port=int(env.REDIS_PORT),
                 password=env.REDIS_PASSWORD,
                 db=0,
-                decode_responses=True
+                decode_responses=decode_responses
             )
             await client.ping()
             logger.info("Successfully connected to Redis")
@@ -63,6 +65,14 @@ class RedisClientManager:
 
     async def disconnect(self):
         """Closes the Redis connection asynchronously."""
+        if self.binary_client:
+            try:
+                await self.binary_client.close()
+            except Exception as e:
+                logger.error("Error closing binary Redis connection: %s", str(e))
+            finally:
+                self.binary_client = None
+
         if self.client:
             try:
                 await self.client.close()
@@ -80,5 +90,14 @@ class RedisClientManager:
             await self.connect()
         return self.client
 
+    async def get_binary_client(self) -> Optional[redis.Redis]:
+        """Returns a client that hands values back as bytes instead of str."""
+        if self.binary_client is None:
+            try:
+                self.binary_client = await self._connect_with_retry(decode_responses=False)
+            except Exception:
+                self.binary_client = None
+        return self.binary_client
+
 # Create singleton instance
 redis_handler = RedisClientManager()
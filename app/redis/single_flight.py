@@ -0,0 +1,60 @@
+import asyncio, logging, uuid
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from app.redis.redis_client import redis_handler
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LOCK_LEASE_MS = 5000
+
+# Releases the lock only if it still holds our token, so an expired lease
+# taken over by another worker is never released by the previous holder.
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_inflight: Dict[str, asyncio.Task] = {}
+
+
+async def coalesce(key: str, fn: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run `fn` at most once per key in this process: concurrent callers share
+    the running task's result (or exception). The task is shielded, so a
+    disconnecting client does not cancel the work others are waiting for.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(fn())
+        _inflight[key] = task
+
+        def _forget(done: asyncio.Task) -> None:
+            if _inflight.get(key) is done:
+                del _inflight[key]
+        task.add_done_callback(_forget)
+    return await asyncio.shield(task)
+
+
+def lock_key(key: str) -> str:
+    return f"{key}:lock"
+
+
+async def acquire_lock(key: str, lease_ms: int = LOCK_LEASE_MS) -> Optional[str]:
+    """Try to take the cross-worker lock for `key`. Returns the lock token, or None if held."""
+    redis_client = await redis_handler.get_client()
+    token = uuid.uuid4().hex
+    if await redis_client.set(lock_key(key), token, nx=True, px=lease_ms):
+        return token
+    return None
+
+
+async def release_lock(key: str, token: str) -> None:
+    try:
+        redis_client = await redis_handler.get_client()
+        await redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key(key), token)
+    except Exception as e:
+        logger.warning("Failed to release lock %s: %s", lock_key(key), e)
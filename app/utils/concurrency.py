@@ -0,0 +1,16 @@
+import asyncio
+from typing import Any, Awaitable, Iterable, List
+
+
+async def gather_with_concurrency(limit: int, aws: Iterable[Awaitable[Any]]) -> List[Any]:
+    """
+    Run awaitables concurrently with at most `limit` in flight at a time.
+    Results keep the input order; exceptions are returned in place of results.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw: Awaitable[Any]) -> Any:
+        async with semaphore:
+            return await aw
+
+    return await asyncio.gather(*(run(aw) for aw in aws), return_exceptions=True)
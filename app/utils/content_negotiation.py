@@ -0,0 +1,130 @@
+"""
+MessagePack responses for clients that send `Accept: application/msgpack`.
+
+Cached reads encode (and cache) the MessagePack form themselves; every other
+JSON response is converted by MsgPackMiddleware on its way out. The two
+renderings carry different strong ETags, and every response varies on Accept,
+so caches never hand one encoding to a client that asked for the other.
+"""
+import msgpack, orjson
+from typing import Dict, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+MSGPACK_MEDIA_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+
+JSON_MEDIA_RANGES = ("application/json", "application/*", "*/*")
+
+
+def _media_ranges(accept: str) -> Dict[str, float]:
+    """Map each media range of an Accept header to its q-value (the highest, if listed twice)."""
+    ranges: Dict[str, float] = {}
+    for media_range in accept.split(","):
+        media_type, *params = (part.strip() for part in media_range.split(";"))
+        if not media_type:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    q = 0.0
+        media_type = media_type.lower()
+        ranges[media_type] = max(q, ranges.get(media_type, 0.0))
+    return ranges
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """
+    True when the Accept header prefers MessagePack: it is listed with a
+    q-value strictly greater than the best one covering JSON (application/json,
+    application/* or */*). Ties keep JSON.
+    """
+    if not accept:
+        return False
+    ranges = _media_ranges(accept)
+    msgpack_q = max((ranges.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES), default=0.0)
+    json_q = max((ranges.get(media_type, 0.0) for media_type in JSON_MEDIA_RANGES), default=0.0)
+    return msgpack_q > json_q
+
+
+def json_to_msgpack(body: bytes) -> bytes:
+    return msgpack.packb(orjson.loads(body), use_bin_type=True)
+
+
+def msgpack_etag(etag: Optional[str]) -> Optional[str]:
+    """ETag of the MessagePack rendering of a JSON body: `"<hash>"` becomes `"<hash>-mp"`."""
+    if not etag:
+        return etag
+    return f'{etag[:-1]}-mp"' if etag.endswith('"') else f"{etag}-mp"
+
+
+def _vary_on_accept(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if vary is None:
+        headers["vary"] = "Accept"
+    elif "accept" not in {token.strip().lower() for token in vary.split(",")} and vary.strip() != "*":
+        headers["vary"] = f"{vary}, Accept"
+
+
+class MsgPackMiddleware:
+    """
+    Re-encode buffered application/json responses when the client asked for
+    MessagePack. Every response, whichever encoding it has, gets `Vary: Accept`.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if not wants_msgpack(Headers(scope=scope).get("accept")):
+            async def send_json(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    _vary_on_accept(MutableHeaders(scope=message))
+                await send(message)
+
+            await self.app(scope, receive, send_json)
+            return
+
+        start: Optional[Message] = None
+        chunks = []
+
+        async def send_msgpack(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if Headers(raw=message["headers"]).get("content-type", "").startswith("application/json"):
+                    start = message
+                    return
+                _vary_on_accept(MutableHeaders(scope=message))
+                await send(message)
+                return
+
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = b"".join(chunks)
+            headers = MutableHeaders(scope=start)
+            if body:
+                body = json_to_msgpack(body)
+                headers["content-type"] = MSGPACK_MEDIA_TYPE
+                headers["content-length"] = str(len(body))
+                if "etag" in headers:
+                    headers["etag"] = msgpack_etag(headers["etag"])
+            _vary_on_accept(headers)
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_msgpack)
@@ -0,0 +1,29 @@
+from typing import Iterable, Optional, Tuple
+from fastapi import HTTPException
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str], always: Tuple[str, ...] = ("id",)) -> Optional[Tuple[str, ...]]:
+    """
+    Normalize a `fields=a,b` query parameter into a sorted tuple of field
+    names, so equivalent requests share a cache entry. `always` fields are
+    added so results stay addressable. No parameter means every field (None).
+    """
+    if not fields:
+        return None
+    allowed = set(allowed)
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(sorted(requested | set(always)))
+
+
+def fields_key(fields: Optional[Tuple[str, ...]]) -> str:
+    return ",".join(fields) if fields else "all"
+
+
+def project(record: dict, fields: Optional[Tuple[str, ...]]) -> dict:
+    """Keep only `fields` of a serialized record, in the record's own order."""
+    if fields is None:
+        return record
+    return {key: value for key, value in record.items() if key in fields}
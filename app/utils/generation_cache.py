@@ -0,0 +1,47 @@
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class GenerationCache:
+    """
+    In-process LRU of per-user derived data (indexes, matrices) that stays
+    valid while the user's wardrobe generation is unchanged. Bounded by the
+    total size of its values, which callers pass (usually the arrays' nbytes).
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # user_id -> (generation, size, value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: str, generation: str) -> Optional[Any]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] != generation:
+            return None
+        self._entries.move_to_end(user_id)
+        return entry[2]
+
+    def latest(self, user_id: str) -> Optional[Any]:
+        """The cached value whatever its generation, for callers that update it incrementally."""
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        self._entries.move_to_end(user_id)
+        return entry[2]
+
+    def put(self, user_id: str, generation: str, value: Any, size: int) -> None:
+        self._remove(user_id)
+        if size > self.max_bytes:
+            return
+        self._entries[user_id] = (generation, size, value)
+        self.size += size
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, user_id: str) -> None:
+        entry = self._entries.pop(user_id, None)
+        if entry is not None:
+            self.size -= entry[1]
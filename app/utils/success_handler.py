@@ -1,4 +1,6 @@
+import orjson
 from typing import Any, Optional
+from fastapi import Response
 
 def success_response(message: str, data: Optional[Any] = None) -> dict:
     """
@@ -15,3 +17,29 @@ def success_response(message: str, data: Optional[Any] = None) -> dict:
         return {"success": True, "message": message}
 
     return {"success": True, "message": message, "data": data}
+
+
+def render_success_response(message: str, data_json: bytes) -> bytes:
+    """
+    Render the success envelope around data that is already JSON encoded,
+    so the same encoded data can be wrapped with different messages.
+
+    Parameters:
+        - message (str): The success message to include in the response.
+        - data_json (bytes): The response data, already serialized to JSON.
+
+    Returns:
+        - bytes: The serialized envelope, identical in shape to `success_response`.
+    """
+    return b'{"success":true,"message":' + orjson.dumps(message) + b',"data":' + data_json + b"}"
+
+
+def raw_json_response(body: bytes, etag: Optional[str] = None, media_type: str = "application/json") -> Response:
+    """
+    Wrap a pre-rendered body in a Response, skipping FastAPI's encoding.
+    The body may also be the MessagePack rendering of the same envelope.
+    """
+    headers = {"Vary": "Accept"}
+    if etag:
+        headers["ETag"] = etag
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,75 @@
+import fnmatch, time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+
+class TTLCache:
+    """
+    In-process LRU with a per-entry TTL, bounded by the total size of its
+    values (callers pass the size, usually the length of the encoded body).
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, size, value)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[2]
+
+    def set(self, key: str, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, size, value)
+        self.size += size
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+
+    def evict(self, keys: Iterable[str] = (), patterns: Iterable[str] = ()) -> None:
+        for key in keys:
+            self._remove(key)
+        for pattern in patterns:
+            for key in [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+
+class HitStats:
+    """Hit/miss counters per cache tier."""
+
+    def __init__(self):
+        self._counts: Dict[str, list] = {}
+
+    def record(self, tier: str, hit: bool) -> None:
+        counts = self._counts.setdefault(tier, [0, 0])
+        counts[0 if hit else 1] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {
+            tier: {
+                "hits": hits,
+                "misses": misses,
+                "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None
+            }
+            for tier, (hits, misses) in self._counts.items()
+        }
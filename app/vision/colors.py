@@ -0,0 +1,124 @@
+import numpy as np
+from typing import Optional
+from PIL import Image
+from prisma.enums import Color
+
+CLUSTERS = 4
+ITERATIONS = 10
+# Border pixels closer than this (CIELAB distance) to their median are background.
+BACKGROUND_DISTANCE = 15.0
+BACKGROUND_BORDER_SHARE = 0.8
+# Below this share, the largest cluster does not make the garment single-coloured.
+MULTICOLOR_SHARE = 0.4
+
+PALETTE_RGB = {
+    Color.BLACK: (20, 20, 20),
+    Color.WHITE: (245, 245, 245),
+    Color.GRAY: (128, 128, 128),
+    Color.RED: (200, 30, 35),
+    Color.BLUE: (35, 85, 200),
+    Color.YELLOW: (240, 210, 40),
+    Color.GREEN: (40, 140, 60),
+    Color.NAVY: (25, 35, 80),
+    Color.PURPLE: (110, 50, 140),
+    Color.BROWN: (110, 70, 40),
+    Color.BEIGE: (220, 200, 170),
+    Color.TAN: (200, 160, 110),
+    Color.KHAKI: (185, 170, 120),
+    Color.PINK: (240, 150, 180),
+    Color.MAROON: (110, 20, 35),
+    Color.OLIVE: (100, 110, 50),
+    Color.BURGUNDY: (125, 20, 55),
+    Color.CREAM: (250, 240, 210),
+    Color.CHARCOAL: (55, 55, 60),
+    Color.DENIM: (70, 100, 140),
+}
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """Convert an (n, 3) array of sRGB values in 0-255 to CIELAB (D65)."""
+    rgb = rgb.astype(np.float32) / 255.0
+    linear = np.where(rgb > 0.04045, ((rgb + 0.055) / 1.055) ** 2.4, rgb / 12.92)
+    xyz = linear @ np.array([
+        [0.4124, 0.2126, 0.0193],
+        [0.3576, 0.7152, 0.1192],
+        [0.1805, 0.0722, 0.9505],
+    ], dtype=np.float32)
+    xyz /= np.array([0.95047, 1.0, 1.08883], dtype=np.float32)
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.stack([116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])], axis=1)
+
+
+PALETTE = list(PALETTE_RGB)
+PALETTE_LAB = rgb_to_lab(np.array([PALETTE_RGB[color] for color in PALETTE]))
+
+
+def kmeans(points: np.ndarray, clusters: int, iterations: int = ITERATIONS) -> tuple:
+    """
+    Vectorized Lloyd's k-means. Centres start at evenly spaced lightness
+    quantiles, which keeps the result deterministic. Returns (centres, counts).
+    """
+    clusters = min(clusters, len(points))
+    order = np.argsort(points[:, 0])
+    centers = points[order[np.linspace(0, len(points) - 1, clusters).astype(int)]].copy()
+
+    for _ in range(iterations):
+        distances = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=clusters)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, points)
+        filled = counts > 0
+        updated = sums[filled] / counts[filled, None]
+        if np.allclose(updated, centers[filled], atol=0.5):
+            centers[filled] = updated
+            break
+        centers[filled] = updated
+
+    distances = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+    return centers, np.bincount(distances.argmin(axis=1), minlength=clusters)
+
+
+def _foreground(lab: np.ndarray) -> np.ndarray:
+    """
+    Drop a uniform studio background: when most border pixels share one
+    colour, pixels close to it are excluded from the clustering.
+    """
+    height, width, _ = lab.shape
+    border = np.concatenate([lab[0], lab[-1], lab[:, 0], lab[:, -1]])
+    background = np.median(border, axis=0)
+    if (np.linalg.norm(border - background, axis=1) < BACKGROUND_DISTANCE).mean() < BACKGROUND_BORDER_SHARE:
+        return lab.reshape(-1, 3)
+
+    pixels = lab.reshape(-1, 3)
+    foreground = pixels[np.linalg.norm(pixels - background, axis=1) >= BACKGROUND_DISTANCE]
+    return foreground if len(foreground) >= 0.1 * len(pixels) else pixels
+
+
+def nearest_color(lab: np.ndarray) -> Color:
+    return PALETTE[int(np.linalg.norm(PALETTE_LAB - lab, axis=1).argmin())]
+
+
+def dominant_color(image: Image.Image) -> Optional[Color]:
+    """
+    Map the dominant garment colour of an RGB thumbnail to the Color enum.
+    Garments whose clusters map to several colours without a clear winner
+    are tagged MULTICOLOR.
+    """
+    rgb = np.asarray(image.convert("RGB"))
+    if rgb.size == 0:
+        return None
+    lab = rgb_to_lab(rgb.reshape(-1, 3)).reshape(rgb.shape)
+    points = _foreground(lab)
+
+    centers, counts = kmeans(points, CLUSTERS)
+    shares = {}
+    for center, count in zip(centers, counts):
+        if count:
+            color = nearest_color(center)
+            shares[color] = shares.get(color, 0) + count / counts.sum()
+
+    best, share = max(shares.items(), key=lambda entry: entry[1])
+    if share < MULTICOLOR_SHARE and sum(1 for value in shares.values() if value >= 0.2) >= 3:
+        return Color.MULTICOLOR
+    return best
@@ -0,0 +1,43 @@
+import numpy as np
+from typing import List
+from PIL import Image
+
+HUE_BINS, SATURATION_BINS, VALUE_BINS = 8, 4, 4
+LAYOUT_SIZE = 8
+HISTOGRAM_WEIGHT = 0.7
+DESCRIPTOR_SIZE = HUE_BINS * SATURATION_BINS * VALUE_BINS + LAYOUT_SIZE * LAYOUT_SIZE
+
+
+def _color_histogram(image: Image.Image) -> np.ndarray:
+    hsv = np.asarray(image.convert("HSV"), dtype=np.uint16).reshape(-1, 3)
+    bins = (
+        (hsv[:, 0] * HUE_BINS >> 8) * SATURATION_BINS * VALUE_BINS
+        + (hsv[:, 1] * SATURATION_BINS >> 8) * VALUE_BINS
+        + (hsv[:, 2] * VALUE_BINS >> 8)
+    )
+    histogram = np.bincount(bins, minlength=HUE_BINS * SATURATION_BINS * VALUE_BINS).astype(np.float32)
+    # Hellinger mapping: cosine over square-rooted distributions
+    return np.sqrt(histogram / max(histogram.sum(), 1.0))
+
+
+def _layout(image: Image.Image) -> np.ndarray:
+    gray = np.asarray(image.convert("L").resize((LAYOUT_SIZE, LAYOUT_SIZE), Image.BILINEAR), dtype=np.float32)
+    gray = gray.ravel() - gray.mean()
+    norm = np.linalg.norm(gray)
+    return gray / norm if norm else gray
+
+
+def compute_descriptor(image: Image.Image) -> List[float]:
+    """
+    Compute a compact visual descriptor of an RGB thumbnail: an HSV colour
+    histogram plus a coarse 8x8 luminance layout, L2-normalised so a dot
+    product is the cosine similarity.
+    """
+    descriptor = np.concatenate([
+        HISTOGRAM_WEIGHT * _color_histogram(image),
+        (1 - HISTOGRAM_WEIGHT) * _layout(image),
+    ])
+    norm = np.linalg.norm(descriptor)
+    if norm:
+        descriptor /= norm
+    return [round(float(value), 6) for value in descriptor]
@@ -0,0 +1,36 @@
+import io, logging
+from typing import Optional
+from PIL import Image
+from app.vision.descriptors import compute_descriptor
+from app.vision.phash import dhash
+
+# Logging setup
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = 64
+
+
+def load_thumbnail(image_bytes: bytes, size: int = THUMBNAIL_SIZE) -> Image.Image:
+    """
+    Decode an image straight to a small RGB thumbnail. JPEGs are decoded at a
+    reduced scale (draft mode), which avoids decoding full resolution pixels.
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    image.draft("RGB", (size * 2, size * 2))
+    image = image.convert("RGB")
+    image.thumbnail((size, size))
+    return image
+
+
+def extract_image_features(image_bytes: bytes) -> Optional[dict]:
+    """
+    Decode an item image once and compute every stored visual feature.
+    Returns None when the bytes cannot be decoded as an image.
+    """
+    try:
+        image = load_thumbnail(image_bytes)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logger.warning("Could not decode item image: %s", e)
+        return None
+
+    return {"descriptor": compute_descriptor(image), "image_hash": dhash(image)}
@@ -0,0 +1,125 @@
+import numpy as np
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from PIL import Image
+from app.utils.ttl_cache import TTLCache
+
+HASH_SIZE = 8
+# Hashes at most this many bits apart (out of 64) are treated as the same photo.
+DUPLICATE_DISTANCE = 6
+# Indexes are caught up with the table whenever the wardrobe generation moves;
+# the TTL only releases the memory of users who stopped uploading.
+HASH_INDEX_TTL = 3600
+HASH_INDEX_MAX_BYTES = 16 * 1024 * 1024
+HASH_ENTRY_BYTES = 128
+
+
+def dhash(image: Image.Image) -> str:
+    """
+    Difference hash: shrink to a 9x8 grayscale grid and record whether each
+    pixel is brighter than its right neighbour. Returns 64 bits as hex.
+    """
+    gray = np.asarray(
+        image.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.BILINEAR),
+        dtype=np.int16
+    )
+    bits = (gray[:, 1:] > gray[:, :-1]).ravel()
+    return f"{int(np.packbits(bits).view('>u8')[0]):016x}"
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over 64-bit hashes with the Hamming metric. A radius
+    search only visits children whose edge distance is within the radius of
+    the query distance, which keeps near-duplicate lookups around O(log n).
+    """
+
+    def __init__(self):
+        self.root: Optional[list] = None  # [hash, item_ids, {distance: child}]
+
+    def add(self, value: int, item_id: str) -> None:
+        if self.root is None:
+            self.root = [value, [item_id], {}]
+            return
+        node = self.root
+        while True:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                node[1].append(item_id)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item_id], {}]
+                return
+            node = child
+
+    def remove(self, value: int, item_id: str) -> None:
+        """Drop an item from the node holding its hash; the node stays as a branch point."""
+        node = self.root
+        while node is not None:
+            distance = hamming_distance(value, node[0])
+            if distance == 0:
+                if item_id in node[1]:
+                    node[1].remove(item_id)
+                return
+            node = node[2].get(distance)
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, str]]:
+        """Return (distance, item_id) for every hash within max_distance, closest first."""
+        matches = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node[0])
+            if distance <= max_distance:
+                matches.extend((distance, item_id) for item_id in node[1])
+            for edge, child in node[2].items():
+                if distance - max_distance <= edge <= distance + max_distance:
+                    stack.append(child)
+        matches.sort()
+        return matches
+
+
+class HashIndex:
+    """
+    One user's image hashes in a BK-tree, plus the hash of every item so an
+    item can be removed or re-hashed knowing only its id.
+    """
+
+    def __init__(self, rows: Iterable[Tuple[str, str]] = ()):
+        self.tree = BKTree()
+        self.hashes: Dict[str, int] = {}
+        # Wardrobe generation the index was last caught up at, and the time
+        # (UTC) of the read that caught it up.
+        self.generation: Optional[str] = None
+        self.synced_at: Optional[datetime] = None
+        for item_id, image_hash in rows:
+            self.add(item_id, image_hash)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def add(self, item_id: str, image_hash: str) -> None:
+        self.remove(item_id)
+        value = int(image_hash, 16)
+        self.tree.add(value, item_id)
+        self.hashes[item_id] = value
+
+    def remove(self, item_id: str) -> None:
+        value = self.hashes.pop(item_id, None)
+        if value is not None:
+            self.tree.remove(value, item_id)
+
+
+def find_duplicates(index: HashIndex, image_hash: str, max_distance: int = DUPLICATE_DISTANCE) -> List[Dict]:
+    return [
+        {"item_id": item_id, "distance": distance}
+        for distance, item_id in index.tree.search(int(image_hash, 16), max_distance)
+    ]
+
+
+hash_indexes = TTLCache(max_bytes=HASH_INDEX_MAX_BYTES, ttl=HASH_INDEX_TTL)
@@ -0,0 +1,95 @@
+import numpy as np
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.vision.descriptors import DESCRIPTOR_SIZE
+from app.utils.generation_cache import GenerationCache
+
+SIMILARITY_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Rough in-memory size of one cached item dict, counted with the matrix.
+ITEM_ENTRY_BYTES = 1024
+
+
+class SimilarityIndex:
+    """
+    Array-backed index of one user's item descriptors. Rows are unit vectors,
+    so a matrix product gives the cosine similarity against every item.
+    """
+
+    def __init__(self, items: Iterable = ()):
+        """
+        Build the index from WardrobeItem rows loaded with their features.
+        """
+        self.ids: List[str] = []
+        self.positions: Dict[str, int] = {}
+        self.items: Dict[str, dict] = {}
+        self.vectors = np.empty((0, DESCRIPTOR_SIZE), dtype=np.float32)
+        # Time (UTC) of the read the index was last brought up to date with.
+        self.synced_at: Optional[datetime] = None
+        self.upsert(items)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.positions
+
+    @property
+    def nbytes(self) -> int:
+        return self.vectors.nbytes + len(self.ids) * ITEM_ENTRY_BYTES
+
+    def upsert(self, items: Iterable) -> None:
+        """
+        Add or replace WardrobeItem rows loaded with their features. Items
+        whose image has no usable descriptor (any more) are dropped.
+        """
+        new_ids, new_vectors, dropped = [], [], []
+        for item in items:
+            feature = item.features
+            if not feature or not feature.descriptor or len(feature.descriptor) != DESCRIPTOR_SIZE:
+                dropped.append(item.id)
+                continue
+            self.items[item.id] = item.model_dump(mode="json", exclude={"features", "user"})
+            if item.id in self.positions:
+                self.vectors[self.positions[item.id]] = feature.descriptor
+            else:
+                new_ids.append(item.id)
+                new_vectors.append(feature.descriptor)
+
+        if new_ids:
+            self.positions.update((item_id, len(self.ids) + row) for row, item_id in enumerate(new_ids))
+            self.ids.extend(new_ids)
+            self.vectors = np.vstack([self.vectors, np.array(new_vectors, dtype=np.float32)])
+        self.remove(dropped)
+
+    def remove(self, item_ids: Iterable[str]) -> None:
+        """Drop deleted items, compacting the matrix in one pass."""
+        gone = {item_id for item_id in item_ids if item_id in self.positions}
+        if not gone:
+            return
+        keep = np.array([item_id not in gone for item_id in self.ids], dtype=bool)
+        self.vectors = self.vectors[keep]
+        self.ids = [item_id for item_id in self.ids if item_id not in gone]
+        self.positions = {item_id: row for row, item_id in enumerate(self.ids)}
+        for item_id in gone:
+            self.items.pop(item_id, None)
+
+    def search(self, item_ids: List[str], limit: int) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Return the `limit` most similar items for each query item, computed as
+        one batched (queries x items) matrix product.
+        """
+        queries = [item_id for item_id in item_ids if item_id in self.positions]
+        if not queries or len(self.ids) < 2:
+            return {item_id: [] for item_id in queries}
+
+        rows = np.array([self.positions[item_id] for item_id in queries])
+        scores = self.vectors[rows] @ self.vectors.T
+        scores[np.arange(len(rows)), rows] = -np.inf
+
+        keep = min(limit, len(self.ids) - 1)
+        best = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+        results = {}
+        for query, row_best, row_scores in zip(queries, best, scores):
+            ordered = row_best[np.argsort(-row_scores[row_best])]
+            results[query] = [(self.ids[col], float(row_scores[col])) for col in ordered]
+        return results
+
+
+similarity_indexes = GenerationCache(max_bytes=SIMILARITY_CACHE_MAX_BYTES)
@@ -5,6 +5,7 @@ load_dotenv()
 
 class Environment:
     DATABASE_URL:str=os.getenv("MC_DATABASE_URL")
+    DATABASE_REPLICA_URL:str=os.getenv("VW_DATABASE_REPLICA_URL")
     RESEND_API_KEY:str=os.getenv("VW_RESEND_API_KEY")
     JWT_SECRET_KEY:str=os.getenv("VW_JWT_SECRET_KEY")
     GOOGLE_CLIENT_ID:str=os.getenv("VW_GOOGLE_CLIENT_ID")
@@ -22,6 +23,7 @@ class Environment:
     REDIS_PORT:str=os.getenv("VW_REDIS_PORT")
     REDIS_PASSWORD:str=os.getenv("VW_REDIS_PASSWORD")
     LOG_DIR:str=os.getenv("VW_LOG_DIR")
+    JSON_FAST_PATH:bool=os.getenv("VW_JSON_FAST_PATH", "false").lower() == "true"
 
     @classmethod
     def to_dict(cls):
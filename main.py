@@ -3,14 +3,20 @@ from logging.handlers import TimedRotatingFileHandler
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from app.db.prisma_client import PrismaClient
+from app.db.prisma_client import PrismaClient, ReplicaClient
 from app.redis.redis_client import redis_handler
+from app.redis.local_cache import start_invalidation_listener, stop_invalidation_listener
+from app.jobs.scheduler import start_scheduler, shutdown_scheduler
+from app.utils.content_negotiation import MsgPackMiddleware
 from app.api.v1.user.auth.routes.user import router as user_auth_router
 from app.api.v1.user.auth.routes.google_auth import router as google_auth_router
 from app.api.v1.user.info.routes import router as user_info_router
 from app.api.v1.wardrobe_items.routes import router as item_router
 from app.api.v1.contacts.routes import router as contact_router
 from app.api.v1.virtual_tryon.routes import router as virtual_tryon_router
+from app.api.v1.outfits.routes import router as outfit_router
+from app.api.v1.admin.routes import router as admin_router
+from app.api.v1.export.routes import router as export_router
 from env import env
 
 
@@ -66,10 +72,23 @@ async def lifespan(_app: FastAPI):
     logger.info("Flushing Redis database")
     await client.flushdb()
 
+    logger.info("Starting cache invalidation listener")
+    start_invalidation_listener()
+
+    logger.info("Starting scheduler")
+    start_scheduler()
+
     yield
 
+    logger.info("Shutting down scheduler")
+    shutdown_scheduler()
+
+    logger.info("Shutting down cache invalidation listener")
+    await stop_invalidation_listener()
+
     logger.info("Shutting down Prisma client")
     await PrismaClient.close_connection()
+    await ReplicaClient.close_connection()
 
     logger.info("Shutting down Redis client")
     await redis_handler.disconnect()
@@ -92,6 +111,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MsgPackMiddleware)
 
 app.include_router(user_auth_router, prefix="/api/v1", tags=["User Auth"])
 app.include_router(google_auth_router, prefix="/api/v1", tags=["Google Auth"])
@@ -99,6 +119,9 @@ app.include_router(user_info_router, prefix="/api/v1", tags=["User Info"])
 app.include_router(item_router, prefix="/api/v1", tags=["Wardrobe Items"])
 app.include_router(contact_router, prefix="/api/v1", tags=["Contacts"])
 app.include_router(virtual_tryon_router, prefix="/api/v1", tags=["Virtual Try-on"])
+app.include_router(outfit_router, prefix="/api/v1", tags=["Outfits"])
+app.include_router(export_router, prefix="/api/v1", tags=["Export"])
+app.include_router(admin_router, prefix="/api/v1", tags=["Admin"])
 
 @app.get("/")
 async def root():
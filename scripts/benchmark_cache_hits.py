@@ -0,0 +1,114 @@
+"""
+Benchmark the cached-response hit path.
+
+Compares the previous hit path (GET a JSON string, json.loads it, wrap it in
+`success_response` and let FastAPI run `jsonable_encoder` + `JSONResponse`)
+with the current one (GET the pre-rendered envelope as bytes and send it as
+is). Prints wall-clock latency and CPU time per request for each.
+
+Runs against the configured Redis; pass --no-redis to measure the
+serialization work alone.
+
+Usage:
+    python -m scripts.benchmark_cache_hits --items 100 --requests 2000
+"""
+import argparse, asyncio, json, statistics, time, uuid
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.redis.redis_client import redis_handler
+from app.utils.success_handler import raw_json_response, render_success_response, success_response
+
+BENCH_KEY = "bench_cache_hits"
+
+
+def sample_payload(items: int) -> dict:
+    return {
+        "items": [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": str(uuid.uuid4()),
+                "category": "TOPS",
+                "type": "T_SHIRT",
+                "brand": f"Brand {n}",
+                "size": "M",
+                "color": "NAVY",
+                "image_url": f"https://storage.googleapis.com/bench/wardrobe/{uuid.uuid4()}.jpg",
+                "created_at": "2026-01-01T10:00:00.000000+00:00",
+                "updated_at": "2026-01-01T10:00:00.000000+00:00",
+            }
+            for n in range(items)
+        ],
+        "metadata": {
+            "page": 1, "page_size": items, "total_items": items, "total_pages": 1,
+            "has_next": False, "has_previous": False
+        }
+    }
+
+
+def legacy_hit(cached: str) -> bytes:
+    data = success_response(message="Wardrobe items retrieved from cache", data=json.loads(cached))
+    return JSONResponse(content=jsonable_encoder(data)).body
+
+
+def raw_hit(cached: bytes) -> bytes:
+    return raw_json_response(cached).body
+
+
+async def measure(name: str, requests: int, hit) -> None:
+    latencies = []
+    cpu_started = time.process_time()
+    for _ in range(requests):
+        started = time.perf_counter()
+        await hit()
+        latencies.append((time.perf_counter() - started) * 1000)
+    cpu_ms = (time.process_time() - cpu_started) * 1000 / requests
+
+    latencies.sort()
+    print(
+        f"{name:<8} p50={statistics.median(latencies):.3f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99) - 1]:.3f}ms cpu={cpu_ms:.3f}ms/request"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--no-redis", action="store_true")
+    args = parser.parse_args()
+
+    payload = sample_payload(args.items)
+    legacy_value = json.dumps(payload)
+    raw_value = render_success_response("Wardrobe items retrieved from cache", orjson.dumps(payload))
+    print(f"payload: {args.items} items, {len(raw_value)} bytes")
+
+    if args.no_redis:
+        async def legacy():
+            return legacy_hit(legacy_value)
+
+        async def raw():
+            return raw_hit(raw_value)
+    else:
+        client = await redis_handler.get_client()
+        binary_client = await redis_handler.get_binary_client()
+        await client.set(f"{BENCH_KEY}_legacy", legacy_value)
+        await binary_client.set(f"{BENCH_KEY}_raw", raw_value)
+
+        async def legacy():
+            return legacy_hit(await client.get(f"{BENCH_KEY}_legacy"))
+
+        async def raw():
+            return raw_hit(await binary_client.get(f"{BENCH_KEY}_raw"))
+
+    try:
+        await measure("legacy", args.requests, legacy)
+        await measure("raw", args.requests, raw)
+    finally:
+        if not args.no_redis:
+            await client.delete(f"{BENCH_KEY}_legacy", f"{BENCH_KEY}_raw")
+            await redis_handler.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
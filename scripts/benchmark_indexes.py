@@ -0,0 +1,171 @@
+"""
+Benchmark the hot-path indexes against seeded tables.
+
+Seeds synthetic users, wardrobe items and try-ons (2M and 1M rows by default), then times the hot queries and prints
+their EXPLAIN ANALYZE plans twice: with the current indexes, and inside a
+rolled-back transaction that restores the previous `(user_id)` indexes and
+drops the new ones. Column values are derived from a hash of the row number
+rather than random(), so every run seeds the same data.
+
+Usage:
+    python -m scripts.benchmark_indexes --items 2000000 --tryons 1000000 --users 20000
+    python -m scripts.benchmark_indexes --skip-seed
+    python -m scripts.benchmark_indexes --cleanup
+"""
+import argparse, asyncio, statistics, time
+from prisma import Prisma
+
+BENCH_USER_PREFIX = "bench-idx-user-"
+BATCH_SIZE = 100000
+
+NEW_INDEXES = (
+    "wardrobe_item_user_id_created_at_index",
+    "wardrobe_item_user_id_category_color_index",
+    "virtual_try_on_user_id_created_at_index",
+)
+OLD_INDEXES = (
+    'CREATE INDEX "wardrobe_item_user_id_index" ON "WardrobeItem" (user_id)',
+    'CREATE INDEX "virtual_try_on_user_id_index" ON "VirtualTryOn" (user_id)',
+)
+
+# The statements Prisma issues for the hot paths, with their parameters.
+QUERIES = {
+    "wardrobe list": (
+        'SELECT * FROM "WardrobeItem" WHERE user_id = $1 ORDER BY created_at DESC LIMIT 10 OFFSET 20',
+        lambda user: (user,),
+    ),
+    "wardrobe filtered": (
+        'SELECT * FROM "WardrobeItem" WHERE user_id = $1 AND category = $2::"ItemCategory" '
+        'AND color = $3::"Color" ORDER BY created_at DESC LIMIT 10',
+        lambda user: (user, "SHIRT", "BLACK"),
+    ),
+    "virtual try-on list": (
+        'SELECT * FROM "VirtualTryOn" WHERE user_id = $1 ORDER BY created_at DESC LIMIT 10',
+        lambda user: (user,),
+    ),
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _fraction(salt: str) -> str:
+    """Deterministic value in [0, 1) for row number n."""
+    return f"((hashtext(n || '{salt}') & 2147483647) / 2147483648.0)"
+
+
+def _pick_enum(enum_name: str) -> str:
+    return (
+        f'(enum_range(NULL::"{enum_name}"))'
+        f'[1 + floor({_fraction(enum_name)} * array_length(enum_range(NULL::"{enum_name}"), 1))::int]'
+    )
+
+
+async def _seed_rows(prisma: Prisma, label: str, insert: str, rows: int, users: int) -> None:
+    started = time.perf_counter()
+    for offset in range(0, rows, BATCH_SIZE):
+        size = min(BATCH_SIZE, rows - offset)
+        await prisma.execute_raw(insert, BENCH_USER_PREFIX, users, offset, size)
+        print(f"seeded {offset + size}/{rows} {label} ({time.perf_counter() - started:.1f}s)")
+
+
+async def seed(prisma: Prisma, items: int, tryons: int, users: int) -> None:
+    await prisma.execute_raw(
+        'INSERT INTO "User" (id, name, email, updated_at) '
+        "SELECT $1 || n, 'Bench User ' || n, $1 || n || '@bench.local', now() "
+        "FROM generate_series(0, $2 - 1) AS n ON CONFLICT DO NOTHING",
+        BENCH_USER_PREFIX, users
+    )
+    await _seed_rows(
+        prisma, "wardrobe items",
+        'INSERT INTO "WardrobeItem" (id, user_id, category, type, size, color, brand, created_at, updated_at) '
+        f"SELECT gen_random_uuid()::text, $1 || (n % $2), {_pick_enum('ItemCategory')}, "
+        f"{_pick_enum('ItemType')}, {_pick_enum('Size')}, {_pick_enum('Color')}, 'Brand ' || (n % 97), "
+        f"now() - {_fraction('created')} * interval '365 days', now() "
+        "FROM generate_series($3 + 1, $3 + $4) AS n",
+        items, users
+    )
+    await _seed_rows(
+        prisma, "virtual try-ons",
+        'INSERT INTO "VirtualTryOn" (id, user_id, human_image_url, garment_image_url, result_image_url, created_at, updated_at) '
+        "SELECT gen_random_uuid()::text, $1 || (n % $2), 'https://bench.local/h.png', "
+        "'https://bench.local/g.png', 'https://bench.local/r.png', "
+        f"now() - {_fraction('created')} * interval '365 days', now() "
+        "FROM generate_series($3 + 1, $3 + $4) AS n",
+        tryons, users
+    )
+    for table in ("User", "WardrobeItem", "VirtualTryOn"):
+        await prisma.execute_raw(f'ANALYZE "{table}"')
+
+
+async def cleanup(prisma: Prisma) -> None:
+    pattern = f"{BENCH_USER_PREFIX}%"
+    await prisma.execute_raw('DELETE FROM "WardrobeItem" WHERE user_id LIKE $1', pattern)
+    await prisma.execute_raw('DELETE FROM "VirtualTryOn" WHERE user_id LIKE $1', pattern)
+    await prisma.execute_raw('DELETE FROM "User" WHERE id LIKE $1', pattern)
+    print("benchmark rows removed")
+
+
+async def _run_queries(client: Prisma, users: int, repeat: int) -> None:
+    for label, (sql, params) in QUERIES.items():
+        timings = []
+        for run in range(repeat):
+            user = f"{BENCH_USER_PREFIX}{(run * 7919) % users}"
+            started = time.perf_counter()
+            await client.query_raw(sql, *params(user))
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        print(f"  {label:<20} median {statistics.median(timings):8.2f} ms   p95 {timings[int(len(timings) * 0.95) - 1]:8.2f} ms")
+
+    for label, (sql, params) in QUERIES.items():
+        plan = await client.query_raw(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", *params(f"{BENCH_USER_PREFIX}0"))
+        print(f"\n  plan for {label}:")
+        for row in plan:
+            print("    " + row["QUERY PLAN"])
+
+
+async def benchmark(prisma: Prisma, users: int, repeat: int) -> None:
+    print("with the hot-path indexes:")
+    await _run_queries(prisma, users, repeat)
+
+    print("\nwith the previous indexes:")
+    try:
+        # DDL is transactional in Postgres, so the old layout only exists
+        # inside this transaction and is rolled back afterwards.
+        async with prisma.tx(timeout=600000, max_wait=10000) as tx:
+            for index in NEW_INDEXES:
+                await tx.execute_raw(f'DROP INDEX IF EXISTS "{index}"')
+            for statement in OLD_INDEXES:
+                await tx.execute_raw(statement)
+            await _run_queries(tx, users, repeat)
+            raise _Rollback()
+    except _Rollback:
+        pass
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=2000000)
+    parser.add_argument("--tryons", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    prisma = Prisma()
+    await prisma.connect()
+    try:
+        if args.cleanup:
+            await cleanup(prisma)
+            return
+        if not args.skip_seed:
+            await seed(prisma, args.items, args.tryons, args.users)
+        await benchmark(prisma, args.users, args.repeat)
+    finally:
+        await prisma.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Benchmark wardrobe list page rendering: ORM objects vs JSON from Postgres.
+
+Uses the rows seeded by benchmark_wardrobe_search and, for each page size,
+times building a page through Prisma models (find_many, model_dump,
+orjson) against the row_to_json fast path, after checking both produce the
+same bytes.
+
+Usage:
+    python -m scripts.benchmark_list_fast_path --items 1000000 --users 100
+    python -m scripts.benchmark_list_fast_path --skip-seed
+    python -m scripts.benchmark_wardrobe_search --cleanup
+"""
+import argparse, asyncio, statistics, time
+import orjson
+from prisma import Prisma
+from app.api.v1.wardrobe_items.json_queries import fetch_wardrobe_page_json
+from scripts.benchmark_wardrobe_search import BENCH_USER_PREFIX, seed
+
+PAGE_SIZES = (10, 25, 50, 100)
+
+
+async def _time(label: str, run, repeat: int) -> None:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await run()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    print(f"  {label:<6} median {statistics.median(timings):8.2f} ms   p95 {timings[int(len(timings) * 0.95) - 1]:8.2f} ms")
+
+
+async def benchmark(prisma: Prisma, repeat: int) -> None:
+    filters = {"user_id": f"{BENCH_USER_PREFIX}0"}
+    metadata = {"page": 2}
+
+    for page_size in PAGE_SIZES:
+        async def orm() -> bytes:
+            items = await prisma.wardrobeitem.find_many(
+                where=filters, skip=page_size, take=page_size, order={"created_at": "desc"}
+            )
+            return orjson.dumps({"items": [item.model_dump(mode="json") for item in items], "metadata": metadata})
+
+        async def raw() -> bytes:
+            return bytes(await fetch_wardrobe_page_json(prisma, filters, page_size, page_size, metadata))
+
+        orm_body, raw_body = await orm(), await raw()
+        if orm_body != raw_body:
+            print(f"page size {page_size}: outputs differ (ties in created_at can reorder rows)")
+
+        print(f"page size {page_size} ({len(raw_body)} bytes)")
+        await _time("orm", orm, repeat)
+        await _time("raw", raw, repeat)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    prisma = Prisma()
+    await prisma.connect()
+    try:
+        if not args.skip_seed:
+            await seed(prisma, args.items, args.users)
+        await benchmark(prisma, args.repeat)
+    finally:
+        await prisma.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
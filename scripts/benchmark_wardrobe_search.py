@@ -0,0 +1,127 @@
+"""
+Benchmark wardrobe search against a seeded WardrobeItem table.
+
+Seeds synthetic users and items (1M items by default), then compares the
+legacy `brand ILIKE '%term%'` lookup with the trigram-ranked search and
+prints latencies and EXPLAIN ANALYZE plans.
+
+Usage:
+    python -m scripts.benchmark_wardrobe_search --items 1000000 --users 100
+    python -m scripts.benchmark_wardrobe_search --cleanup
+"""
+import argparse, asyncio, statistics, time
+from prisma import Prisma
+from app.api.v1.wardrobe_items.search import search_wardrobe_items, _build_search_clause
+
+BENCH_USER_PREFIX = "bench-user-"
+BATCH_SIZE = 100000
+BRANDS = ["Nike", "Adidas", "Zara", "Uniqlo", "Levis", "H&M", "Puma", "Gucci", "Prada", "Mango",
+          "Reebok", "Tommy Hilfiger", "Calvin Klein", "Ralph Lauren", "Under Armour", "Gap"]
+TERMS = ["nike", "addidas", "levi", "tommy", "shirt", "jeans", "navy", "formal"]
+
+
+def _random_enum(enum_name: str) -> str:
+    return (
+        f'(enum_range(NULL::"{enum_name}"))'
+        f'[1 + floor(random() * array_length(enum_range(NULL::"{enum_name}"), 1))::int]'
+    )
+
+
+async def seed(prisma: Prisma, items: int, users: int) -> None:
+    await prisma.execute_raw(
+        'INSERT INTO "User" (id, name, email, updated_at) '
+        "SELECT $1 || n, 'Bench User ' || n, $1 || n || '@bench.local', now() "
+        "FROM generate_series(0, $2 - 1) AS n ON CONFLICT DO NOTHING",
+        BENCH_USER_PREFIX, users
+    )
+
+    started = time.perf_counter()
+    for offset in range(0, items, BATCH_SIZE):
+        size = min(BATCH_SIZE, items - offset)
+        await prisma.execute_raw(
+            'INSERT INTO "WardrobeItem" (id, user_id, category, type, size, color, brand, created_at, updated_at) '
+            f"SELECT gen_random_uuid()::text, $1 || (n % $2), {_random_enum('ItemCategory')}, "
+            f"{_random_enum('ItemType')}, {_random_enum('Size')}, {_random_enum('Color')}, "
+            "($3::text[])[1 + floor(random() * array_length($3::text[], 1))::int] || ' ' || (n % 997), "
+            "now() - random() * interval '365 days', now() "
+            "FROM generate_series(1, $4) AS n",
+            BENCH_USER_PREFIX, users, BRANDS, size
+        )
+        print(f"seeded {offset + size}/{items} items ({time.perf_counter() - started:.1f}s)")
+
+    await prisma.execute_raw('ANALYZE "WardrobeItem"')
+
+
+async def cleanup(prisma: Prisma) -> None:
+    await prisma.execute_raw('DELETE FROM "WardrobeItem" WHERE user_id LIKE $1', f"{BENCH_USER_PREFIX}%")
+    await prisma.execute_raw('DELETE FROM "User" WHERE id LIKE $1', f"{BENCH_USER_PREFIX}%")
+    print("benchmark rows removed")
+
+
+async def _time(label: str, run, repeat: int) -> None:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await run()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    print(f"  {label:<10} median {statistics.median(timings):8.2f} ms   p95 {timings[int(len(timings) * 0.95) - 1]:8.2f} ms")
+
+
+async def benchmark(prisma: Prisma, repeat: int) -> None:
+    user_id = f"{BENCH_USER_PREFIX}0"
+
+    for term in TERMS:
+        print(f"term {term!r}")
+
+        async def legacy():
+            await prisma.wardrobeitem.find_many(
+                where={"user_id": user_id, "brand": {"contains": term, "mode": "insensitive"}},
+                take=10,
+                order={"created_at": "desc"}
+            )
+            await prisma.wardrobeitem.count(
+                where={"user_id": user_id, "brand": {"contains": term, "mode": "insensitive"}}
+            )
+
+        async def trigram():
+            await search_wardrobe_items(prisma, user_id, term, {"user_id": user_id}, skip=0, take=10)
+
+        await _time("legacy", legacy, repeat)
+        await _time("trigram", trigram, repeat)
+
+    where, rank, params = _build_search_clause(user_id, TERMS[0], {"user_id": user_id})
+    plan = await prisma.query_raw(
+        f'EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM "WardrobeItem" WHERE {where} '
+        f"ORDER BY {rank} DESC, created_at DESC LIMIT 10",
+        *params
+    )
+    print("\nplan for trigram search:")
+    for row in plan:
+        print("  " + row["QUERY PLAN"])
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    prisma = Prisma()
+    await prisma.connect()
+    try:
+        if args.cleanup:
+            await cleanup(prisma)
+            return
+        if not args.skip_seed:
+            await seed(prisma, args.items, args.users)
+        await benchmark(prisma, args.repeat)
+    finally:
+        await prisma.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+import asyncio
+import msgpack, orjson
+import pytest
+from app.utils.content_negotiation import MSGPACK_MEDIA_TYPE, MsgPackMiddleware, wants_msgpack
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, False),
+    ("", False),
+    ("application/json", False),
+    ("*/*", False),
+    ("application/msgpack", True),
+    ("application/x-msgpack", True),
+    ("application/msgpack, */*;q=0.8", True),
+    ("application/msgpack;q=0.9, application/json", False),
+    ("application/json, application/msgpack", False),
+    ("application/msgpack;q=0.5, application/json;q=0.5", False),
+    ("application/json;q=0.2, application/msgpack;q=0.5", True),
+    ("application/msgpack;q=0.5, application/*;q=0.8", False),
+    ("application/msgpack;q=0", False),
+    ("application/msgpack;q=oops", False),
+    ("Application/MsgPack ; Q=1, */*; q=0.1", True),
+])
+def test_wants_msgpack_compares_q_values_with_json(accept, expected):
+    assert wants_msgpack(accept) is expected
+
+
+def json_app(body: bytes, content_type: bytes = b"application/json", headers=()):
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode()), *headers]
+        })
+        # Sent in two chunks to check the middleware buffers the whole body.
+        await send({"type": "http.response.body", "body": body[:5], "more_body": True})
+        await send({"type": "http.response.body", "body": body[5:]})
+    return app
+
+
+def call(app, accept=None):
+    headers = [(b"accept", accept.encode())] if accept else []
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": headers}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(MsgPackMiddleware(app)(scope, receive, send))
+    start = messages[0]
+    body = b"".join(message.get("body", b"") for message in messages[1:])
+    return {key.decode(): value.decode() for key, value in start["headers"]}, body
+
+
+BODY = orjson.dumps({"message": "ok", "data": [1, 2, 3]})
+
+
+def test_middleware_passes_json_through_with_vary():
+    headers, body = call(json_app(BODY), accept="application/json")
+
+    assert body == BODY
+    assert headers["content-type"] == "application/json"
+    assert headers["vary"] == "Accept"
+
+
+def test_middleware_reencodes_json_for_msgpack_clients():
+    app = json_app(BODY, headers=[(b"etag", b'"abc"'), (b"vary", b"Origin")])
+    headers, body = call(app, accept="application/msgpack")
+
+    assert msgpack.unpackb(body) == orjson.loads(BODY)
+    assert headers["content-type"] == MSGPACK_MEDIA_TYPE
+    assert headers["content-length"] == str(len(body))
+    assert headers["etag"] == '"abc-mp"'
+    assert headers["vary"] == "Origin, Accept"
+
+
+def test_middleware_keeps_json_when_json_is_preferred():
+    headers, body = call(json_app(BODY), accept="application/json, application/msgpack;q=0.5")
+
+    assert body == BODY
+    assert headers["content-type"] == "application/json"
+
+
+def test_middleware_leaves_other_content_types_alone():
+    headers, body = call(json_app(b"plain text", content_type=b"text/plain"), accept="application/msgpack")
+
+    assert body == b"plain text"
+    assert headers["content-type"] == "text/plain"
+    assert headers["vary"] == "Accept"
@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from app.db.loader import N_PLUS_ONE_THRESHOLD, DataLoader, NPlusOneWarning
+
+
+class FakeDelegate:
+    def __init__(self, records):
+        self.records = {record.id: record for record in records}
+        self.calls = []
+
+    async def find_many(self, where):
+        ids = where["id"]["in"]
+        self.calls.append(ids)
+        return [self.records[record_id] for record_id in ids if record_id in self.records]
+
+
+def make_loader(count=10):
+    items = [SimpleNamespace(id=f"item-{n}", user_id="user-1") for n in range(count)]
+    prisma = SimpleNamespace(wardrobeitem=FakeDelegate(items))
+    return DataLoader(prisma), prisma.wardrobeitem
+
+
+def test_gathered_loads_share_one_query():
+    loader, delegate = make_loader()
+
+    async def run():
+        return await asyncio.gather(*(loader.load("wardrobeitem", f"item-{n}") for n in range(5)))
+
+    records = asyncio.run(run())
+
+    assert [record.id for record in records] == [f"item-{n}" for n in range(5)]
+    assert len(delegate.calls) == 1
+    assert loader.queries["wardrobeitem"] == 1
+
+
+def test_load_many_keeps_order_and_returns_none_for_missing_ids():
+    loader, delegate = make_loader(3)
+
+    records = asyncio.run(loader.load_many("wardrobeitem", ["item-2", "missing", "item-0"]))
+
+    assert [record and record.id for record in records] == ["item-2", None, "item-0"]
+    assert len(delegate.calls) == 1
+
+
+def test_loaded_and_primed_records_are_not_queried_again():
+    loader, delegate = make_loader()
+    primed = SimpleNamespace(id="item-9", user_id="user-1")
+    loader.prime("wardrobeitem", primed)
+
+    async def run():
+        first = await loader.load("wardrobeitem", "item-1")
+        again = await loader.load("wardrobeitem", "item-1")
+        return first, again, await loader.load("wardrobeitem", "item-9")
+
+    first, again, cached = asyncio.run(run())
+
+    assert first is again
+    assert cached is primed
+    assert len(delegate.calls) == 1
+
+
+def test_sequential_loads_warn_about_n_plus_one():
+    loader, delegate = make_loader()
+
+    async def run():
+        for n in range(N_PLUS_ONE_THRESHOLD + 1):
+            await loader.load("wardrobeitem", f"item-{n}")
+
+    asyncio.run(run())
+
+    assert len(delegate.calls) == N_PLUS_ONE_THRESHOLD + 1
+    with pytest.warns(NPlusOneWarning):
+        loader.check_n_plus_one()
+
+
+def test_batched_loads_do_not_warn(recwarn):
+    loader, _ = make_loader()
+
+    asyncio.run(loader.load_many("wardrobeitem", [f"item-{n}" for n in range(10)]))
+    loader.check_n_plus_one()
+
+    assert not [warning for warning in recwarn if issubclass(warning.category, NPlusOneWarning)]